@@ -0,0 +1,108 @@
+"""change tracking columns, lessons.student_id and one lesson per student per day
+
+Brings databases created before these columns existed up to date. Every
+step checks first, so it is a no-op on a database that create_all just made.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-06-02
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+SCHEMA = "public"
+TRACKED_TABLES = ("students", "packages", "lessons", "closures")
+UNIQUE_LESSON_INDEX = "unique_lesson_per_student_date"
+MAX_REPORTED_DUPLICATES = 20
+
+
+def _columns(table: str) -> set:
+    return {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table, schema=SCHEMA)}
+
+
+def _indexes(table: str) -> set:
+    return {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table, schema=SCHEMA)}
+
+
+def _create_index(name: str, table: str, columns, unique: bool = False) -> None:
+    if name not in _indexes(table):
+        op.create_index(name, table, columns, unique=unique, schema=SCHEMA)
+
+
+def _duplicate_lessons(bind):
+    lessons = sa.table("lessons", sa.column("student_id"), sa.column("lesson_date"), schema=SCHEMA)
+    return bind.execute(
+        sa.select(lessons.c.student_id, lessons.c.lesson_date, sa.func.count().label("n"))
+        .group_by(lessons.c.student_id, lessons.c.lesson_date)
+        .having(sa.func.count() > 1)
+        .order_by(lessons.c.student_id, lessons.c.lesson_date)
+    ).all()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    for table in TRACKED_TABLES:
+        existing = _columns(table)
+        if "updated_at" not in existing:
+            op.add_column(table, sa.Column("updated_at", sa.DateTime, nullable=True), schema=SCHEMA)
+        if "change_seq" not in existing:
+            op.add_column(table, sa.Column("change_seq", sa.BigInteger, nullable=True), schema=SCHEMA)
+        _create_index(f"ix_{SCHEMA}_{table}_change_seq", table, ["change_seq"])
+
+    # lessons.student_id copies packages.student_id so (student_id, lesson_date) can be unique
+    if "student_id" not in _columns("lessons"):
+        op.add_column("lessons", sa.Column("student_id", sa.Integer, nullable=True), schema=SCHEMA)
+        if bind.dialect.name != "sqlite":   # SQLite cannot add a constraint to an existing table
+            op.create_foreign_key(
+                "lessons_student_id_fkey", "lessons", "students", ["student_id"], ["student_id"],
+                source_schema=SCHEMA, referent_schema=SCHEMA, ondelete="CASCADE",
+            )
+    lessons = sa.table("lessons", sa.column("student_id"), sa.column("package_id"), schema=SCHEMA)
+    packages = sa.table("packages", sa.column("student_id"), sa.column("package_id"), schema=SCHEMA)
+    bind.execute(
+        sa.update(lessons)
+        .where(lessons.c.student_id.is_(None))
+        .values(student_id=sa.select(packages.c.student_id)
+                .where(packages.c.package_id == lessons.c.package_id)
+                .scalar_subquery())
+    )
+    if bind.dialect.name != "sqlite":   # SQLite cannot alter a column's nullability in place
+        op.alter_column("lessons", "student_id", existing_type=sa.Integer, nullable=False, schema=SCHEMA)
+
+    _create_index(f"ix_{SCHEMA}_lessons_lesson_date", "lessons", ["lesson_date"])
+
+    if UNIQUE_LESSON_INDEX not in _indexes("lessons"):
+        duplicates = _duplicate_lessons(bind)
+        if duplicates:
+            for row in duplicates[:MAX_REPORTED_DUPLICATES]:
+                logger.error(
+                    "student %s has %s lessons on %s", row.student_id, row.n, row.lesson_date
+                )
+            raise RuntimeError(
+                f"{len(duplicates)} (student_id, lesson_date) pairs have more than one lesson; "
+                f"move or delete the extra lessons, then rerun the migration to create "
+                f"{UNIQUE_LESSON_INDEX}"
+            )
+        _create_index(UNIQUE_LESSON_INDEX, "lessons", ["student_id", "lesson_date"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(UNIQUE_LESSON_INDEX, table_name="lessons", schema=SCHEMA)
+    op.drop_index(f"ix_{SCHEMA}_lessons_lesson_date", table_name="lessons", schema=SCHEMA)
+    if op.get_bind().dialect.name != "sqlite":
+        op.drop_constraint("lessons_student_id_fkey", "lessons", type_="foreignkey", schema=SCHEMA)
+    op.drop_column("lessons", "student_id", schema=SCHEMA)
+    for table in TRACKED_TABLES:
+        op.drop_index(f"ix_{SCHEMA}_{table}_change_seq", table_name=table, schema=SCHEMA)
+        op.drop_column(table, "change_seq", schema=SCHEMA)
+        op.drop_column(table, "updated_at", schema=SCHEMA)
@@ -5,6 +5,22 @@ class Settings(BaseSettings):
     # DB URL used by SQLAlchemy. Adjust if you used a different DB name.
     DATABASE_URL: str = "postgresql+psycopg2://postgres:postgres@db:5432/tuition"
 
+    # Async driver URL for the async endpoints; empty = DATABASE_URL with
+    # postgresql+asyncpg (or sqlite+aiosqlite). Its own pool, sized for
+    # many concurrent requests on one event loop.
+    ASYNC_DATABASE_URL: str = ""
+    ASYNC_POOL_SIZE: int = 10
+    ASYNC_MAX_OVERFLOW: int = 10
+
+    # Read replica for the GET endpoints (dashboard, closures, previews,
+    # exports); empty = the primary on a separate pool. After a client
+    # writes, its reads stay on the primary for READ_AFTER_WRITE_SECONDS
+    # so replica lag never hides its own change.
+    READ_DATABASE_URL: str = ""
+    READ_POOL_SIZE: int = 10
+    READ_MAX_OVERFLOW: int = 10
+    READ_AFTER_WRITE_SECONDS: float = 5.0
+
     # Redis for Celery/background tasks
     REDIS_URL: str = "redis://redis:6379/0"
 
@@ -12,6 +28,36 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     SECRET_KEY: str = "change-me"
 
+    # Max schedule previews kept in the in-process LRU cache
+    PREVIEW_CACHE_SIZE: int = 1024
+
+    # Change events for connected dashboards: "memory" (one worker) or
+    # "redis" (pub/sub on REDIS_URL, needed with several workers)
+    EVENT_BUS_BACKEND: str = "memory"
+    EVENT_BUS_CHANNEL: str = "tuition:events"
+
+    # Background tasks: "celery" (worker via REDIS_URL; falls back to
+    # "local" when REDIS_URL is empty), "local" (in-process thread pool,
+    # no Redis) or "eager" (run inline, for tests)
+    TASK_BACKEND: str = "celery"
+    LOCAL_TASK_WORKERS: int = 2
+
+    # Export jobs: finished files are cached here. The API writes the job
+    # spec and the Celery worker the file, so both must mount this path
+    # (the exports_data volume in docker-compose)
+    EXPORT_CACHE_DIR: str = "/var/lib/tuition_exports"
+    EXPORT_CACHE_TTL: int = 24 * 3600     # seconds a cached export is kept
+    EXPORT_JOB_TIMEOUT: int = 600         # a build lock older than this is stale
+    EXPORT_PROCESSES: int = 0             # multi-sheet export pool size, 0 = CPU count
+
+    # Scheduled term rollover (Celery beat): every day at ROLLOVER_HOUR (UTC),
+    # students whose latest package ends within ROLLOVER_WITHIN_DAYS get
+    # their next package, ROLLOVER_CHUNK_SIZE students per transaction
+    ROLLOVER_HOUR: int = 2
+    ROLLOVER_WITHIN_DAYS: int = 7
+    ROLLOVER_CHUNK_SIZE: int = 200
+    JOB_TIMEOUT: int = 3600               # a queued/running job older than this is stale
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,13 +1,26 @@
 # backend/app/crud.py
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func
 from typing import Optional
+import logging
 from sqlalchemy.exc import IntegrityError
 from . import models, schemas
 from .date_utils import parse_iso_date, ensure_end_after_start
 from datetime import date, timedelta
 from types import SimpleNamespace
-from .services.scheduler import generate_lessons_for_package, load_closure_dates
+from .services.scheduler import generate_lessons_for_package
 from .models import Package, Lesson
+from .services.data_version import bump_data_version, STUDENTS
+from .services.change_tracking import bulk_delete_with_tombstones
+from .services.end_date_prune import prune_to_end_dates
+from .services.lesson_writer import (
+    apply_lesson_diff,
+    diff_package_lessons,
+    existing_lessons,
+    insert_package_with_lessons,
+)
+
+logger = logging.getLogger(__name__)
 
 # try to import the lesson generator; if unavailable keep None
 try:
@@ -49,75 +62,14 @@ def create_student(db: Session, payload: schemas.StudentCreate) -> models.Studen
         db.add(student)
         db.flush()  # ensure student.student_id is available
 
-        # create exactly one package for this student (visible package)
-        pkg = models.Package(
-            student_id=student.student_id,
-            package_size=pkg_size,
-            payment_status=False
-        )
-        db.add(pkg)
-        db.flush()  # ensure pkg.package_id is available
-
-        # generate lesson objects for this single package (scheduler respects student.end_date)
-        lesson_objs = []
-        if generate_lessons_for_package:
-            try:
-                start_from = student.start_date
-                
-                lesson_objs = generate_lessons_for_package(db, student, pkg, override_existing=False, start_from=start_from)
-                if lesson_objs is None:
-                    lesson_objs = []
-            except TypeError:
-                # fallback for older scheduler signature
-                try:
-                    lesson_objs = generate_lessons_for_package(db, student, pkg)
-                    if lesson_objs is None:
-                        lesson_objs = []
-                except Exception as e:
-                    print("WARNING: generate_lessons_for_package failed in create_student (fallback):", e)
-                    lesson_objs = []
-            except Exception as e:
-                print("WARNING: generate_lessons_for_package failed in create_student:", e)
-                lesson_objs = []
-
-        # Persist lessons safely
-        added = 0
-        for obj in lesson_objs:
-            if getattr(obj, "lesson_date", None) is None:
-                continue
-            added += 1
-            if added > pkg_size:
-                break
-
-            if getattr(obj, "lesson_id", None) is None:
-                lesson = models.Lesson(
-                    package_id=pkg.package_id,
-                    lesson_number=added,
-                    lesson_date=obj.lesson_date,
-                    is_first=(added == 1),
-                    is_manual_override=getattr(obj, "is_manual_override", False)
-                )
-                db.add(lesson)
-            else:
-                obj.lesson_number = added
-                if added == 1:
-                    obj.is_first = True
-                db.merge(obj)
-
-
-        # compute first_lesson_date based on persisted lessons (if any)
-        first_ld = (
-            db.query(models.Lesson)
-            .filter(models.Lesson.package_id == pkg.package_id)
-            .order_by(models.Lesson.lesson_number)
-            .first()
-        )
-        if first_ld:
-            pkg.first_lesson_date = first_ld.lesson_date
+        # one package for this student (visible package); the scheduler
+        # respects student.end_date, so it may get fewer than pkg_size lessons
+        lesson_dates = scheduled_lesson_dates(db, student, pkg_size, "create_student")
+        insert_package_with_lessons(db, student.student_id, pkg_size, lesson_dates)
 
+        bump_data_version(db, STUDENTS)
         db.commit()
         db.refresh(student)
-        db.refresh(pkg)
         return student
 
     except Exception:
@@ -140,55 +92,36 @@ def get_all_students(db: Session):
     )
 
 # ---------- PACKAGE CRUD ----------
+def scheduled_lesson_dates(
+    db: Session,
+    student: models.Student,
+    package_size: int,
+    caller: str,
+    start_from: Optional[date] = None,
+) -> list:
+    """Lesson dates from the scheduler; [] (with a warning) if it fails."""
+    if not generate_lessons_for_package:
+        return []
+    try:
+        lessons = generate_lessons_for_package(
+            db, student, SimpleNamespace(package_size=package_size), start_from=start_from
+        ) or []
+    except Exception:
+        logger.warning("generate_lessons_for_package failed in %s", caller, exc_info=True)
+        return []
+    return [l.lesson_date for l in lessons if getattr(l, "lesson_date", None) is not None][:package_size]
+
+
 def create_package(db: Session, student: models.Student) -> models.Package:
     """Create a package for an existing student and generate lessons if generator exists."""
-    pkg = models.Package(
-        student_id=student.student_id,
-        package_size=int(student.package_size),
-        payment_status=False
-    )
+    package_size = int(student.package_size)
     try:
-        db.add(pkg)
-        db.flush()  # ensure pkg.package_id is available
-
-        lesson_objs = []
-        if generate_lessons_for_package:
-            try:
-                lesson_objs = generate_lessons_for_package(db, student, pkg)
-                if lesson_objs is None:
-                    lesson_objs = []
-            except Exception as e:
-                print("WARNING: generate_lessons_for_package failed in create_package:", e)
-                lesson_objs = []
-
-        for i, lesson_obj in enumerate(lesson_objs, start=1):
-            if getattr(lesson_obj, "lesson_id", None) is None:
-                lesson = models.Lesson(
-                    package_id=pkg.package_id,
-                    lesson_number=i,
-                    lesson_date=lesson_obj.lesson_date,
-                    is_first=(i == 1),
-                    is_manual_override=getattr(lesson_obj, "is_manual_override", False)
-                )
-                db.add(lesson)
-            else:
-                lesson_obj.lesson_number = i
-                if i == 1:
-                    lesson_obj.is_first = True
-                db.merge(lesson_obj)
-
-            first = (
-                db.query(models.Lesson)
-                .filter(models.Lesson.package_id == pkg.package_id)
-                .order_by(models.Lesson.lesson_number)
-                .first()
-            )
-            if first:
-                pkg.first_lesson_date = first.lesson_date
+        lesson_dates = scheduled_lesson_dates(db, student, package_size, "create_package")
+        package_id = insert_package_with_lessons(db, student.student_id, package_size, lesson_dates)
 
+        bump_data_version(db, STUDENTS)
         db.commit()
-        db.refresh(pkg)
-        return pkg
+        return get_package(db, package_id)
 
     except Exception:
         db.rollback()
@@ -202,13 +135,19 @@ def get_package(db: Session, package_id: int) -> Optional[models.Package]:
 # ---------- PAYMENT TOGGLE ----------
 def toggle_payment(db: Session, package: models.Package, status: bool) -> models.Package:
     package.payment_status = status
+    bump_data_version(db, STUDENTS)
     db.commit()
     db.refresh(package)
     return package
 
 
 # ---------- REGENERATE LESSONS ----------
-def regenerate_package(db: Session, pkg: Package):
+def regenerate_package(db: Session, pkg: Package) -> Optional[dict]:
+    """
+    Reschedule a package from the day after the previous package's last
+    lesson, changing only the lessons whose slot or date moved. Returns the
+    delta from apply_lesson_diff, or None if no dates could be scheduled.
+    """
     student = pkg.student
 
     # 🔑 find previous package
@@ -222,10 +161,14 @@ def regenerate_package(db: Session, pkg: Package):
         .first()
     )
 
-    if prev_pkg and prev_pkg.lessons:
-        last_prev_date = max(
-            l.lesson_date for l in prev_pkg.lessons if l.lesson_date
+    last_prev_date = None
+    if prev_pkg:
+        last_prev_date = (
+            db.query(func.max(Lesson.lesson_date))
+            .filter(Lesson.package_id == prev_pkg.package_id)
+            .scalar()
         )
+    if last_prev_date:
         start_from = last_prev_date + timedelta(days=1)
     else:
         start_from = student.start_date
@@ -240,27 +183,16 @@ def regenerate_package(db: Session, pkg: Package):
     )
 
     if not lessons:
-        return
-
-    # delete old lessons
-    db.query(Lesson).filter(
-        Lesson.package_id == pkg.package_id
-    ).delete(synchronize_session=False)
-
-    # insert regenerated lessons
-    for i, l in enumerate(lessons, start=1):
-        db.add(Lesson(
-            package_id=pkg.package_id,
-            lesson_number=i,
-            lesson_date=l.lesson_date,
-            is_first=(i == 1),
-            is_manual_override=False,
-        ))
-
-    # update first lesson date
-    pkg.first_lesson_date = lessons[0].lesson_date
+        return None
 
+    # only write what changed; statuses, make-ups and manual overrides stay
+    diff = diff_package_lessons(existing_lessons(db, pkg.package_id), [l.lesson_date for l in lessons])
+    delta = apply_lesson_diff(db, pkg.package_id, pkg.student_id, diff)
+
+    if delta["inserted"] or delta["updated"] or delta["deleted"]:
+        bump_data_version(db, STUDENTS)
     db.commit()
+    return delta
 
 
 def prune_packages_to_end_date(db: Session, student: models.Student, new_end_date: date):
@@ -269,80 +201,27 @@ def prune_packages_to_end_date(db: Session, student: models.Student, new_end_dat
     - Deletes packages where first_lesson_date > new_end_date (only if unpaid).
     - For packages that start <= new_end_date but contain lessons beyond new_end_date,
       delete those lessons and renumber remaining lessons.
+    Runs as a few set-based statements (services/end_date_prune.py).
     Returns: dict with summary: {"deleted_packages": [ids], "skipped_paid": [ids], "trimmed_packages": [ids]}
     """
-    deleted = []
-    skipped_paid = []
-    trimmed = []
-
-    # get packages ordered by first_lesson_date (nulls at end)
-    pkgs = db.query(models.Package).filter(models.Package.student_id == student.student_id).order_by(models.Package.first_lesson_date.nulls_last()).all()
-
-    for pkg in pkgs:
-        first_ld = pkg.first_lesson_date
-        # if package has no lessons (first_ld is None), decide policy: treat as start after end_date -> delete if unpaid
-        if first_ld is None:
-            # treat as starting after; delete if unpaid
-            if pkg.payment_status:
-                skipped_paid.append(pkg.package_id)
-                continue
-            # delete lessons (if any) and package
-            db.query(models.Lesson).filter(models.Lesson.package_id == pkg.package_id).delete(synchronize_session=False)
-            db.delete(pkg)
-            deleted.append(pkg.package_id)
-            continue
-
-        if first_ld > new_end_date:
-            # package starts entirely after allowed end_date
-            if pkg.payment_status:
-                skipped_paid.append(pkg.package_id)
-                continue
-            # delete package and its lessons
-            db.query(models.Lesson).filter(models.Lesson.package_id == pkg.package_id).delete(synchronize_session=False)
-            db.delete(pkg)
-            deleted.append(pkg.package_id)
-        else:
-            # first lesson before or on new_end_date: check for lessons after new_end_date
-            lessons_after = db.query(models.Lesson).filter(
-                models.Lesson.package_id == pkg.package_id,
-                models.Lesson.lesson_date > new_end_date
-            ).order_by(models.Lesson.lesson_number).all()
-
-            if lessons_after:
-                # If package is paid, skip trimming (or you can still trim but safer to skip)
-                if pkg.payment_status:
-                    skipped_paid.append(pkg.package_id)
-                    continue
-
-                # delete lessons beyond end_date
-                db.query(models.Lesson).filter(
-                    models.Lesson.package_id == pkg.package_id,
-                    models.Lesson.lesson_date > new_end_date
-                ).delete(synchronize_session=False)
-
-                # now renumber remaining lessons for this package
-                remaining = db.query(models.Lesson).filter(models.Lesson.package_id == pkg.package_id).order_by(models.Lesson.lesson_date).all()
-                for idx, l in enumerate(remaining, start=1):
-                    l.lesson_number = idx
-                    l.is_first = (idx == 1)
-                # update package_size optionally (set to len(remaining))
-                pkg.package_size = len(remaining)
-                # update first_lesson_date
-                if remaining:
-                    pkg.first_lesson_date = remaining[0].lesson_date
-                else:
-                    pkg.first_lesson_date = None
-
-                trimmed.append(pkg.package_id)
+    student.end_date = new_end_date
+    db.flush()
+    result = prune_to_end_dates(db, [student.student_id])
+    result.pop("deleted_lessons")
 
+    bump_data_version(db, STUDENTS)
     db.commit()
-    return {"deleted_packages": deleted, "skipped_paid": skipped_paid, "trimmed_packages": trimmed}
+    return result
 
 def delete_package(db: Session, package: models.Package):
     # delete lessons first (FK safety)
-    db.query(models.Lesson).filter(
-        models.Lesson.package_id == package.package_id
-    ).delete(synchronize_session=False)
+    bulk_delete_with_tombstones(
+        db,
+        db.query(models.Lesson).filter(models.Lesson.package_id == package.package_id),
+        "lesson",
+        models.Lesson.lesson_id,
+    )
 
     db.delete(package)
+    bump_data_version(db, STUDENTS)
     db.commit()
\ No newline at end of file
@@ -1,8 +1,13 @@
 # backend/app/db.py
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from typing import Optional
 from urllib.parse import urlparse, parse_qs
 from .config import settings
+from .services.read_routing import lag_guard
 
 DATABASE_URL = settings.DATABASE_URL
 
@@ -46,6 +51,101 @@ SessionLocal = sessionmaker(
     autocommit=False,
     future=True
 )
+
+# ---------------------------------------------------------
+# Async engine (asyncpg) for the hot API endpoints
+# ---------------------------------------------------------
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def _async_url(url: str) -> str:
+    """DATABASE_URL with its async driver: postgresql+asyncpg / sqlite+aiosqlite."""
+    u = make_url(url)
+    backend = u.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        return url
+    # asyncpg takes ssl through connect_args, not libpq's sslmode
+    u = u.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").difference_update_query(["sslmode"])
+    return u.render_as_string(hide_password=False)
+
+def _async_connect_args_for(url: str, async_url: str) -> dict:
+    if _should_use_ssl(url) and make_url(async_url).get_driver_name() == "asyncpg":
+        return {"ssl": "require"}
+    return {}
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or _async_url(DATABASE_URL)
+_async_connect_args = _async_connect_args_for(DATABASE_URL, ASYNC_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_size=settings.ASYNC_POOL_SIZE,
+    max_overflow=settings.ASYNC_MAX_OVERFLOW,
+    pool_timeout=30,
+    connect_args=_async_connect_args,
+)
+
+# expire_on_commit=False: attributes must not lazy-load after an awaited
+# commit (sync service code runs through AsyncSession.run_sync)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# ---------------------------------------------------------
+# Read engines for GET endpoints: READ_DATABASE_URL (a replica) or, when
+# unset, the primary on a separate pool so reads do not queue behind writes
+# ---------------------------------------------------------
+READ_DATABASE_URL = settings.READ_DATABASE_URL or DATABASE_URL
+ASYNC_READ_DATABASE_URL = (
+    _async_url(settings.READ_DATABASE_URL) if settings.READ_DATABASE_URL else ASYNC_DATABASE_URL
+)
+
+# sessions on the read engines cannot write by accident
+_read_options = {"postgresql_readonly": True} if make_url(READ_DATABASE_URL).get_backend_name() == "postgresql" else {}
+
+read_engine = create_engine(
+    READ_DATABASE_URL,
+    echo=settings.DEBUG,
+    future=True,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_size=settings.READ_POOL_SIZE,
+    max_overflow=settings.READ_MAX_OVERFLOW,
+    pool_timeout=30,
+    connect_args={"sslmode": "require"} if _should_use_ssl(READ_DATABASE_URL) else {},
+    execution_options=_read_options,
+)
+
+async_read_engine = create_async_engine(
+    ASYNC_READ_DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    pool_size=settings.READ_POOL_SIZE,
+    max_overflow=settings.READ_MAX_OVERFLOW,
+    pool_timeout=30,
+    connect_args=_async_connect_args_for(READ_DATABASE_URL, ASYNC_READ_DATABASE_URL),
+    execution_options=_read_options,
+)
+
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autoflush=False,
+    autocommit=False,
+    future=True
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base(metadata=None)
 Base.metadata.schema = "public"
 
@@ -55,3 +155,28 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def read_session_factory(request: Optional[Request] = None):
+    """
+    Read sessions, except on the primary for a client that just wrote.
+    Without a request (background exports) always the read engine.
+    """
+    if request is not None and lag_guard.wants_primary(request):
+        return SessionLocal
+    return ReadSessionLocal
+
+def get_read_db(request: Request):
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    factory = AsyncSessionLocal if lag_guard.wants_primary(request) else AsyncReadSessionLocal
+    async with factory() as db:
+        yield db
@@ -1,14 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from .routers.packages import extra_router
 from .db import Base, engine
-from .routers import students, packages, closures
+from .routers import students, packages, closures, sync, events, jobs
 from .routers.closures import router as closures_router
 from app.db import Base, engine
 from app import models
+from .services import change_tracking  # noqa: F401  (registers session hooks)
+from .services.read_routing import lag_guard, READ_PRIMARY_HEADER, WRITE_METHODS
+from alembic import command
+from alembic.config import Config
+from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Create DB tables (DEV ONLY — disable in production, use Alembic instead)
 Base.metadata.create_all(bind=engine)
+# bring databases made before the newer columns and indexes up to date
+# (alembic/versions); a failed migration, e.g. duplicate lessons blocking
+# unique_lesson_per_student_date, stops startup rather than being skipped
+_alembic_cfg = Config(str(Path(__file__).resolve().parents[1] / "alembic.ini"))
+with engine.begin() as _conn:
+    _alembic_cfg.attributes["connection"] = _conn
+    command.upgrade(_alembic_cfg, "head")
 
 app = FastAPI(title="Tuition Lesson Dashboard API", redirect_slashes=False)
 
@@ -28,9 +43,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", READ_PRIMARY_HEADER],
 )
 
-print("DEBUG: CORS middleware installed with allow_origins=['*']")
+# after a successful write, this client's reads go to the primary for a
+# while (replica lag guard, see services/read_routing.py)
+@app.middleware("http")
+async def read_after_write(request: Request, call_next):
+    response = await call_next(request)
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        response.headers[READ_PRIMARY_HEADER] = lag_guard.note_write(request)
+    return response
+
+logger.debug("CORS middleware installed with allow_origins=%s", origins)
 # --------------------------------------------------------
 # ROUTES
 # --------------------------------------------------------
@@ -39,6 +64,9 @@ app.include_router(packages.router)
 app.include_router(extra_router)
 app.include_router(closures.router)
 app.include_router(closures_router)
+app.include_router(sync.router)
+app.include_router(events.router)
+app.include_router(jobs.router)
 
 # --------------------------------------------------------
 # ROOT ENDPOINT (for testing)
@@ -1,5 +1,5 @@
 # backend/app/models.py
-from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Date, Boolean, ForeignKey, DateTime, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .db import Base
 from datetime import datetime
@@ -21,6 +21,9 @@ class Student(Base):
 
     status = Column("status", String, default="active")
 
+    updated_at = Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    change_seq = Column("change_seq", BigInteger, nullable=True, index=True)
+
     packages = relationship("Package", back_populates="student", cascade="all, delete-orphan", passive_deletes=True)
 
 
@@ -37,6 +40,9 @@ class Package(Base):
 
     created_at = Column("created_at", DateTime, default=datetime.utcnow)
 
+    updated_at = Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    change_seq = Column("change_seq", BigInteger, nullable=True, index=True)
+
     student = relationship("Student", back_populates="packages")
     lessons = relationship(
         "Lesson",
@@ -57,9 +63,16 @@ class Lesson(Base):
         ForeignKey("packages.package_id", ondelete="CASCADE"),
         nullable=False
     )
+    # copy of packages.student_id, so (student_id, lesson_date) can be unique
+    student_id = Column(
+        "student_id",
+        Integer,
+        ForeignKey("students.student_id", ondelete="CASCADE"),
+        nullable=False
+    )
 
     lesson_number = Column("lesson_number", Integer, nullable=False)
-    lesson_date = Column("lesson_date", Date, nullable=False)
+    lesson_date = Column("lesson_date", Date, nullable=False, index=True)
 
     is_first = Column("is_first", Boolean, default=False)
     is_manual_override = Column("is_manual_override", Boolean, default=False)
@@ -68,6 +81,9 @@ class Lesson(Base):
     status = Column(String, default="scheduled")
     is_makeup = Column(Boolean, default=False)
 
+    updated_at = Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    change_seq = Column("change_seq", BigInteger, nullable=True, index=True)
+
     package = relationship("Package", back_populates="lessons")
 
     __table_args__ = (
@@ -76,6 +92,14 @@ class Lesson(Base):
             'lesson_number',
             name='unique_lesson_per_package'
         ),
+        # a student never has two lessons on the same day; a unique index
+        # rather than a constraint so startup can add it to existing tables
+        Index(
+            'unique_lesson_per_student_date',
+            'student_id',
+            'lesson_date',
+            unique=True
+        ),
     )
 
 
@@ -87,3 +111,58 @@ class Closure(Base):
     end_date = Column("end_date", Date, nullable=False)
     reason = Column("reason", String, nullable=True)
     type = Column("type", String, nullable=True)
+
+    updated_at = Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)
+    change_seq = Column("change_seq", BigInteger, nullable=True, index=True)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    # "students" covers students, packages and lessons; "closures" covers closures
+    scope = Column("scope", String, primary_key=True)
+    version = Column("version", BigInteger, nullable=False, default=0)
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+
+    tombstone_id = Column("tombstone_id", Integer, primary_key=True)
+    entity = Column("entity", String, nullable=False)     # student | package | lesson | closure
+    row_id = Column("row_id", Integer, nullable=False)
+    change_seq = Column("change_seq", BigInteger, nullable=False, index=True)
+    deleted_at = Column("deleted_at", DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    # background batch jobs (e.g. the scheduled term rollover) and their progress
+    job_id = Column("job_id", Integer, primary_key=True)
+    kind = Column("kind", String, nullable=False, index=True)
+    status = Column("status", String, nullable=False, default="queued")   # queued | running | done | failed
+    params = Column("params", JSON, nullable=True)
+
+    total = Column("total", Integer, nullable=False, default=0)
+    processed = Column("processed", Integer, nullable=False, default=0)
+    created = Column("created", Integer, nullable=False, default=0)
+    skipped = Column("skipped", Integer, nullable=False, default=0)
+    failed = Column("failed", Integer, nullable=False, default=0)
+    errors = Column("errors", JSON, nullable=True)   # [{"student_ids": [...], "error": "..."}]
+
+    created_at = Column("created_at", DateTime, default=datetime.utcnow)
+    started_at = Column("started_at", DateTime, nullable=True)
+    finished_at = Column("finished_at", DateTime, nullable=True)
+
+
+class JobItem(Base):
+    __tablename__ = "job_items"
+
+    # per-item outcome of a Job (e.g. one row per regenerated package)
+    job_item_id = Column("job_item_id", Integer, primary_key=True)
+    job_id = Column("job_id", Integer, ForeignKey("jobs.job_id", ondelete="CASCADE"), nullable=False, index=True)
+    item_id = Column("item_id", Integer, nullable=False)
+    status = Column("status", String, nullable=False)     # done | skipped | failed
+    result = Column("result", JSON, nullable=True)
+    error = Column("error", String, nullable=True)
+    finished_at = Column("finished_at", DateTime, default=datetime.utcnow)
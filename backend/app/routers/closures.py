@@ -1,11 +1,23 @@
 # backend/app/routers/closures.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 
-from ..db import get_db
+from ..db import get_async_read_db, get_db
 from .. import models
+from ..services.closure_impact import reschedule_closure_windows
+from ..services.event_bus import publish_event
+from .packages import lesson_date_conflict_400
+from ..services.data_version import (
+    bump_data_version,
+    get_data_version,
+    make_etag,
+    etag_matches,
+    CLOSURES,
+)
 
 from pydantic import BaseModel
 
@@ -27,8 +39,20 @@ class ClosureOut(ClosureIn):
         from_attributes = True
 
 
+class ClosureImpactIn(BaseModel):
+    """A proposed closure change: new (closure_id None), edit, or delete."""
+    closure_id: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    delete: bool = False
+
+
 @router.post("/", response_model=ClosureOut)
-def create_closure(payload: ClosureIn, db: Session = Depends(get_db)):
+def create_closure(
+    payload: ClosureIn,
+    reschedule: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     # Basic validation: start <= end
     if payload.start_date > payload.end_date:
         raise HTTPException(status_code=400, detail="start_date must be <= end_date")
@@ -40,15 +64,33 @@ def create_closure(payload: ClosureIn, db: Session = Depends(get_db)):
         type=payload.type
     )
     db.add(c)
-    db.commit()
+    bump_data_version(db, CLOSURES)
+    moved = []
+    # one transaction: the closure, the moved lessons and both data versions
+    with lesson_date_conflict_400(db):
+        if reschedule:
+            db.flush()
+            moved = reschedule_closure_windows(db, [(c.start_date, c.end_date)], dry_run=False)["changes"]
+        db.commit()
     db.refresh(c)
+    publish_event(
+        "closure.created", closure_id=c.id, start_date=c.start_date, end_date=c.end_date,
+        lessons_moved=len(moved),
+    )
     # models.Closure uses column name closure_id for primary key; map to "id" in output
     return ClosureOut(id=c.id, start_date=c.start_date, end_date=c.end_date, reason=c.reason, type=c.type)
 
 
 @router.get("/", response_model=List[ClosureOut])
-def list_closures(db: Session = Depends(get_db)):
-    rows = db.query(models.Closure).order_by(models.Closure.start_date).all()
+async def list_closures(request: Request, response: Response, db: AsyncSession = Depends(get_async_read_db)):
+    # conditional GET: one version lookup, no ORM load when unchanged
+    etag = make_etag(CLOSURES, await db.run_sync(get_data_version, CLOSURES), request)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+
+    rows = (await db.execute(select(models.Closure).order_by(models.Closure.start_date))).scalars().all()
     # map model to response schema
     results = [ClosureOut(
         id=r.id,
@@ -61,20 +103,42 @@ def list_closures(db: Session = Depends(get_db)):
 
 
 @router.delete("/{closure_id}")
-def delete_closure(closure_id: int, db: Session = Depends(get_db)):
+def delete_closure(
+    closure_id: int,
+    reschedule: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     c = db.query(models.Closure).filter(models.Closure.id == closure_id).first()
     if not c:
         raise HTTPException(status_code=404, detail="Closure not found")
+    window = (c.start_date, c.end_date)
     db.delete(c)
-    db.commit()
+    bump_data_version(db, CLOSURES)
+    moved = []
+    # one transaction: the closure, the moved lessons and both data versions
+    with lesson_date_conflict_400(db):
+        if reschedule:
+            db.flush()
+            moved = reschedule_closure_windows(db, [window], dry_run=False)["changes"]
+        db.commit()
+    publish_event(
+        "closure.deleted", closure_id=closure_id, start_date=window[0], end_date=window[1],
+        lessons_moved=len(moved),
+    )
     return {"status": "ok", "id": closure_id}
 
 @router.patch("/{closure_id}", response_model=ClosureOut)
-def update_closure(closure_id: int, payload: ClosureIn, db: Session = Depends(get_db)):
+def update_closure(
+    closure_id: int,
+    payload: ClosureIn,
+    reschedule: bool = Query(False),
+    db: Session = Depends(get_db)
+):
     """
     Update an existing closure.
     Allows modifying start_date, end_date, reason, and type.
     Full replace semantics (same fields as create). You can change this to partial if you prefer.
+    With reschedule=true, lessons affected by the old or new window are moved in the same transaction.
     """
     c = db.query(models.Closure).filter(models.Closure.id == closure_id).first()
     if not c:
@@ -84,13 +148,63 @@ def update_closure(closure_id: int, payload: ClosureIn, db: Session = Depends(ge
     if payload.start_date > payload.end_date:
         raise HTTPException(status_code=400, detail="start_date must be <= end_date")
 
+    old_window = (c.start_date, c.end_date)
+
     # Update fields
     c.start_date = payload.start_date
     c.end_date = payload.end_date
     c.reason = payload.reason
     c.type = payload.type
 
-    db.commit()
+    bump_data_version(db, CLOSURES)
+    moved = []
+    # one transaction: the closure, the moved lessons and both data versions
+    with lesson_date_conflict_400(db):
+        if reschedule:
+            db.flush()
+            moved = reschedule_closure_windows(
+                db, [old_window, (c.start_date, c.end_date)], dry_run=False
+            )["changes"]
+        db.commit()
     db.refresh(c)
+    publish_event(
+        "closure.updated", closure_id=c.id, start_date=c.start_date, end_date=c.end_date,
+        lessons_moved=len(moved),
+    )
 
     return ClosureOut(id=c.id, start_date=c.start_date, end_date=c.end_date, reason=c.reason, type=c.type)
+
+
+@router.post("/impact")
+def preview_closure_impact(payload: ClosureImpactIn, db: Session = Depends(get_db)):
+    """
+    Dry run: stage the proposed closure change, compute which lessons would
+    move, then roll everything back.
+    """
+    windows = []
+    try:
+        if payload.closure_id is not None:
+            c = db.query(models.Closure).filter(models.Closure.id == payload.closure_id).first()
+            if not c:
+                raise HTTPException(status_code=404, detail="Closure not found")
+            windows.append((c.start_date, c.end_date))
+            if payload.delete:
+                db.delete(c)
+            else:
+                c.start_date = payload.start_date or c.start_date
+                c.end_date = payload.end_date or c.end_date
+                windows.append((c.start_date, c.end_date))
+        else:
+            if payload.start_date is None or payload.end_date is None:
+                raise HTTPException(status_code=400, detail="start_date and end_date are required")
+            c = models.Closure(start_date=payload.start_date, end_date=payload.end_date)
+            db.add(c)
+            windows.append((c.start_date, c.end_date))
+
+        if any(s > e for s, e in windows):
+            raise HTTPException(status_code=400, detail="start_date must be <= end_date")
+
+        db.flush()
+        return reschedule_closure_windows(db, windows, dry_run=True)
+    finally:
+        db.rollback()
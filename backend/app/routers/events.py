@@ -0,0 +1,43 @@
+# backend/app/routers/events.py
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ..services.event_bus import encode_event, event_bus
+
+router = APIRouter(tags=["Events"])
+
+HEARTBEAT_SECONDS = 15
+
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {encode_event(event)}\n\n"
+
+
+@router.get("/events")
+async def stream_events(request: Request):
+    """
+    Server-sent events: one small JSON event per lesson / payment /
+    package / closure change. Clients patch their local state or refetch.
+    """
+    queue = event_bus.subscribe()
+
+    async def _stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
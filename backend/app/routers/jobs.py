@@ -0,0 +1,109 @@
+# backend/app/routers/jobs.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from .. import models, tasks
+from ..services.jobs import claim_job, create_job, fail_job, job_items, job_out
+from ..services.regenerate_jobs import batches, resolve_regenerate_packages, REGENERATE_BATCH_SIZE
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+class RolloverJobPayload(BaseModel):
+    within_days: Optional[int] = Field(None, ge=0)
+    chunk_size: Optional[int] = Field(None, ge=1, le=5000)
+
+
+class RegenerateJobPayload(BaseModel):
+    # explicit packages ...
+    package_ids: Optional[List[int]] = None
+    # ... or a filter (each student's latest package unless latest_only=False)
+    student_ids: Optional[List[int]] = None
+    group_name: Optional[str] = None
+    package_size: Optional[int] = None
+    latest_only: bool = True
+    batch_size: int = Field(REGENERATE_BATCH_SIZE, ge=1, le=500)
+
+
+@router.post("/rollover", status_code=202)
+def start_rollover_job(payload: RolloverJobPayload, db: Session = Depends(get_db)):
+    """
+    Run the scheduled rollover now. Only one rollover job runs at a time:
+    while one is queued/running it is returned instead of a new one.
+    Runs on Celery, or without Redis when TASK_BACKEND is local/eager.
+    """
+    job = claim_job(db, "rollover", tasks.rollover_job_params(payload.within_days, payload.chunk_size))
+    if job.pop("leader"):
+        try:
+            tasks.submit_task(tasks.rollover_due_students_task, job["job_id"])
+        except Exception as e:
+            fail_job(db, job["job_id"], f"could not queue job: {e}")
+            raise HTTPException(status_code=503, detail=f"Could not queue rollover job: {e}")
+        db.expire_all()
+        job = job_out(db.get(models.Job, job["job_id"]))
+    return job
+
+
+@router.post("/regenerate", status_code=202)
+def start_regenerate_job(payload: RegenerateJobPayload, db: Session = Depends(get_db)):
+    """
+    Regenerate many packages in the background. The packages are split
+    into batches of batch_size, each dispatched as its own task (Celery, or
+    the local pool without a broker). Poll GET /jobs/{job_id} for progress
+    and per-package results.
+    """
+    if not (payload.package_ids or payload.student_ids or payload.group_name or payload.package_size):
+        raise HTTPException(status_code=400, detail="Send package_ids or a filter (student_ids, group_name, package_size)")
+
+    package_ids = resolve_regenerate_packages(
+        db,
+        package_ids=payload.package_ids,
+        student_ids=payload.student_ids,
+        group_name=payload.group_name,
+        package_size=payload.package_size,
+        latest_only=payload.latest_only,
+    )
+    params = payload.dict(exclude_none=True)
+    params["package_ids"] = package_ids
+    job = create_job(db, "regenerate", params)
+    job.total = len(package_ids)
+    if not package_ids:
+        job.status = "done"
+    db.commit()
+
+    job_id = job.job_id
+    for batch in batches(package_ids, payload.batch_size):
+        try:
+            tasks.submit_task(tasks.regenerate_packages_task, job_id, batch)
+        except Exception as e:
+            fail_job(db, job_id, f"could not queue batch: {e}")
+            raise HTTPException(status_code=503, detail=f"Could not queue regenerate job: {e}")
+
+    db.expire_all()
+    return job_out(db.get(models.Job, job_id))
+
+
+@router.get("")
+@router.get("/")
+def list_jobs(
+    kind: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    q = db.query(models.Job)
+    if kind:
+        q = q.filter(models.Job.kind == kind)
+    return [job_out(j) for j in q.order_by(models.Job.job_id.desc()).limit(limit)]
+
+
+@router.get("/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Job progress; `items` holds per-item results (e.g. one per package)."""
+    job = db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return dict(job_out(job), items=job_items(db, job_id))
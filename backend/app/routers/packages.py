@@ -1,21 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from sqlalchemy import exists, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 from datetime import date, datetime, timedelta
-import io
-import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, PatternFill
-
-from fastapi.responses import StreamingResponse
-from ..services.scheduler import load_closure_dates
+from contextlib import asynccontextmanager, contextmanager
+import tempfile
+from itertools import islice, takewhile
+
+from fastapi.responses import FileResponse, StreamingResponse
+from ..services.scheduler import (
+    load_closure_calendar,
+    lesson_weekdays,
+    iter_future_blocks,
+    future_schedule_window,
+)
+from ..services.preview_cache import preview_cache
+from ..services.rollover import rollover_student_query, rollover_students
+from ..services.data_version import bump_data_version, get_data_version, CLOSURES, STUDENTS
+from ..services.change_tracking import bulk_delete_with_tombstones, current_change_seq
+from ..services.lesson_writer import (
+    insert_package_with_lessons,
+    is_lesson_date_conflict,
+    LESSON_DATE_CONFLICT,
+)
+from ..services.event_bus import publish_event, publish_event_async
+from ..services.lesson_status import fetch_updated_lessons, set_day_status, set_lesson_statuses
+from ..services import exports
+from ..services.exports import (
+    export_filename,
+    iter_dashboard_csv,
+    iter_file_chunks,
+    iter_lessons_parquet,
+    stream_with_session,
+    write_dashboard_xlsx,
+    CSV_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    XLSX_MEDIA_TYPE,
+)
+from ..services.multi_sheet_export import write_multi_sheet_xlsx, MULTI_SHEET_FILENAME
+from ..services.export_jobs import (
+    abandon_export_job,
+    claim_export_job,
+    export_job_file,
+    export_job_status,
+    EXPORT_MEDIA_TYPES,
+)
 from ..schemas import LessonEditPayload
 
-from ..db import get_db
-from .. import models, schemas, crud
+from ..db import get_async_db, get_db, get_read_db, read_session_factory
+from .. import models, schemas, crud, tasks
 
-DAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
 router = APIRouter(prefix="/packages", tags=["Packages"])
 extra_router = APIRouter(tags=["Packages"])
@@ -25,10 +62,60 @@ class CreateFromPreviewPayload(BaseModel):
 
 class MakeupPayload(BaseModel):
     lesson_date: date
+
+class ExportJobPayload(BaseModel):
+    format: str = "xlsx"   # xlsx | xlsx_sheets | csv | parquet
+    tab: str = "all"       # all | 4 | 8
+    group: str = ""
+    day: str = ""
+
+class RolloverPayload(BaseModel):
+    student_ids: Optional[List[int]] = None
+    group_name: Optional[str] = None
+    package_size: Optional[int] = None
+    status: Optional[str] = "active"
+    mark_paid: bool = False
     
-FILL_ATTENDED = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-FILL_LEAVE = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-FILL_MU = PatternFill(start_color="EAD1DC", end_color="EAD1DC", fill_type="solid")
+
+def lesson_updated_fields(lesson: models.Lesson) -> Dict:
+    """The lesson.updated event payload."""
+    return {
+        "lesson_id": lesson.lesson_id,
+        "package_id": lesson.package_id,
+        "student_id": lesson.student_id,
+        "lesson_date": lesson.lesson_date,
+        "status": lesson.status,
+        "is_makeup": lesson.is_makeup,
+        "is_manual_override": lesson.is_manual_override,
+    }
+
+def publish_regenerated(student_id: int, package_id: int, delta: Optional[Dict]) -> None:
+    """package.regenerated carries the lesson delta so dashboards can patch in place."""
+    if delta is None:
+        return
+    publish_event("package.regenerated", student_id=student_id, **delta)
+
+@contextmanager
+def lesson_date_conflict_400(db: Session):
+    """Map a unique (student_id, lesson_date) violation to a 400."""
+    try:
+        yield
+    except IntegrityError as e:
+        db.rollback()
+        if is_lesson_date_conflict(e):
+            raise HTTPException(status_code=400, detail=LESSON_DATE_CONFLICT)
+        raise
+
+@asynccontextmanager
+async def lesson_date_conflict_400_async(db: AsyncSession):
+    """lesson_date_conflict_400 for async endpoints."""
+    try:
+        yield
+    except IntegrityError as e:
+        await db.rollback()
+        if is_lesson_date_conflict(e):
+            raise HTTPException(status_code=400, detail=LESSON_DATE_CONFLICT)
+        raise
 
 # =========================================================
 # PAYMENT
@@ -39,6 +126,10 @@ def mark_paid(package_id: int, db: Session = Depends(get_db)):
     if not pkg:
         raise HTTPException(404, "Package not found")
     pkg = crud.toggle_payment(db, pkg, True)
+    publish_event(
+        "package.payment", package_id=pkg.package_id, student_id=pkg.student_id,
+        payment_status=pkg.payment_status,
+    )
     return {"status": "ok", "payment_status": pkg.payment_status}
 
 
@@ -48,6 +139,10 @@ def mark_unpaid(package_id: int, db: Session = Depends(get_db)):
     if not pkg:
         raise HTTPException(404, "Package not found")
     pkg = crud.toggle_payment(db, pkg, False)
+    publish_event(
+        "package.payment", package_id=pkg.package_id, student_id=pkg.student_id,
+        payment_status=pkg.payment_status,
+    )
     return {"status": "ok", "payment_status": pkg.payment_status}
 
 
@@ -82,32 +177,49 @@ def create_package_from_preview(
     if student.end_date and dates[0] > student.end_date:
         raise HTTPException(400, "Preview dates exceed student's end date")
 
-    # create new package
-    new_pkg = models.Package(
-        student_id=student.student_id,
-        package_size=pkg.package_size,
-        payment_status=bool(mark_paid),
-    )
-    db.add(new_pkg)
-    db.flush()
-
-    # create lessons EXACTLY as previewed
-    for i, d in enumerate(dates, start=1):
-        db.add(models.Lesson(
-            package_id=new_pkg.package_id,
-            lesson_number=i,
-            lesson_date=d,
-            is_first=(i == 1),
-            is_manual_override=False,
-        ))
-
-    new_pkg.first_lesson_date = dates[0]
-
-    # ✅ THIS WAS MISSING
-    db.commit()
-    db.refresh(new_pkg)
+    # create new package with lessons EXACTLY as previewed
+    with lesson_date_conflict_400(db):
+        new_package_id = insert_package_with_lessons(
+            db, student.student_id, pkg.package_size, dates, payment_status=bool(mark_paid)
+        )
+
+        bump_data_version(db, STUDENTS)
+        db.commit()
+
+    return crud.get_package(db, new_package_id)
+
+# =========================================================
+# BULK TERM ROLLOVER
+# =========================================================
+@extra_router.post("/students/packages/rollover")
+def rollover_packages(
+    payload: RolloverPayload,
+    dry_run: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    students = rollover_student_query(
+        db,
+        student_ids=payload.student_ids,
+        group_name=payload.group_name,
+        package_size=payload.package_size,
+        status=payload.status,
+    ).all()
+
+    try:
+        results = rollover_students(db, students, mark_paid=payload.mark_paid, dry_run=dry_run)
+        if not dry_run:
+            bump_data_version(db, STUDENTS)
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
 
-    return new_pkg
+    return {
+        "dry_run": dry_run,
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "results": results,
+    }
 
 # =========================================================
 # REGENERATE (POST)
@@ -118,8 +230,11 @@ def regenerate_lessons(package_id: int, db: Session = Depends(get_db)):
     if not pkg:
         raise HTTPException(status_code=404, detail="Package not found")
 
-    crud.regenerate_package(db, pkg)
-    return {"status": "ok", "package_id": package_id}
+    student_id = pkg.student_id
+    with lesson_date_conflict_400(db):
+        delta = crud.regenerate_package(db, pkg)
+    publish_regenerated(student_id, package_id, delta)
+    return {"status": "ok", "package_id": package_id, "changes": delta}
 
 
 @router.post("/students/packages/{package_id}/regenerate")
@@ -128,8 +243,11 @@ def regenerate_lessons(package_id: int, db: Session = Depends(get_db)):
     if not pkg:
         raise HTTPException(status_code=404, detail="Package not found")
 
-    crud.regenerate_package(db, pkg)
-    return {"status": "ok", "package_id": package_id}
+    student_id = pkg.student_id
+    with lesson_date_conflict_400(db):
+        delta = crud.regenerate_package(db, pkg)
+    publish_regenerated(student_id, package_id, delta)
+    return {"status": "ok", "package_id": package_id, "changes": delta}
 
 # =========================================================
 # REGENERATE PREVIEW (GET)
@@ -139,7 +257,23 @@ def regenerate_preview(
     package_id: int,
     preview: bool = Query(True),
     extend: bool = Query(False),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1),    # future blocks per page
+    offset: int = Query(0, ge=0),                # future blocks to skip
+    until: Optional[date] = Query(None),         # last block start date
+    db: Session = Depends(get_read_db),
+):
+    # sync endpoint: the ORM loads and the calendar walk run in the
+    # threadpool, not on the event loop
+    return _regenerate_preview(db, package_id, extend, limit, offset, until)
+
+
+def _regenerate_preview(
+    db: Session,
+    package_id: int,
+    extend: bool,
+    limit: Optional[int],
+    offset: int,
+    until: Optional[date],
 ):
     pkg = crud.get_package(db, package_id)
     if not pkg:
@@ -151,6 +285,11 @@ def regenerate_preview(
     if not student:
         raise HTTPException(404, "Student not found")
 
+    # cache entries are keyed on the closure version this session sees,
+    # read before any closure: a lagging replica then fills a stale key
+    # (never hit once the client sees the new version), not a fresh one
+    closure_version = get_data_version(db, CLOSURES)
+
     # =====================================================
     # SINGLE PACKAGE PREVIEW (Regenerate button)
     # =====================================================
@@ -174,19 +313,32 @@ def regenerate_preview(
         else:
             start_from = student.start_date
 
-        proposed = generate_lessons_for_package(
-            db,
-            student,
-            pkg,
-            override_existing=False,
-            start_from=start_from
-        ) or []
+        cache_key = preview_cache.key(
+            closure_version,
+            tuple(lesson_weekdays(student, pkg.package_size)),
+            start_from,
+            int(pkg.package_size),
+            student.end_date,
+        )
+        proposed = preview_cache.get_or_compute(
+            cache_key,
+            lambda: tuple(
+                l.lesson_date
+                for l in generate_lessons_for_package(
+                    db,
+                    student,
+                    pkg,
+                    override_existing=False,
+                    start_from=start_from
+                ) or []
+            ),
+        )
 
         out = []
-        for idx, l in enumerate(proposed, start=1):
+        for idx, d in enumerate(proposed, start=1):
             out.append({
                 "lesson_number": idx,
-                "lesson_date": l.lesson_date.isoformat(),
+                "lesson_date": d.isoformat(),
                 "is_manual_override": False,
                 "is_first": (idx == 1),
             })
@@ -207,46 +359,70 @@ def regenerate_preview(
         default=student.start_date
     )
     cursor = last_date + timedelta(days=1)
-    end_cutoff = student.end_date or cursor + timedelta(days=365 * 2)
-
-    while cursor <= end_cutoff:
-        block = generate_lessons_for_package(
-            db,
-            student,
-            pkg,
-            start_from=cursor
+    days = lesson_weekdays(student, pkg.package_size)
+
+    def _future_page():
+        _, last_day = future_schedule_window(cursor, student.end_date)
+        calendar = load_closure_calendar(db, cursor, last_day)
+
+        # one calendar walk, consumed lazily up to the requested page
+        blocks = iter_future_blocks(
+            cursor,
+            days,
+            int(pkg.package_size),
+            calendar,
+            student.end_date,
         )
-        if not block:
-            break
+        if until is not None:
+            blocks = takewhile(lambda b: b[0] <= until, blocks)
+
+        stop = offset + limit + 1 if limit is not None else None
+        page = [tuple(b) for b in islice(blocks, offset, stop)]
+        has_more = limit is not None and len(page) > limit
+        return tuple(page[:limit]), has_more
+
+    cache_key = preview_cache.key(
+        closure_version,
+        tuple(days),
+        cursor,
+        int(pkg.package_size),
+        student.end_date,
+        ("future", limit, offset, until),
+    )
+    page, has_more = preview_cache.get_or_compute(cache_key, _future_page)
 
-        for idx, l in enumerate(block, start=1):
+    for block in page:
+        for idx, d in enumerate(block, start=1):
             flat.append({
                 "lesson_number": idx,
-                "lesson_date": l.lesson_date.isoformat(),
+                "lesson_date": d.isoformat(),
                 "is_manual_override": False,
                 "is_first": (idx == 1),
             })
 
-        cursor = block[-1].lesson_date + timedelta(days=1)
-
     return {
         "preview": True,
         "package_id": pkg.package_id,
         "proposed_lessons": flat,
+        "offset": offset,
+        "blocks": len(page),
+        "has_more": has_more,
     }
     
+@extra_router.get("/students/packages/preview_cache/stats")
+def preview_cache_stats():
+    return preview_cache.stats()
+
 # =========================================================
 # EDIT LESSON
 # =========================================================
 @extra_router.patch("/lessons/{lesson_id}/status")
-def update_lesson_status(
+async def update_lesson_status(
     lesson_id: int,
     payload: schemas.LessonStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    lesson = db.query(models.Lesson).filter(
-        models.Lesson.lesson_id == lesson_id
-    ).first()
+    lesson = await db.get(models.Lesson, lesson_id)
 
     if not lesson:
         raise HTTPException(status_code=404, detail="Lesson not found")
@@ -254,8 +430,9 @@ def update_lesson_status(
     # ✅ Update status only
     lesson.status = payload.status
 
-    db.commit()
-    db.refresh(lesson)
+    await db.run_sync(bump_data_version, STUDENTS)
+    await db.commit()
+    await publish_event_async("lesson.updated", **lesson_updated_fields(lesson))
 
     return {
         "lesson_id": lesson.lesson_id,
@@ -263,119 +440,193 @@ def update_lesson_status(
         "status": lesson.status,
         "is_makeup": lesson.is_makeup,
     }
+
+
+@extra_router.post("/lessons/bulk_status")
+async def bulk_update_lesson_status(
+    payload: schemas.BulkLessonStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Mark many lessons at once, in one transaction: either `updates`
+    ([{lesson_id, status}], later entries win) or every lesson on
+    `lesson_date` (optionally only `group_name`) set to `status`.
+    Returns the updated lessons plus any lesson ids that were not found.
+    """
+    result = await db.run_sync(_bulk_update_lesson_status, payload)
+    for lesson in result["lessons"]:
+        await publish_event_async("lesson.updated", **lesson)
+    return result
+
+
+def _bulk_update_lesson_status(db: Session, payload: schemas.BulkLessonStatusUpdate):
+    if payload.updates is not None:
+        if payload.lesson_date is not None:
+            raise HTTPException(400, "Send either updates or lesson_date, not both")
+        statuses = {item.lesson_id: item.status for item in payload.updates}
+        updated_ids = set_lesson_statuses(db, statuses)
+        missing = sorted(set(statuses) - set(updated_ids))
+    elif payload.lesson_date is not None and payload.status is not None:
+        updated_ids = set_day_status(db, payload.lesson_date, payload.status, payload.group_name)
+        missing = []
+    else:
+        raise HTTPException(400, "Send updates, or lesson_date with status")
+
+    lessons = fetch_updated_lessons(db, updated_ids)
+    if lessons:
+        bump_data_version(db, STUDENTS)
+    db.commit()
+    return {"updated": len(lessons), "lessons": lessons, "missing": missing}
     
 # =========================================================
-# EXPORT DASHBOARD (UNCHANGED CORE LOGIC)
+# EXPORT DASHBOARD
 # =========================================================
+def parse_export_filters(group: str, day: str):
+    """group / day query params as sent by the dashboard ("" or "all" = no filter)."""
+    group_name = group if group and group != "all" else None
+    if not day or day == "all":
+        return group_name, None
+    try:
+        lesson_day = int(day)
+    except ValueError:
+        raise HTTPException(400, "day must be a weekday number 0-6")
+    if not 0 <= lesson_day <= 6:
+        raise HTTPException(400, "day must be a weekday number 0-6")
+    return group_name, lesson_day
+
+
 @extra_router.get("/export/dashboard.xlsx")
 def export_dashboard_xlsx(
     tab: str = Query("all"),   # all | 4 | 8
     group: str = Query(""),
     day: str = Query(""),
-    db: Session = Depends(get_db)
+    layout: str = Query("single"),   # single | multi (sheet per package size / group)
+    db: Session = Depends(get_read_db)
 ):
-    # determine how many lesson columns to export
-    max_lessons = 4 if tab == "4" else 8
-
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Dashboard"
-
-    header = ["Name", "CEFR", "Group", "Lesson Day", "Package Size"]
-    for i in range(1, max_lessons + 1):
-        header.append(f"L{i}")
-    header.append("Paid")
-
-    ws.append(header)
-
-    students = db.query(models.Student).order_by(models.Student.name).all()
-
-    for s in students:
-        first_row_for_student = True
-
-        for pkg in s.packages or []:
-            # tab filter
-            if tab == "4" and pkg.package_size != 4:
-                continue
-            if tab == "8" and pkg.package_size != 8:
-                continue
-
-            regular_lessons = [l for l in pkg.lessons if not l.is_makeup]
-            makeup_lessons = [l for l in pkg.lessons if l.is_makeup]
-
-            regular_map = {
-                l.lesson_number: l.lesson_date.isoformat()
-                for l in regular_lessons
-            }
-
-            row = [
-                s.name if first_row_for_student else "",
-                s.cefr or "" if first_row_for_student else "",
-                s.group_name or "" if first_row_for_student else "",
-                DAY_LABELS[s.lesson_day_1] if first_row_for_student else "",
-                pkg.package_size if first_row_for_student else "",
-            ]
-
-            for i in range(1, max_lessons + 1):
-                row.append("")
-
-            row.append("Paid" if pkg.payment_status else "Unpaid")
-            ws.append(row)
-            current_row = ws.max_row 
-            for i in range(1, max_lessons + 1):
-                lesson = next((l for l in regular_lessons if l.lesson_number == i), None)
-                format_lesson_cell(ws, current_row, 5 + i, lesson)
-            first_row_for_student = False
-            
-            if makeup_lessons:
-                mu_row = ["", "", "", "", "MU"]
-                for _ in range(max_lessons):
-                    mu_row.append("")
-                mu_row.append("")
-                ws.append(mu_row)
-
-                mu_row_idx = ws.max_row
-
-                for idx, lesson in enumerate(makeup_lessons):
-                    col = 6 + idx
-                    format_lesson_cell(ws, mu_row_idx, col, lesson)
+    group_name, lesson_day = parse_export_filters(group, day)
+    if layout not in ("single", "multi"):
+        raise HTTPException(400, "layout must be single or multi")
+
+    # write-only workbook spooled to a temp file, then streamed in chunks
+    spool = tempfile.TemporaryFile()
+    try:
+        if layout == "multi":
+            write_multi_sheet_xlsx(db, spool)
+            filename = MULTI_SHEET_FILENAME
+        else:
+            write_dashboard_xlsx(db, spool, tab=tab, group_name=group_name, lesson_day=lesson_day)
+            filename = export_filename(tab)
+    except Exception:
+        spool.close()
+        raise
 
+    return StreamingResponse(
+        iter_file_chunks(spool),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
-    # ✅ SAVE & RETURN — OUTSIDE ALL LOOPS
-    stream = io.BytesIO()
-    wb.save(stream)
-    stream.seek(0)
 
-    filename = (
-        "dashboard_all.xlsx" if tab == "all"
-        else f"dashboard_{tab}_lesson.xlsx"
+@extra_router.get("/export/dashboard.csv")
+def export_dashboard_csv(
+    request: Request,
+    tab: str = Query("all"),   # all | 4 | 8
+    group: str = Query(""),
+    day: str = Query(""),
+):
+    """Same rows as the XLSX export, streamed from a server-side cursor."""
+    group_name, lesson_day = parse_export_filters(group, day)
+    return StreamingResponse(
+        stream_with_session(
+            iter_dashboard_csv, tab=tab, group_name=group_name, lesson_day=lesson_day,
+            session_factory=read_session_factory(request),
+        ),
+        media_type=CSV_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={export_filename(tab, 'csv')}"},
     )
 
+
+@extra_router.get("/export/lessons.parquet")
+def export_lessons_parquet(
+    request: Request,
+    tab: str = Query("all"),   # all | 4 | 8
+    group: str = Query(""),
+    day: str = Query(""),
+):
+    """One row per lesson with student, package and status columns."""
+    if exports.pa is None:
+        raise HTTPException(501, "Parquet export needs pyarrow installed")
+    group_name, lesson_day = parse_export_filters(group, day)
+    filename = "lessons_all.parquet" if tab == "all" else f"lessons_{tab}_lesson.parquet"
     return StreamingResponse(
-        stream,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        stream_with_session(
+            iter_lessons_parquet, tab=tab, group_name=group_name, lesson_day=lesson_day,
+            session_factory=read_session_factory(request),
+        ),
+        media_type=PARQUET_MEDIA_TYPE,
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
-def format_lesson_cell(ws, row_idx, col_idx, lesson):
-    if not lesson:
-        return
 
-    text = lesson.lesson_date.isoformat()
+# =========================================================
+# BACKGROUND EXPORT JOBS
+# =========================================================
+EXPORT_JOB_ID_PATTERN = "^[0-9a-f]{24}$"
 
-    if lesson.is_makeup:
-        text += " (MU)"
-        ws.cell(row=row_idx, column=col_idx).fill = FILL_MU
 
-    if lesson.status == "leave":
-        text += " (L)"
-        ws.cell(row=row_idx, column=col_idx).fill = FILL_LEAVE
+def _export_job_out(job: Dict) -> Dict:
+    job = {k: v for k, v in job.items() if k != "leader"}
+    job["download_url"] = (
+        f"/export/jobs/{job['job_id']}/download" if job["status"] == "done" else None
+    )
+    return job
+
+
+@extra_router.post("/export/jobs", status_code=202)
+def submit_export_job(payload: ExportJobPayload, db: Session = Depends(get_db)):
+    """
+    Start (or join) a background export. Identical requests at the same data
+    version share one build and one cached file.
+    """
+    if payload.format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(400, f"format must be one of {', '.join(EXPORT_MEDIA_TYPES)}")
+    if payload.format == "parquet" and exports.pa is None:
+        raise HTTPException(501, "Parquet export needs pyarrow installed")
+    group_name, lesson_day = parse_export_filters(payload.group, payload.day)
+
+    job = claim_export_job(db, payload.format, payload.tab, group_name, lesson_day)
+    if job["leader"]:
+        try:
+            tasks.submit_task(tasks.build_export_task, job["job_id"])
+        except Exception as e:
+            abandon_export_job(job["job_id"], f"could not queue export: {e}")
+            raise HTTPException(503, "Export queue unavailable")
+        job = export_job_status(job["job_id"]) or job
+    return _export_job_out(job)
+
+
+@extra_router.get("/export/jobs/{job_id}")
+def get_export_job(job_id: str = Path(..., pattern=EXPORT_JOB_ID_PATTERN)):
+    job = export_job_status(job_id)
+    if not job:
+        raise HTTPException(404, "Export job not found")
+    return _export_job_out(job)
+
+
+@extra_router.get("/export/jobs/{job_id}/download")
+def download_export_job(job_id: str = Path(..., pattern=EXPORT_JOB_ID_PATTERN)):
+    job = export_job_status(job_id)
+    if not job:
+        raise HTTPException(404, "Export job not found")
+    path = export_job_file(job_id)
+    if path is None:
+        raise HTTPException(409, f"Export job is {job['status']}")
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[job["format"]],
+        filename=job["filename"],
+    )
 
-    if lesson.status == "attended":
-        text += " ✓"
-        ws.cell(row=row_idx, column=col_idx).fill = FILL_ATTENDED
 
-    ws.cell(row=row_idx, column=col_idx).value = text
-        
 @extra_router.delete("/students/packages/{package_id}")
 def delete_package(package_id: int, db: Session = Depends(get_db)):
     pkg = crud.get_package(db, package_id)
@@ -387,67 +638,78 @@ def delete_package(package_id: int, db: Session = Depends(get_db)):
     #     raise HTTPException(400, "Cannot delete a paid package")
 
     # Delete lessons first (safe)
-    db.query(models.Lesson).filter(
-        models.Lesson.package_id == pkg.package_id
-    ).delete(synchronize_session=False)
+    bulk_delete_with_tombstones(
+        db,
+        db.query(models.Lesson).filter(models.Lesson.package_id == pkg.package_id),
+        "lesson",
+        models.Lesson.lesson_id,
+    )
 
+    student_id = pkg.student_id
     db.delete(pkg)
+    bump_data_version(db, STUDENTS)
     db.commit()
+    publish_event("package.deleted", package_id=package_id, student_id=student_id)
 
     return {"status": "deleted", "package_id": package_id}
 
 @extra_router.post("/students/packages/{package_id}/add_makeup")
-def add_makeup_lesson(
+async def add_makeup_lesson(
     package_id: int,
     payload: MakeupPayload,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    pkg = crud.get_package(db, package_id)
+    pkg = await db.get(models.Package, package_id)
     if not pkg:
         raise HTTPException(404, "Package not found")
 
-    student = pkg.student
+    student = await db.get(models.Student, pkg.student_id)
     if not student:
         raise HTTPException(404, "Student not found")
 
     makeup_date = payload.lesson_date
 
     # 1️⃣ check closure
-    blocked = load_closure_dates(db)
-    if makeup_date in blocked:
+    closed = await db.scalar(select(exists().where(
+        models.Closure.start_date <= makeup_date, models.Closure.end_date >= makeup_date
+    )))
+    if closed:
         raise HTTPException(400, "Selected date is a closure")
 
-    # 2️⃣ check duplicate date for this student
-    existing = (
-        db.query(models.Lesson)
-        .join(models.Package)
-        .filter(
-            models.Package.student_id == student.student_id,
-            models.Lesson.lesson_date == makeup_date
-        )
-        .first()
+    # 2️⃣ add lesson (append to package) in one INSERT; a duplicate date
+    # for this student is caught by unique_lesson_per_student_date
+    next_number = (
+        select(func.coalesce(func.max(models.Lesson.lesson_number), 0) + 1)
+        .where(models.Lesson.package_id == pkg.package_id)
+        .scalar_subquery()
     )
-
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail="Student already has a lesson on this date"
-        )
-        
-    # 3️⃣ add lesson (append to package)
-    new_lesson = models.Lesson(
-        package_id=pkg.package_id,
-        lesson_number=len(pkg.lessons) + 1,
-        lesson_date=makeup_date,
-        status="scheduled",
-        is_makeup=True,
-        is_manual_override=True,
-        is_first=False,
+    async with lesson_date_conflict_400_async(db):
+        change_seq = await db.run_sync(current_change_seq)
+        new_lesson = (await db.execute(
+            insert(models.Lesson)
+            .values(
+                package_id=pkg.package_id,
+                student_id=student.student_id,
+                lesson_number=next_number,
+                lesson_date=makeup_date,
+                status="scheduled",
+                is_makeup=True,
+                is_manual_override=True,
+                is_first=False,
+                updated_at=datetime.utcnow(),
+                change_seq=change_seq,
+            )
+            .returning(models.Lesson.lesson_id, models.Lesson.lesson_number, models.Lesson.student_id)
+        )).one()
+
+        await db.run_sync(bump_data_version, STUDENTS)
+        await db.commit()
+    await publish_event_async(
+        "lesson.created", lesson_id=new_lesson.lesson_id, package_id=package_id,
+        student_id=new_lesson.student_id, lesson_number=new_lesson.lesson_number,
+        lesson_date=makeup_date, status="scheduled", is_makeup=True,
     )
 
-    db.add(new_lesson)
-    db.commit()
-
     return {
         "status": "ok",
         "lesson_date": makeup_date.isoformat()
@@ -455,16 +717,16 @@ def add_makeup_lesson(
     
     
 @extra_router.patch("/lessons/{lesson_id}", response_model=schemas.LessonOut)
-def edit_lesson(
+async def edit_lesson(
     lesson_id: int,
     payload: LessonEditPayload,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    lesson = db.query(models.Lesson).filter_by(lesson_id=lesson_id).first()
+    lesson = await db.get(models.Lesson, lesson_id)
     if not lesson:
         raise HTTPException(404, "Lesson not found")
 
-    student = lesson.package.student
+    student = await db.get(models.Student, lesson.student_id)
 
     # -------------------------------
     # 🚫 BLOCK make-up on regular days
@@ -482,34 +744,10 @@ def edit_lesson(
                 detail="Make-up cannot be scheduled on regular lesson days"
             )
             
-    lesson = db.query(models.Lesson).filter_by(lesson_id=lesson_id).first()
-    if not lesson:
-        raise HTTPException(404, "Lesson not found")
-
-    student = lesson.package.student
-
-    # 🚫 BLOCK duplicate lesson date for the same student
-    if payload.lesson_date is not None:
-        conflict = (
-            db.query(models.Lesson)
-            .join(models.Package)
-            .filter(
-                models.Package.student_id == student.student_id,
-                models.Lesson.lesson_date == payload.lesson_date,
-                models.Lesson.lesson_id != lesson.lesson_id,  # 👈 exclude self
-            )
-            .first()
-        )
-
-        if conflict:
-            raise HTTPException(
-                status_code=400,
-                detail="Student already has a lesson on this date"
-            )
-
-
     # ---------------------------------------
-    # APPLY UPDATES (NO BLOCKING HERE)
+    # APPLY UPDATES
+    # (a duplicate lesson date for the same student is rejected by
+    # unique_lesson_per_student_date on commit)
     # ---------------------------------------
     if payload.lesson_date is not None:
         lesson.lesson_date = payload.lesson_date
@@ -524,18 +762,19 @@ def edit_lesson(
     if payload.is_manual_override is not None:
         lesson.is_manual_override = payload.is_manual_override
 
-    db.commit()
-    db.refresh(lesson)
+    async with lesson_date_conflict_400_async(db):
+        await db.run_sync(bump_data_version, STUDENTS)
+        await db.commit()
+    await db.refresh(lesson)
+    await publish_event_async("lesson.updated", **lesson_updated_fields(lesson))
     return lesson
 
 @extra_router.delete("/lessons/{lesson_id}")
-def delete_lesson(
+async def delete_lesson(
     lesson_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    lesson = db.query(models.Lesson).filter(
-        models.Lesson.lesson_id == lesson_id
-    ).first()
+    lesson = await db.get(models.Lesson, lesson_id)
 
     if not lesson:
         raise HTTPException(404, "Lesson not found")
@@ -546,7 +785,10 @@ def delete_lesson(
             detail="Only make-up lessons can be deleted individually"
         )
 
-    db.delete(lesson)
-    db.commit()
+    package_id = lesson.package_id
+    await db.delete(lesson)
+    await db.run_sync(bump_data_version, STUDENTS)
+    await db.commit()
+    await publish_event_async("lesson.deleted", lesson_id=lesson_id, package_id=package_id)
 
     return {"status": "deleted", "lesson_id": lesson_id}
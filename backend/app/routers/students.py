@@ -1,13 +1,31 @@
 # backend/app/routers/students.py
-from fastapi import APIRouter, HTTPException, Depends
+import logging
+
+from fastapi import APIRouter, HTTPException, Depends, File, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Any
+from typing import Any, Optional
 
 from .. import crud, schemas, models
-from ..db import get_db
+from ..db import get_async_read_db, get_db
+from ..services.dashboard_read import dashboard_statement, shape_dashboard_rows
+from ..services.change_tracking import bulk_delete_with_tombstones
+from ..services.end_date_prune import prune_to_end_dates
+from ..services.event_bus import publish_event
+from ..services.student_import import import_students, read_import_file, validate_import_rows
+from ..services.data_version import (
+    bump_data_version,
+    get_data_version,
+    make_etag,
+    etag_matches,
+    STUDENTS,
+)
 from ..date_utils import parse_iso_date, ensure_end_after_start
 
 router = APIRouter(prefix="/students", tags=["students"])
+logger = logging.getLogger(__name__)
 
 # ... other endpoints (GET / POST etc.)
 @router.post("/", response_model=schemas.StudentOut)
@@ -15,21 +33,144 @@ def create_student(payload: schemas.StudentCreate, db: Session = Depends(get_db)
     student = crud.create_student(db, payload)
     return student
 
+@router.post("/import")
+def import_students_file(
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """
+    Create students from a .csv or .xlsx sheet (one row per student, same
+    fields as POST /students). All rows are validated first; valid rows are
+    scheduled together and inserted in batches, invalid rows are reported
+    by spreadsheet row number. dry_run=true validates and schedules only.
+    """
+    content = file.file.read()
+    try:
+        df = read_import_file(file.filename, content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not read file: {e}")
+
+    valid, errors = validate_import_rows(df)
+    created, failed = import_students(db, valid, dry_run=dry_run)
+    errors = sorted(errors + failed, key=lambda e: e["row"])
+
+    if created and not dry_run:
+        publish_event("students.imported", count=len(created))
+
+    return {
+        "dry_run": dry_run,
+        "total_rows": len(df),
+        "created": len(created),
+        "failed": len(errors),
+        "errors": errors,
+        "students": created,
+    }
+
 @router.get("", response_model=list[schemas.StudentOut])
 @router.get("/", response_model=list[schemas.StudentOut])
-def list_students(db: Session = Depends(get_db)):
-    return crud.get_all_students(db)
+async def list_students(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    package_size: Optional[int] = Query(None),
+    group: Optional[str] = Query(None),
+    day: Optional[int] = Query(None, ge=0, le=6),
+    status: Optional[str] = Query(None),
+    has_unpaid: Optional[bool] = Query(None),
+    latest_packages: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Without parameters returns every student (unchanged behaviour).
+    With `limit`, pages by (name, student_id); the next page's cursor is
+    returned in the X-Next-Cursor header.
+    Answers If-None-Match with 304 after a single version lookup.
+    """
+    etag = make_etag(STUDENTS, await db.run_sync(get_data_version, STUDENTS), request)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    try:
+        # built on the sync facade only (nothing executes there)
+        stmt = dashboard_statement(
+            db.sync_session,
+            limit=limit,
+            cursor=cursor,
+            package_size=package_size,
+            group_name=group,
+            lesson_day=day,
+            status=status,
+            has_unpaid=has_unpaid,
+            latest_packages=latest_packages,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = (await db.execute(stmt)).all()
+    # grouping every row is CPU work; keep it off the event loop
+    students, next_cursor = await run_in_threadpool(shape_dashboard_rows, rows, limit)
+
+    # rows are already shaped like StudentOut; skip re-validation
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return JSONResponse(content=students, headers=headers)
 
 @router.delete("/{student_id}")
 def delete_student(student_id: int, db: Session = Depends(get_db)):
     student = crud.get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    # optional: delete cascade packages/lessons (your models may already cascade)
+    # delete lessons and packages explicitly so each leaves a tombstone
+    package_ids = db.query(models.Package.package_id).filter(models.Package.student_id == student_id)
+    bulk_delete_with_tombstones(
+        db,
+        db.query(models.Lesson).filter(models.Lesson.package_id.in_(package_ids.scalar_subquery())),
+        "lesson",
+        models.Lesson.lesson_id,
+    )
+    bulk_delete_with_tombstones(
+        db,
+        db.query(models.Package).filter(models.Package.student_id == student_id),
+        "package",
+        models.Package.package_id,
+    )
+    db.expire(student, ["packages"])
     db.delete(student)
+    bump_data_version(db, STUDENTS)
     db.commit()
     return {"status": "ok", "student_id": student_id}
 
+@router.post("/end_date")
+def set_end_dates(payload: schemas.StudentEndDateUpdate, db: Session = Depends(get_db)):
+    """
+    Set one end_date for many students and prune their unpaid packages to
+    it in one transaction (same rules as PATCH /students/{id}).
+    """
+    students = db.query(models.Student).filter(models.Student.student_id.in_(payload.student_ids)).all()
+    found = {s.student_id for s in students}
+    missing = sorted(set(payload.student_ids) - found)
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Students not found: {missing}")
+
+    try:
+        for student in students:
+            ensure_end_after_start(student.start_date, payload.end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} (student {student.student_id})")
+
+    for student in students:
+        student.end_date = payload.end_date
+    db.flush()
+    result = prune_to_end_dates(db, sorted(found))
+
+    bump_data_version(db, STUDENTS)
+    db.commit()
+    return dict(result, student_ids=sorted(found), end_date=payload.end_date)
+
 @router.patch("/{student_id}", response_model=schemas.StudentOut)
 def update_student(student_id: int, payload: schemas.StudentUpdate, db: Session = Depends(get_db)):
     student = crud.get_student(db, student_id)
@@ -37,23 +178,26 @@ def update_student(student_id: int, payload: schemas.StudentUpdate, db: Session
         raise HTTPException(status_code=404, detail="Student not found")
 
     # apply updates
-    for k, v in payload.dict(exclude_unset=True).items():
+    changes = payload.dict(exclude_unset=True)
+    for k, v in changes.items():
         setattr(student, k, v)
 
+    # a new end_date prunes unpaid packages past it in the same
+    # transaction: if pruning fails, the update is not saved either
+    if changes.get("end_date") is not None:
+        db.flush()
+        try:
+            prune_to_end_dates(db, [student_id])
+        except Exception:
+            db.rollback()
+            logger.exception("Pruning packages to the new end_date of student %s failed", student_id)
+            raise HTTPException(
+                status_code=500,
+                detail="Could not prune packages to the new end_date; the student was not updated",
+            )
+
+    bump_data_version(db, STUDENTS)
     db.commit()
-    db.refresh(student)
 
-    # 🔴 IMPORTANT: re-fetch after prune / commit side-effects
+    # re-fetch after prune / commit side-effects
     return crud.get_student(db, student_id)
-
-
-    # if end_date was present in payload (explicitly changed), prune packages
-    if hasattr(payload, "end_date"):
-        try:
-            from ..crud import prune_packages_to_end_date
-            prune_result = prune_packages_to_end_date(db, student, student.end_date)
-            # Log the prune result - you can return this to the frontend if you want
-            print("Prune result:", prune_result)
-        except Exception as e:
-            # log and continue (do not fail PATCH because of pruning)
-            print("Error pruning packages after end_date update:", e)
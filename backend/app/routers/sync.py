@@ -0,0 +1,138 @@
+# backend/app/routers/sync.py
+import base64
+import json
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from .. import models
+from ..services.data_version import get_data_version, CHANGES
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+# payload key -> (model, tombstone entity)
+SYNCED = {
+    "students": (models.Student, "student"),
+    "packages": (models.Package, "package"),
+    "lessons": (models.Lesson, "lesson"),
+    "closures": (models.Closure, "closure"),
+}
+
+
+# rows per /sync/changes page, across all tables
+SYNC_PAGE_SIZE = 1000
+SYNC_MAX_PAGE_SIZE = 10000
+
+
+def _encode_cursor(version: int, table: int, after: Optional[Tuple[int, int]]) -> str:
+    raw = json.dumps([version, table, list(after) if after else None]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, int, Optional[Tuple[int, int]]]:
+    try:
+        version, table, after = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not 0 <= int(table) < len(SYNCED):
+            raise ValueError
+        return int(version), int(table), (int(after[0]), int(after[1])) if after else None
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def _changed_rows(db: Session, model, since: int, after: Optional[Tuple[int, int]], limit: int):
+    """
+    Up to `limit` rows of `model` changed after `since`, keyed by attribute
+    name, in (change_seq, primary key) order starting after `after`. One
+    transaction stamps all its rows with the same change_seq, so the key
+    breaks ties.
+    """
+    mapper = inspect(model)
+    pk = mapper.primary_key[0]
+    seq = func.coalesce(model.change_seq, 0)
+    stmt = select(*[a.columns[0].label(a.key) for a in mapper.column_attrs])
+    if since:
+        stmt = stmt.where(model.change_seq > since)
+    # since=0 is a full snapshot, including rows written before change tracking
+    if after:
+        stmt = stmt.where(or_(seq > after[0], and_(seq == after[0], pk > after[1])))
+    return [dict(r._mapping) for r in db.execute(stmt.order_by(seq, pk).limit(limit))]
+
+
+def _row_position(model, row: Dict) -> Tuple[int, int]:
+    mapper = inspect(model)
+    pk_key = mapper.get_property_by_column(mapper.primary_key[0]).key
+    return row["change_seq"] or 0, row[pk_key]
+
+
+@router.get("/changes")
+def sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Rows created/updated and ids deleted after change version `since`.
+    since=0 returns a full snapshot. Pass the returned `version` as the
+    next `since`.
+
+    At most `limit` rows per call. While `next_cursor` is set, call again
+    with the same `since` and `cursor=next_cursor`; deleted ids come with
+    the first page. Every page of one pass returns the same `version`.
+
+    `version` is read before the first page's SELECTs and never advanced
+    from the rows: a transaction committing between those reads may show
+    up in some tables only, and its rows must come back on the next pass.
+    A row updated mid-pass only moves forward in (change_seq, id) order,
+    so it is sent later in the pass or in the next one, never skipped.
+    Rows above `version` may be sent twice; applying them again is harmless.
+    """
+    if cursor:
+        try:
+            version, start, after = _decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        version, start, after = get_data_version(db, CHANGES), 0, None
+
+    keys = list(SYNCED)
+    changes = {key: [] for key in keys}
+    next_cursor = None
+    remaining = limit
+    for i in range(start, len(keys)):
+        model = SYNCED[keys[i]][0]
+        # one extra row tells whether this table has more
+        rows = _changed_rows(db, model, since, after, remaining + 1)
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            position = _row_position(model, rows[-1]) if rows else after
+            changes[keys[i]] = rows
+            next_cursor = _encode_cursor(version, i, position)
+            break
+        changes[keys[i]] = rows
+        remaining -= len(rows)
+        after = None
+
+    deleted = {key: [] for key in keys}
+    if since and not cursor:
+        entity_keys = {entity: key for key, (_, entity) in SYNCED.items()}
+        rows = db.execute(
+            select(models.Tombstone.entity, models.Tombstone.row_id, models.Tombstone.change_seq)
+            .where(models.Tombstone.change_seq > since)
+            .order_by(models.Tombstone.change_seq)
+        )
+        for r in rows:
+            if r.entity in entity_keys:
+                deleted[entity_keys[r.entity]].append(r.row_id)
+
+    return {
+        "since": since,
+        "version": version,
+        "full": since == 0,
+        "changes": changes,
+        "deleted": deleted,
+        "next_cursor": next_cursor,
+    }
@@ -21,6 +21,18 @@ class LessonOut(BaseModel):
 
 class LessonStatusUpdate(BaseModel):
     status: Literal["scheduled", "attended", "leave", "cancelled"]
+
+class LessonStatusItem(BaseModel):
+    lesson_id: int
+    status: Literal["scheduled", "attended", "leave", "cancelled"]
+
+class BulkLessonStatusUpdate(BaseModel):
+    # either explicit (lesson_id, status) pairs ...
+    updates: Optional[List[LessonStatusItem]] = None
+    # ... or every lesson on lesson_date (optionally one group) set to status
+    lesson_date: Optional[date] = None
+    group_name: Optional[str] = None
+    status: Optional[Literal["scheduled", "attended", "leave", "cancelled"]] = None
     
 # --------------------------------------------
 # Package Schema
@@ -80,6 +92,10 @@ class StudentUpdate(BaseModel):
     end_date: Optional[date] = None  
     status: Optional[str] = None
     
+class StudentEndDateUpdate(BaseModel):
+    student_ids: List[int]
+    end_date: date   # required: clear an end date with PATCH /students/{id}
+
 class LessonEditPayload(BaseModel):
     lesson_date: Optional[date] = None
     is_manual_override: Optional[bool] = None
@@ -0,0 +1,86 @@
+# backend/app/services/change_tracking.py
+from datetime import datetime
+from typing import Iterable
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from ..models import Student, Package, Lesson, Closure, Tombstone
+from .data_version import bump_data_version, CHANGES
+
+# entity name used in tombstones and /sync payloads
+TRACKED = {
+    Student: "student",
+    Package: "package",
+    Lesson: "lesson",
+    Closure: "closure",
+}
+
+# ---------------------------------------------------------
+# Change sequence for the current transaction
+# ---------------------------------------------------------
+def current_change_seq(db: Session) -> int:
+    """
+    One sequence value per transaction. Drawing it locks the counter row
+    until commit, so sequence order matches commit order and a client that
+    synced up to N can never miss a later-committed change below N.
+
+    The price is that write transactions touching tracked rows run one at
+    a time from their first tracked write until commit, so keep them
+    short (draw the value late, no slow work before commit). A database
+    SEQUENCE would not serialize them, but its values commit out of order:
+    /sync/changes would then need a safe horizon below the oldest open
+    transaction instead of the counter.
+    """
+    seq = db.info.get("change_seq")
+    if seq is None:
+        seq = bump_data_version(db, CHANGES)
+        db.info["change_seq"] = seq
+    return seq
+
+
+def record_tombstones(db: Session, entity: str, row_ids: Iterable[int]) -> None:
+    """Tombstones for rows removed with bulk deletes (not seen by the ORM)."""
+    row_ids = list(row_ids)
+    if not row_ids:
+        return
+    seq = current_change_seq(db)
+    now = datetime.utcnow()
+    # Core executemany: one batched INSERT, no ids to fetch back
+    db.execute(insert(Tombstone), [
+        {"entity": entity, "row_id": rid, "change_seq": seq, "deleted_at": now}
+        for rid in row_ids
+    ])
+
+# ---------------------------------------------------------
+# Session hooks: stamp ORM writes, tombstone ORM deletes
+# ---------------------------------------------------------
+@event.listens_for(Session, "before_flush")
+def _stamp_changes(session: Session, flush_context, instances):
+    changed = [o for o in list(session.new) + list(session.dirty) if type(o) in TRACKED]
+    deleted = [o for o in session.deleted if type(o) in TRACKED]
+    if not changed and not deleted:
+        return
+
+    seq = current_change_seq(session)
+    now = datetime.utcnow()
+    for obj in changed:
+        obj.change_seq = seq
+        obj.updated_at = now
+    for obj in deleted:
+        row_id = session.identity_key(instance=obj)[1][0]
+        session.add(Tombstone(entity=TRACKED[type(obj)], row_id=row_id, change_seq=seq, deleted_at=now))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset_change_seq(session: Session):
+    session.info.pop("change_seq", None)
+
+
+def bulk_delete_with_tombstones(db: Session, query, entity: str, id_column) -> list:
+    """query.delete() that also leaves tombstones for the deleted ids."""
+    ids = [row[0] for row in query.with_entities(id_column).all()]
+    record_tombstones(db, entity, ids)
+    if ids:
+        query.delete(synchronize_session=False)
+    return ids
@@ -0,0 +1,267 @@
+# backend/app/services/closure_impact.py
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Set, Tuple
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from ..models import Lesson, Package
+from .data_version import bump_data_version, STUDENTS
+from .change_tracking import current_change_seq
+from .lesson_writer import FIXED_STATUSES
+from .scheduler import (
+    ClosureCalendar,
+    iter_lesson_dates,
+    lesson_weekdays,
+    load_closure_calendar,
+    SCHEDULE_HORIZON,
+)
+
+
+# moved lessons are parked on distinct days from here before their new
+# dates are written, so (student_id, lesson_date) never collides mid-batch
+PARKING_DATE = date(1900, 1, 1)
+
+
+def _is_fixed(lesson: Lesson) -> bool:
+    return bool(lesson.is_manual_override or lesson.is_makeup or lesson.status in FIXED_STATUSES)
+
+# ---------------------------------------------------------
+# Find packages whose lessons span the closure window
+# ---------------------------------------------------------
+def find_affected_package_ids(db: Session, window_start: date, window_end: date) -> List[int]:
+    """
+    Packages with a lesson on/after window_start and a lesson on/before
+    window_end, i.e. whose schedule spans the window. Range scan on
+    lessons.lesson_date, probed per package through (package_id, ...).
+    """
+    earlier = aliased(Lesson)
+    rows = (
+        db.query(Lesson.package_id)
+        .filter(
+            Lesson.lesson_date >= window_start,
+            exists().where(
+                earlier.package_id == Lesson.package_id,
+                earlier.lesson_date <= window_end,
+            ),
+        )
+        .distinct()
+        .all()
+    )
+    return [r.package_id for r in rows]
+
+# ---------------------------------------------------------
+# Re-slot the movable lessons of one package
+# ---------------------------------------------------------
+def _reslot_package(
+    pkg: Package,
+    move_from: date,
+    start_from: date,
+    calendar: ClosureCalendar,
+    taken: Set[date],
+    changes: List[Dict],
+    unplaced: List[int],
+) -> date | None:
+    """
+    Move the package's movable lessons dated on/after move_from onto the
+    open lesson days from start_from, skipping the student's `taken` dates.
+    Appends to `changes` / `unplaced` and returns the last date the package
+    now occupies (None if nothing moved).
+    """
+    student = pkg.student
+    lessons = sorted(pkg.lessons, key=lambda l: l.lesson_number)
+    movable = [l for l in lessons if not _is_fixed(l) and l.lesson_date >= move_from]
+    if not movable:
+        return None
+
+    last_day = start_from + SCHEDULE_HORIZON
+    if student.end_date and student.end_date < last_day:
+        last_day = student.end_date
+
+    slots = (
+        d for d in iter_lesson_dates(
+            start_from, lesson_weekdays(student, pkg.package_size), calendar, last_day
+        )
+        if d not in taken
+    )
+
+    last = None
+    for lesson in movable:
+        new_date = next(slots, None)
+        if new_date is None:
+            unplaced.append(lesson.lesson_id)
+            continue
+        last = new_date
+        if new_date != lesson.lesson_date:
+            changes.append({
+                "lesson_id": lesson.lesson_id,
+                "package_id": pkg.package_id,
+                "student_id": pkg.student_id,
+                "lesson_number": lesson.lesson_number,
+                "old_date": lesson.lesson_date,
+                "new_date": new_date,
+            })
+    return last
+
+# ---------------------------------------------------------
+# MAIN FUNCTION: compute (and optionally apply) the impact
+# ---------------------------------------------------------
+def reschedule_closure_windows(
+    db: Session,
+    windows: Sequence[Tuple[date, date]],
+    dry_run: bool = True,
+) -> Dict:
+    """
+    Reschedule lessons affected by closures added, edited or removed in
+    `windows`. Closures must already reflect the new state in this session.
+    Only packages spanning the window are re-slotted (plus later packages of
+    the same student when they would now collide); fixed lessons stay put.
+
+    With dry_run the diff is returned and nothing is written; otherwise all
+    updates are issued as one batch. Does not commit: the caller commits the
+    closure change, the moved lessons and both data versions together. A
+    new date that a lesson outside the re-slotted ones already holds raises
+    IntegrityError (see is_lesson_date_conflict).
+    """
+    window_start = min(s for s, _ in windows)
+    window_end = max(e for _, e in windows)
+
+    affected_ids = find_affected_package_ids(db, window_start, window_end)
+    result = {
+        "dry_run": dry_run,
+        "window": {"start_date": window_start, "end_date": window_end},
+        "packages": [],
+        "changes": [],
+        "unplaced_lesson_ids": [],
+    }
+    if not affected_ids:
+        return result
+
+    affected = (
+        db.query(Package)
+        .options(selectinload(Package.student), selectinload(Package.lessons))
+        .filter(Package.package_id.in_(affected_ids))
+        .all()
+    )
+    student_ids = {p.student_id for p in affected}
+
+    # later packages of the same students, only touched if they now collide
+    later = (
+        db.query(Package)
+        .options(selectinload(Package.student), selectinload(Package.lessons))
+        .filter(
+            Package.student_id.in_(student_ids),
+            Package.package_id.notin_(affected_ids),
+            exists().where(
+                Lesson.package_id == Package.package_id,
+                Lesson.lesson_date > window_end,
+            ),
+        )
+        .all()
+    )
+
+    def _first_date(p: Package) -> date:
+        return min((l.lesson_date for l in p.lessons), default=date.max)
+
+    affected.sort(key=lambda p: (p.student_id, _first_date(p), p.package_id))
+    later_by_student: Dict[int, List[Package]] = {}
+    for p in sorted(later, key=lambda p: (_first_date(p), p.package_id)):
+        later_by_student.setdefault(p.student_id, []).append(p)
+
+    # dates a re-slotted lesson must not land on: every lesson of the
+    # student (other packages, make-ups, attended/leave) except the movable
+    # ones of the packages loaded here, which the floor logic below orders
+    loaded = {p.package_id: p for p in affected + later}
+    taken_by_student: Dict[int, Set[date]] = {sid: set() for sid in student_ids}
+    for pkg in loaded.values():
+        taken_by_student[pkg.student_id].update(l.lesson_date for l in pkg.lessons if _is_fixed(l))
+    others = db.query(Lesson.student_id, Lesson.lesson_date).filter(
+        Lesson.student_id.in_(student_ids),
+        Lesson.package_id.notin_(list(loaded)),
+    )
+    for r in others:
+        taken_by_student[r.student_id].add(r.lesson_date)
+
+    last_known = max(
+        (l.lesson_date for p in loaded.values() for l in p.lessons),
+        default=window_end,
+    )
+    calendar = load_closure_calendar(db, window_start, max(last_known, window_end) + SCHEDULE_HORIZON)
+    changes: List[Dict] = []
+    unplaced: List[int] = []
+    touched: List[Package] = []
+
+    floor_by_student: Dict[int, date] = {}
+    for pkg in affected:
+        student = pkg.student
+        start_from = max(window_start, student.start_date or window_start)
+        floor = floor_by_student.get(pkg.student_id)
+        if floor and floor > start_from:
+            start_from = floor
+        last = _reslot_package(
+            pkg, window_start, start_from, calendar, taken_by_student[pkg.student_id], changes, unplaced
+        )
+        touched.append(pkg)
+        if last:
+            floor_by_student[pkg.student_id] = last + timedelta(days=1)
+
+    for student_id, floor in floor_by_student.items():
+        for pkg in later_by_student.get(student_id, []):
+            movable = [l.lesson_date for l in pkg.lessons if not _is_fixed(l)]
+            if not movable or min(movable) >= floor:
+                break
+            last = _reslot_package(
+                pkg, min(movable), floor, calendar, taken_by_student[student_id], changes, unplaced
+            )
+            touched.append(pkg)
+            if not last:
+                break
+            floor = last + timedelta(days=1)
+
+    # first_lesson_date per touched package after the moves
+    moved = {c["lesson_id"]: c["new_date"] for c in changes}
+    changed_per_package = Counter(c["package_id"] for c in changes)
+    package_updates = []
+    for pkg in touched:
+        dates = [moved.get(l.lesson_id, l.lesson_date) for l in pkg.lessons if not l.is_makeup]
+        first = min(dates) if dates else None
+        result["packages"].append({
+            "package_id": pkg.package_id,
+            "student_id": pkg.student_id,
+            "changed_lessons": changed_per_package[pkg.package_id],
+            "first_lesson_date": first,
+        })
+        if first != pkg.first_lesson_date:
+            package_updates.append({"package_id": pkg.package_id, "first_lesson_date": first})
+
+    result["changes"] = changes
+    result["unplaced_lesson_ids"] = unplaced
+
+    if dry_run:
+        return result
+
+    if changes or package_updates:
+        seq = current_change_seq(db)
+    if changes:
+        # a forward push moves L3 onto the date L4 still holds: park
+        # every moved row first, then write the new dates
+        db.bulk_update_mappings(
+            Lesson,
+            [
+                {"lesson_id": c["lesson_id"], "lesson_date": PARKING_DATE + timedelta(days=i)}
+                for i, c in enumerate(changes)
+            ],
+        )
+        db.bulk_update_mappings(
+            Lesson,
+            [
+                {"lesson_id": c["lesson_id"], "lesson_date": c["new_date"], "change_seq": seq}
+                for c in changes
+            ],
+        )
+    if package_updates:
+        db.bulk_update_mappings(Package, [dict(u, change_seq=seq) for u in package_updates])
+    if changes or package_updates:
+        bump_data_version(db, STUDENTS)
+
+    return result
@@ -0,0 +1,208 @@
+# backend/app/services/dashboard_read.py
+import base64
+import json
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from ..models import Student, Package, Lesson
+
+# ---------------------------------------------------------
+# Dashboard filters + keyset cursor over (name, student_id)
+# ---------------------------------------------------------
+def encode_student_cursor(name: str, student_id: int) -> str:
+    raw = json.dumps([name, student_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_student_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        name, student_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), int(student_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def filter_students(
+    q,
+    package_size: Optional[int] = None,
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+    status: Optional[str] = None,
+    has_unpaid: Optional[bool] = None,
+):
+    """Apply the dashboard filters to a query over Student."""
+    if package_size is not None:
+        q = q.filter(Student.packages.any(Package.package_size == package_size))
+    if group_name:
+        q = q.filter(Student.group_name == group_name)
+    if lesson_day is not None:
+        q = q.filter(or_(
+            Student.lesson_day_1 == lesson_day,
+            Student.lesson_day_2 == lesson_day,
+        ))
+    if status:
+        q = q.filter(Student.status == status)
+    if has_unpaid is not None:
+        unpaid = Student.packages.any(Package.payment_status.isnot(True))
+        q = q.filter(unpaid if has_unpaid else ~unpaid)
+    return q
+
+# ---------------------------------------------------------
+# Flat dashboard read model (no ORM hydration)
+# ---------------------------------------------------------
+def _iso(d) -> Optional[str]:
+    return d.isoformat() if d is not None else None
+
+
+def dashboard_statement(
+    db: Session,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    package_size: Optional[int] = None,
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+    status: Optional[str] = None,
+    has_unpaid: Optional[bool] = None,
+    latest_packages: Optional[int] = None,
+    no_group: bool = False,
+):
+    """
+    One Core SELECT: a page of students LEFT JOIN packages LEFT JOIN
+    lessons, ordered so rows can be grouped in a single pass. The page
+    fetches limit + 1 students so the caller can tell if there is more.
+    """
+    page_q = filter_students(
+        db.query(
+            Student.student_id.label("student_id"),
+            Student.name.label("name"),
+            Student.cefr.label("cefr"),
+            Student.group_name.label("group_name"),
+            Student.lesson_day_1.label("lesson_day_1"),
+            Student.lesson_day_2.label("lesson_day_2"),
+            Student.package_size.label("student_package_size"),
+            Student.start_date.label("start_date"),
+            Student.end_date.label("end_date"),
+            Student.status.label("student_status"),
+        ),
+        package_size=package_size,
+        group_name=group_name,
+        lesson_day=lesson_day,
+        status=status,
+        has_unpaid=has_unpaid,
+    )
+    if no_group:
+        page_q = page_q.filter(or_(Student.group_name.is_(None), Student.group_name == ""))
+    if cursor:
+        after_name, after_id = decode_student_cursor(cursor)
+        page_q = page_q.filter(or_(
+            Student.name > after_name,
+            and_(Student.name == after_name, Student.student_id > after_id),
+        ))
+    page_q = page_q.order_by(Student.name, Student.student_id)
+    if limit is not None:
+        page_q = page_q.limit(limit + 1)
+    page = page_q.subquery("page")
+
+    pkg_on = [Package.student_id == page.c.student_id]
+    if package_size is not None:
+        pkg_on.append(Package.package_size == package_size)
+
+    joined = page.outerjoin(Package, and_(*pkg_on))
+    if latest_packages:
+        ranked = select(
+            Package.package_id.label("package_id"),
+            func.row_number().over(
+                partition_by=Package.student_id,
+                order_by=Package.package_id.desc(),
+            ).label("rn"),
+        ).where(Package.student_id.in_(select(page.c.student_id)))
+        if package_size is not None:
+            ranked = ranked.where(Package.package_size == package_size)
+        ranked = ranked.subquery("ranked")
+        joined = page.outerjoin(
+            ranked.join(Package, Package.package_id == ranked.c.package_id),
+            and_(*pkg_on, ranked.c.rn <= latest_packages),
+        )
+
+    return (
+        select(
+            page,
+            Package.package_id,
+            Package.package_size,
+            Package.payment_status,
+            Package.first_lesson_date,
+            Package.created_at,
+            Lesson.lesson_id,
+            Lesson.lesson_number,
+            Lesson.lesson_date,
+            Lesson.is_first,
+            Lesson.is_manual_override,
+            Lesson.status,
+            Lesson.is_makeup,
+        )
+        .select_from(joined.outerjoin(Lesson, Lesson.package_id == Package.package_id))
+        .order_by(page.c.name, page.c.student_id, Package.package_id, Lesson.lesson_number)
+    )
+
+
+def shape_dashboard_rows(rows, limit: Optional[int] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Group the flat rows into StudentOut-shaped dicts (dates as ISO strings).
+    Returns (students, next_cursor).
+    """
+    students: List[Dict] = []
+    student = pkg = None
+    for r in rows:
+        if student is None or student["student_id"] != r.student_id:
+            if limit is not None and len(students) == limit:
+                # the extra (limit + 1)th student only signals another page
+                last = students[-1]
+                return students, encode_student_cursor(last["name"], last["student_id"])
+            student = {
+                "student_id": r.student_id,
+                "name": r.name,
+                "cefr": r.cefr,
+                "group_name": r.group_name,
+                "lesson_day_1": r.lesson_day_1,
+                "lesson_day_2": r.lesson_day_2,
+                "package_size": r.student_package_size,
+                "start_date": _iso(r.start_date),
+                "end_date": _iso(r.end_date),
+                "status": r.student_status,
+                "packages": [],
+            }
+            students.append(student)
+            pkg = None
+
+        if r.package_id is None:
+            continue
+        if pkg is None or pkg["package_id"] != r.package_id:
+            pkg = {
+                "package_id": r.package_id,
+                "package_size": r.package_size,
+                "payment_status": bool(r.payment_status),
+                "first_lesson_date": _iso(r.first_lesson_date),
+                "created_at": _iso(r.created_at),
+                "lessons": [],
+            }
+            student["packages"].append(pkg)
+
+        if r.lesson_id is None:
+            continue
+        pkg["lessons"].append({
+            "lesson_id": r.lesson_id,
+            "lesson_number": r.lesson_number,
+            "lesson_date": _iso(r.lesson_date),
+            "is_first": bool(r.is_first),
+            "is_manual_override": bool(r.is_manual_override),
+            "status": r.status,
+            "is_makeup": bool(r.is_makeup),
+        })
+
+    return students, None
+
+
+def fetch_dashboard(db: Session, limit: Optional[int] = None, **filters) -> Tuple[List[Dict], Optional[str]]:
+    stmt = dashboard_statement(db, limit=limit, **filters)
+    return shape_dashboard_rows(db.execute(stmt), limit=limit)
@@ -0,0 +1,57 @@
+# backend/app/services/data_version.py
+import hashlib
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from ..models import DataVersion
+
+STUDENTS = "students"   # students, packages, lessons
+CLOSURES = "closures"
+CHANGES = "changes"     # global change sequence used by /sync
+
+# ---------------------------------------------------------
+# Version counters (bumped inside the writing transaction)
+# ---------------------------------------------------------
+def bump_data_version(db: Session, *scopes: str) -> int:
+    """
+    Increment the version of each scope and return the last new version.
+    Call before the write commits; the row stays locked until then.
+    """
+    version = 0
+    for scope in scopes:
+        version = db.execute(
+            update(DataVersion)
+            .where(DataVersion.scope == scope)
+            .values(version=DataVersion.version + 1)
+            .returning(DataVersion.version)
+        ).scalar()
+        if version is None:
+            version = 1
+            db.execute(insert(DataVersion).values(scope=scope, version=version))
+    return version
+
+
+def get_data_version(db: Session, scope: str) -> int:
+    version = db.execute(
+        select(DataVersion.version).where(DataVersion.scope == scope)
+    ).scalar()
+    return int(version or 0)
+
+# ---------------------------------------------------------
+# Conditional GET helpers
+# ---------------------------------------------------------
+def make_etag(scope: str, version: int, request: Request) -> str:
+    """Strong ETag: scope version plus a digest of the query parameters."""
+    params = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    digest = hashlib.sha1(params.encode()).hexdigest()[:12]
+    return f'"{scope}-{version}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags
@@ -0,0 +1,149 @@
+# backend/app/services/end_date_prune.py
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Student, Package, Lesson
+from .change_tracking import bulk_delete_with_tombstones, current_change_seq
+
+# ---------------------------------------------------------
+# Classify packages against their student's end_date
+# ---------------------------------------------------------
+def _package_actions(db: Session, student_ids: Sequence[int]) -> List:
+    """
+    One row per package that needs attention:
+      delete  unpaid, no lessons yet or starting after end_date
+      trim    unpaid, starts on/before end_date, has lessons after it
+      skip    the same situations, but the package is paid
+    """
+    lessons_after_end = (
+        select(Lesson.lesson_id)
+        .where(Lesson.package_id == Package.package_id, Lesson.lesson_date > Student.end_date)
+        .exists()
+    )
+    starts_after_end = or_(Package.first_lesson_date.is_(None), Package.first_lesson_date > Student.end_date)
+    paid = Package.payment_status.is_(True)
+
+    action = case(
+        (and_(starts_after_end, paid), "skip"),
+        (starts_after_end, "delete"),
+        (and_(lessons_after_end, paid), "skip"),
+        (lessons_after_end, "trim"),
+        else_=None,
+    ).label("action")
+
+    rows = db.execute(
+        select(Package.package_id, Package.student_id, action)
+        .join(Student, Student.student_id == Package.student_id)
+        .where(Student.student_id.in_(student_ids), Student.end_date.isnot(None))
+        .order_by(Package.student_id, Package.first_lesson_date, Package.package_id)
+    ).all()
+    return [r for r in rows if r.action is not None]
+
+# ---------------------------------------------------------
+# MAIN FUNCTION
+# ---------------------------------------------------------
+def prune_to_end_dates(db: Session, student_ids: Sequence[int]) -> Dict:
+    """
+    Apply each student's current end_date to their packages in a fixed
+    number of statements, however many students or packages:
+
+      1. classify packages (delete / trim / skip paid)
+      2. delete lessons of deleted packages and lessons after end_date of
+         trimmed packages (with tombstones)
+      3. delete the emptied packages (with tombstones)
+      4. renumber what is left of trimmed packages with
+         ROW_NUMBER() OVER (PARTITION BY package_id ORDER BY lesson_date)
+      5. refresh package_size and first_lesson_date in one UPDATE
+
+    Paid packages are never changed. Students without an end_date are
+    ignored. Expects pending student changes to be flushed; does not commit.
+    Returns {"deleted_packages", "skipped_paid", "trimmed_packages",
+    "deleted_lessons"}.
+    """
+    result = {"deleted_packages": [], "skipped_paid": [], "trimmed_packages": [], "deleted_lessons": []}
+    student_ids = list(student_ids)
+    if not student_ids:
+        return result
+
+    for row in _package_actions(db, student_ids):
+        key = {"delete": "deleted_packages", "trim": "trimmed_packages", "skip": "skipped_paid"}[row.action]
+        result[key].append(row.package_id)
+    doomed, trimmed = result["deleted_packages"], result["trimmed_packages"]
+    if not doomed and not trimmed:
+        return result
+
+    # 2. lessons: all of doomed packages, past end_date for trimmed ones
+    end_date = (
+        select(Student.end_date)
+        .join(Package, Package.student_id == Student.student_id)
+        .where(Package.package_id == Lesson.package_id)
+        .scalar_subquery()
+    )
+    result["deleted_lessons"] = bulk_delete_with_tombstones(
+        db,
+        db.query(Lesson).filter(or_(
+            Lesson.package_id.in_(doomed),
+            and_(Lesson.package_id.in_(trimmed), Lesson.lesson_date > end_date),
+        )),
+        "lesson",
+        Lesson.lesson_id,
+    )
+
+    # 3. packages
+    if doomed:
+        bulk_delete_with_tombstones(
+            db,
+            db.query(Package).filter(Package.package_id.in_(doomed)),
+            "package",
+            Package.package_id,
+        )
+
+    if trimmed:
+        now = datetime.utcnow()
+        seq = current_change_seq(db)
+
+        # 4. renumber; park on negative numbers first so the unique
+        # (package_id, lesson_number) constraint holds while rows move
+        db.execute(
+            update(Lesson)
+            .where(Lesson.package_id.in_(trimmed))
+            .values(lesson_number=-Lesson.lesson_number)
+            .execution_options(synchronize_session=False)
+        )
+        ranked = (
+            select(
+                Lesson.lesson_id,
+                func.row_number().over(
+                    partition_by=Lesson.package_id,
+                    order_by=(Lesson.lesson_date, Lesson.lesson_id),
+                ).label("rn"),
+            )
+            .where(Lesson.package_id.in_(trimmed))
+            .subquery()
+        )
+        db.execute(
+            update(Lesson)
+            .where(Lesson.lesson_id == ranked.c.lesson_id)
+            .values(lesson_number=ranked.c.rn, is_first=(ranked.c.rn == 1), updated_at=now, change_seq=seq)
+            .execution_options(synchronize_session=False)
+        )
+
+        # 5. package_size / first_lesson_date from the remaining lessons
+        remaining = select(func.count(Lesson.lesson_id)).where(Lesson.package_id == Package.package_id)
+        first = select(func.min(Lesson.lesson_date)).where(Lesson.package_id == Package.package_id)
+        db.execute(
+            update(Package)
+            .where(Package.package_id.in_(trimmed))
+            .values(
+                package_size=remaining.scalar_subquery(),
+                first_lesson_date=first.scalar_subquery(),
+                updated_at=now,
+                change_seq=seq,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    return result
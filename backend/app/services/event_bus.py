@@ -0,0 +1,152 @@
+# backend/app/services/event_bus.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict
+
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# Event encoding
+# ---------------------------------------------------------
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in an event")
+
+
+def encode_event(event: Dict) -> str:
+    return json.dumps(event, default=_json_default)
+
+
+def _offer(queue: asyncio.Queue, event: Dict) -> None:
+    """Runs on the subscriber's loop. A full queue is replaced by one resync event."""
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait({"type": "resync"})
+
+# ---------------------------------------------------------
+# In-process bus (single worker, tests)
+# ---------------------------------------------------------
+class InMemoryEventBus:
+    """
+    Fans events out to the subscribers of this process. publish() is called
+    from sync endpoints in the threadpool and never blocks; each subscriber
+    is an asyncio.Queue fed through its own loop. A subscriber that falls
+    behind gets a single {"type": "resync"} instead of the missed events.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[asyncio.Queue, asyncio.AbstractEventLoop] = {}
+
+    def subscribe(self) -> asyncio.Queue:
+        """Must be called from the event loop that will read the queue."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: Dict) -> None:
+        self._fan_out(event)
+
+    def _fan_out(self, event: Dict) -> None:
+        with self._lock:
+            targets = list(self._subscribers.items())
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # loop already closed
+                self.unsubscribe(queue)
+
+# ---------------------------------------------------------
+# Redis pub/sub bus (several API workers / Celery)
+# ---------------------------------------------------------
+class RedisEventBus(InMemoryEventBus):
+    """
+    Publishes to a Redis channel; one listener thread per process relays
+    the channel to the local subscribers, so every worker sees every event.
+    """
+
+    def __init__(self, url: str, channel: str, queue_size: int = 100):
+        super().__init__(queue_size)
+        import redis
+
+        self._redis_error = redis.RedisError
+        self._redis = redis.Redis.from_url(url)
+        self.channel = channel
+        self._listener = None
+
+    def subscribe(self) -> asyncio.Queue:
+        self._ensure_listener()
+        return super().subscribe()
+
+    def publish(self, event: Dict) -> None:
+        try:
+            self._redis.publish(self.channel, encode_event(event))
+        except self._redis_error as e:
+            logger.warning("Event publish to Redis failed, delivering locally only: %s", e)
+            self._fan_out(event)
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self._listen, name="event-bus-redis", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self._fan_out(json.loads(message["data"]))
+            except self._redis_error as e:
+                logger.warning("Event bus lost Redis subscription, retrying: %s", e)
+                time.sleep(1)
+
+
+def _make_event_bus() -> InMemoryEventBus:
+    if settings.EVENT_BUS_BACKEND == "redis":
+        return RedisEventBus(settings.REDIS_URL, settings.EVENT_BUS_CHANNEL)
+    return InMemoryEventBus()
+
+
+event_bus = _make_event_bus()
+
+
+def publish_event(event_type: str, **data) -> None:
+    """Publish a small change event. Call after the change is committed."""
+    event_bus.publish({"type": event_type, **data})
+
+
+async def publish_event_async(event_type: str, **data) -> None:
+    """publish_event for async endpoints: a Redis publish runs in the threadpool, off the event loop."""
+    event = {"type": event_type, **data}
+    if isinstance(event_bus, RedisEventBus):
+        await run_in_threadpool(event_bus.publish, event)
+    else:
+        event_bus.publish(event)
@@ -0,0 +1,219 @@
+# backend/app/services/export_jobs.py
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db import SessionLocal, read_session_factory
+from .data_version import get_data_version, STUDENTS
+from .exports import (
+    export_filename,
+    iter_dashboard_csv,
+    iter_lessons_parquet,
+    write_dashboard_xlsx,
+    CSV_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    XLSX_MEDIA_TYPE,
+)
+from .multi_sheet_export import write_multi_sheet_xlsx, MULTI_SHEET_FILENAME
+
+EXPORT_MEDIA_TYPES = {
+    "xlsx": XLSX_MEDIA_TYPE,
+    "xlsx_sheets": XLSX_MEDIA_TYPE,   # one sheet per package size / group
+    "csv": CSV_MEDIA_TYPE,
+    "parquet": PARQUET_MEDIA_TYPE,
+}
+
+# ---------------------------------------------------------
+# Cache layout: one file set per job id in EXPORT_CACHE_DIR
+#   <id>.json   job parameters
+#   <id>.lock   present while a build runs (single-flight)
+#   <id>.<fmt>  finished export
+#   <id>.error  last build failure
+# ---------------------------------------------------------
+def _cache_dir() -> Path:
+    path = Path(settings.EXPORT_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _paths(job_id: str, fmt: str) -> Dict[str, Path]:
+    cache = _cache_dir()
+    return {
+        "meta": cache / f"{job_id}.json",
+        "lock": cache / f"{job_id}.lock",
+        "result": cache / f"{job_id}.{fmt}",
+        "part": cache / f"{job_id}.{fmt}.part",
+        "error": cache / f"{job_id}.error",
+    }
+
+
+def export_job_id(fmt: str, tab: str, group_name: Optional[str], lesson_day: Optional[int], version: int) -> str:
+    """Same parameters + same data version -> same job (and same cached file)."""
+    raw = json.dumps([fmt, tab, group_name, lesson_day, version])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _lock_is_stale(lock: Path) -> bool:
+    try:
+        return time.time() - lock.stat().st_mtime > settings.EXPORT_JOB_TIMEOUT
+    except FileNotFoundError:
+        return False
+
+
+def _sweep_cache() -> None:
+    """Drop files older than EXPORT_CACHE_TTL (results of old data versions)."""
+    cutoff = time.time() - settings.EXPORT_CACHE_TTL
+    for path in _cache_dir().iterdir():
+        try:
+            if path.stat().st_mtime < cutoff and path.suffix != ".lock":
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+# ---------------------------------------------------------
+# Submit / poll
+# ---------------------------------------------------------
+def export_job_status(job_id: str) -> Optional[Dict]:
+    """Job dict with status running | done | failed, or None if unknown."""
+    meta_path = _cache_dir() / f"{job_id}.json"
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (FileNotFoundError, ValueError):
+        lock = _cache_dir() / f"{job_id}.lock"
+        if not lock.exists():
+            return None
+        # claimed, meta not written yet
+        failed = _lock_is_stale(lock)
+        return {
+            "job_id": job_id,
+            "status": "failed" if failed else "queued",
+            "error": "build did not finish" if failed else None,
+            "size": None,
+        }
+
+    paths = _paths(job_id, meta["format"])
+    job = dict(meta, status="running", error=None, size=None)
+    lock_live = paths["lock"].exists() and not _lock_is_stale(paths["lock"])
+    if paths["result"].exists():
+        job["status"] = "done"
+        job["size"] = paths["result"].stat().st_size
+    elif lock_live:
+        # a build holds the lock: any .error is left from an earlier run
+        pass
+    elif paths["error"].exists():
+        job["status"] = "failed"
+        job["error"] = paths["error"].read_text()
+    else:
+        job["status"] = "failed"
+        job["error"] = "build did not finish"
+    return job
+
+
+def claim_export_job(
+    db: Session,
+    fmt: str,
+    tab: str = "all",
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+) -> Dict:
+    """
+    Find or start the job for these parameters at the current data version.
+
+    Returns the job dict plus "leader": True when the caller won the lock and
+    must dispatch build_export_job(job_id). Everyone else gets the same job
+    id right away and polls it: a cached file is returned as done, a build
+    in progress is shared instead of started again.
+    """
+    version = get_data_version(db, STUDENTS)
+    job_id = export_job_id(fmt, tab, group_name, lesson_day, version)
+    paths = _paths(job_id, fmt)
+
+    if paths["result"].exists():
+        return dict(export_job_status(job_id) or {}, leader=False)
+
+    _sweep_cache()
+    if _lock_is_stale(paths["lock"]):
+        paths["lock"].unlink(missing_ok=True)
+    try:
+        fd = os.open(paths["lock"], os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        # another request leads this build; its meta may not exist yet
+        job = export_job_status(job_id) or {"job_id": job_id, "status": "queued", "error": None, "size": None}
+        return dict(job, leader=False)
+    os.close(fd)
+
+    # a new build: drop whatever an earlier run of this job left behind
+    paths["error"].unlink(missing_ok=True)
+    paths["meta"].unlink(missing_ok=True)
+    meta = {
+        "job_id": job_id,
+        "format": fmt,
+        "tab": tab,
+        "group_name": group_name,
+        "lesson_day": lesson_day,
+        "data_version": version,
+        "filename": MULTI_SHEET_FILENAME if fmt == "xlsx_sheets" else export_filename(tab, fmt),
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    paths["meta"].write_text(json.dumps(meta))
+    return dict(meta, status="queued", error=None, size=None, leader=True)
+
+# ---------------------------------------------------------
+# Build (runs in the Celery worker or the local pool)
+# ---------------------------------------------------------
+def _write_export(db: Session, out, fmt: str, tab: str, group_name, lesson_day) -> None:
+    if fmt == "xlsx":
+        write_dashboard_xlsx(db, out, tab=tab, group_name=group_name, lesson_day=lesson_day)
+        return
+    if fmt == "xlsx_sheets":
+        write_multi_sheet_xlsx(db, out)
+        return
+    stream = iter_dashboard_csv if fmt == "csv" else iter_lessons_parquet
+    for chunk in stream(db, tab=tab, group_name=group_name, lesson_day=lesson_day):
+        out.write(chunk)
+
+
+def build_export_job(job_id: str) -> Dict:
+    """Build the file for a claimed job, then release its lock."""
+    meta = json.loads((_cache_dir() / f"{job_id}.json").read_text())
+    paths = _paths(job_id, meta["format"])
+    db = read_session_factory()()
+    if get_data_version(db, STUDENTS) < meta["data_version"]:
+        # the replica has not caught up with the version the job is cached
+        # under: build from the primary rather than cache stale rows
+        db.close()
+        db = SessionLocal()
+    try:
+        with open(paths["part"], "wb") as out:
+            _write_export(db, out, meta["format"], meta["tab"], meta["group_name"], meta["lesson_day"])
+        os.replace(paths["part"], paths["result"])
+    except Exception as e:
+        paths["error"].write_text(str(e) or type(e).__name__)
+        paths["part"].unlink(missing_ok=True)
+        raise
+    finally:
+        db.close()
+        paths["lock"].unlink(missing_ok=True)
+    return export_job_status(job_id)
+
+
+def abandon_export_job(job_id: str, error: str) -> None:
+    """Mark a claimed job failed when it could not be dispatched."""
+    meta = json.loads((_cache_dir() / f"{job_id}.json").read_text())
+    paths = _paths(job_id, meta["format"])
+    paths["error"].write_text(error)
+    paths["lock"].unlink(missing_ok=True)
+
+
+def export_job_file(job_id: str) -> Optional[Path]:
+    job = export_job_status(job_id)
+    if not job or job["status"] != "done":
+        return None
+    return _paths(job_id, job["format"])["result"]
@@ -0,0 +1,402 @@
+# backend/app/services/exports.py
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import csv
+import io
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from ..db import SessionLocal
+from ..models import Student, Package, Lesson
+from .dashboard_read import dashboard_statement
+
+# parquet support is optional; without pyarrow the endpoint answers 501
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:
+    pa = pq = None
+
+DAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+FILL_ATTENDED = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+FILL_LEAVE = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+FILL_MU = PatternFill(start_color="EAD1DC", end_color="EAD1DC", fill_type="solid")
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_SIZE = 2000
+# bytes per chunk when streaming a finished file to the client
+STREAM_CHUNK_BYTES = 64 * 1024
+# lessons per parquet row group (one cursor chunk each)
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+# ---------------------------------------------------------
+# Export parameters
+# ---------------------------------------------------------
+def export_package_size(tab: str) -> Optional[int]:
+    """tab is all | 4 | 8."""
+    return {"4": 4, "8": 8}.get(tab)
+
+
+def export_lesson_columns(tab: str) -> int:
+    return 4 if tab == "4" else 8
+
+
+def export_filename(tab: str, ext: str = "xlsx") -> str:
+    return f"dashboard_all.{ext}" if tab == "all" else f"dashboard_{tab}_lesson.{ext}"
+
+# ---------------------------------------------------------
+# One streamed, filtered query -> packages in dashboard order
+# ---------------------------------------------------------
+def iter_export_packages(
+    db: Session,
+    package_size: Optional[int] = None,
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    no_group: bool = False,
+) -> Iterator[Tuple[object, List]]:
+    """
+    Yield (row, lessons) per package, students by name. `row` carries the
+    student and package columns, `lessons` the package's lesson rows in
+    lesson_number order. Filters run in SQL (no_group: students without a
+    group) and rows are fetched chunk by chunk, so only one package is held
+    in memory at a time.
+    """
+    stmt = dashboard_statement(
+        db,
+        package_size=package_size,
+        group_name=group_name,
+        lesson_day=lesson_day,
+        no_group=no_group,
+    )
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+
+    current = None
+    lessons: List = []
+    for r in result:
+        if r.package_id is None:
+            continue
+        if current is None or current.package_id != r.package_id:
+            if current is not None:
+                yield current, lessons
+            current, lessons = r, []
+        if r.lesson_id is not None:
+            lessons.append(r)
+    if current is not None:
+        yield current, lessons
+
+# ---------------------------------------------------------
+# Dashboard rows and lesson cell rules (shared by XLSX / CSV)
+# ---------------------------------------------------------
+def lesson_label(lesson) -> str:
+    """Cell text for a lesson: date plus (MU) / (L) / ✓ markers."""
+    text = lesson.lesson_date.isoformat()
+    if lesson.is_makeup:
+        text += " (MU)"
+    if lesson.status == "leave":
+        text += " (L)"
+    if lesson.status == "attended":
+        text += " ✓"
+    return text
+
+
+def lesson_fill(lesson) -> Optional[PatternFill]:
+    """Status fill wins over the make-up fill."""
+    if lesson.status == "attended":
+        return FILL_ATTENDED
+    if lesson.status == "leave":
+        return FILL_LEAVE
+    if lesson.is_makeup:
+        return FILL_MU
+    return None
+
+
+def format_lesson_cell(cell, lesson):
+    """Label and colour a lesson cell. Works on normal and write-only cells."""
+    fill = lesson_fill(lesson)
+    if fill is not None:
+        cell.fill = fill
+    cell.value = lesson_label(lesson)
+    return cell
+
+
+def dashboard_header(max_lessons: int) -> List[str]:
+    header = ["Name", "CEFR", "Group", "Lesson Day", "Package Size"]
+    header += [f"L{i}" for i in range(1, max_lessons + 1)]
+    header.append("Paid")
+    return header
+
+
+def dashboard_sheet_rows(
+    packages: Iterable[Tuple[object, List]],
+    max_lessons: int,
+    lesson_cell: Callable = lesson_label,
+) -> Iterator[List]:
+    """
+    Sheet rows for the dashboard: one row per package (student columns only
+    on the student's first row) plus an "MU" row listing make-up lessons.
+    lesson_cell turns a lesson into a cell value (text, or a styled cell).
+    """
+    yield dashboard_header(max_lessons)
+
+    last_student_id = None
+    for pkg, lessons in packages:
+        first_row_for_student = pkg.student_id != last_student_id
+        last_student_id = pkg.student_id
+
+        regular = {}
+        makeups = []
+        for lesson in lessons:
+            if lesson.is_makeup:
+                makeups.append(lesson)
+            else:
+                regular.setdefault(lesson.lesson_number, lesson)
+
+        if first_row_for_student:
+            row = [
+                pkg.name,
+                pkg.cefr or "",
+                pkg.group_name or "",
+                DAY_LABELS[pkg.lesson_day_1],
+                pkg.package_size,
+            ]
+        else:
+            row = ["", "", "", "", ""]
+
+        for i in range(1, max_lessons + 1):
+            lesson = regular.get(i)
+            row.append(lesson_cell(lesson) if lesson else "")
+        row.append("Paid" if pkg.payment_status else "Unpaid")
+        yield row
+
+        if makeups:
+            mu_row = ["", "", "", "", "MU"]
+            mu_row += [lesson_cell(lesson) for lesson in makeups]
+            mu_row += [""] * (max_lessons + 1 - len(makeups))
+            yield mu_row
+
+
+# ---------------------------------------------------------
+# XLSX
+# ---------------------------------------------------------
+def write_dashboard_xlsx(
+    db: Session,
+    out: BinaryIO,
+    tab: str = "all",
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+) -> None:
+    """
+    Write the dashboard workbook to `out` in write-only mode: rows are
+    appended as the query streams and never kept as cell objects.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Dashboard")
+
+    packages = iter_export_packages(
+        db,
+        package_size=export_package_size(tab),
+        group_name=group_name,
+        lesson_day=lesson_day,
+    )
+    styled = lambda lesson: format_lesson_cell(WriteOnlyCell(ws), lesson)
+    for row in dashboard_sheet_rows(packages, export_lesson_columns(tab), styled):
+        ws.append(row)
+
+    wb.save(out)
+
+
+def iter_file_chunks(f: BinaryIO, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Stream an open file from the start, closing it when done."""
+    try:
+        f.seek(0)
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield data
+    finally:
+        f.close()
+
+
+def stream_with_session(
+    stream_fn: Callable,
+    *args,
+    session_factory: Callable = SessionLocal,
+    **kwargs,
+) -> Iterator[bytes]:
+    """
+    Run a streaming export on its own session. The response body is sent
+    after the endpoint returns, so it must not rely on the request's session.
+    """
+    db = session_factory()
+    try:
+        yield from stream_fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+# ---------------------------------------------------------
+# CSV (same rows as the XLSX sheet, streamed as produced)
+# ---------------------------------------------------------
+def iter_dashboard_csv(
+    db: Session,
+    tab: str = "all",
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Dashboard rows as UTF-8 CSV, yielded in blocks of about STREAM_CHUNK_BYTES."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    packages = iter_export_packages(
+        db,
+        package_size=export_package_size(tab),
+        group_name=group_name,
+        lesson_day=lesson_day,
+        chunk_size=chunk_size,
+    )
+    for row in dashboard_sheet_rows(packages, export_lesson_columns(tab)):
+        writer.writerow(row)
+        if buf.tell() >= STREAM_CHUNK_BYTES:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+# ---------------------------------------------------------
+# Parquet (one row per lesson, columnar)
+# ---------------------------------------------------------
+LESSON_COLUMNS = [
+    ("student_id", Student.student_id),
+    ("student_name", Student.name),
+    ("cefr", Student.cefr),
+    ("group_name", Student.group_name),
+    ("lesson_day_1", Student.lesson_day_1),
+    ("lesson_day_2", Student.lesson_day_2),
+    ("student_status", Student.status),
+    ("package_id", Package.package_id),
+    ("package_size", Package.package_size),
+    ("payment_status", Package.payment_status),
+    ("lesson_id", Lesson.lesson_id),
+    ("lesson_number", Lesson.lesson_number),
+    ("lesson_date", Lesson.lesson_date),
+    ("status", Lesson.status),
+    ("is_makeup", Lesson.is_makeup),
+    ("is_manual_override", Lesson.is_manual_override),
+    ("is_first", Lesson.is_first),
+]
+
+
+def lessons_statement(
+    package_size: Optional[int] = None,
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+):
+    """Flat lesson rows with their student and package fields, filtered in SQL."""
+    stmt = (
+        select(*[col.label(name) for name, col in LESSON_COLUMNS])
+        .join_from(Lesson, Package, Lesson.package_id == Package.package_id)
+        .join(Student, Student.student_id == Package.student_id)
+    )
+    if package_size is not None:
+        stmt = stmt.where(Package.package_size == package_size)
+    if group_name:
+        stmt = stmt.where(Student.group_name == group_name)
+    if lesson_day is not None:
+        stmt = stmt.where(or_(Student.lesson_day_1 == lesson_day, Student.lesson_day_2 == lesson_day))
+    return stmt.order_by(Student.name, Student.student_id, Package.package_id, Lesson.lesson_number)
+
+
+def lessons_arrow_schema():
+    return pa.schema([
+        ("student_id", pa.int64()),
+        ("student_name", pa.string()),
+        ("cefr", pa.string()),
+        ("group_name", pa.string()),
+        ("lesson_day_1", pa.int8()),
+        ("lesson_day_2", pa.int8()),
+        ("student_status", pa.string()),
+        ("package_id", pa.int64()),
+        ("package_size", pa.int16()),
+        ("payment_status", pa.bool_()),
+        ("lesson_id", pa.int64()),
+        ("lesson_number", pa.int16()),
+        ("lesson_date", pa.date32()),
+        ("status", pa.string()),
+        ("is_makeup", pa.bool_()),
+        ("is_manual_override", pa.bool_()),
+        ("is_first", pa.bool_()),
+    ])
+
+
+class _ChunkSink:
+    """Append-only file object for ParquetWriter; drain() hands back what was written."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_lessons_parquet(
+    db: Session,
+    tab: str = "all",
+    group_name: Optional[str] = None,
+    lesson_day: Optional[int] = None,
+    chunk_size: int = PARQUET_ROW_GROUP_SIZE,
+) -> Iterator[bytes]:
+    """
+    One row per lesson as Parquet. Each cursor chunk becomes one row group
+    and its bytes are yielded as soon as it is written.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+
+    schema = lessons_arrow_schema()
+    stmt = lessons_statement(export_package_size(tab), group_name, lesson_day)
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in result.partitions(chunk_size):
+            columns = list(zip(*rows))
+            table = pa.Table.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,121 @@
+# backend/app/services/jobs.py
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Job, JobItem
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# ---------------------------------------------------------
+# Job rows: create / find / report
+# ---------------------------------------------------------
+def create_job(db: Session, kind: str, params: Optional[Dict] = None) -> Job:
+    job = Job(kind=kind, status="queued", params=params or {}, errors=[])
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def active_job(db: Session, kind: str) -> Optional[Job]:
+    """Most recent queued/running job of `kind` that is not stale (JOB_TIMEOUT)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_TIMEOUT)
+    return (
+        db.query(Job)
+        .filter(Job.kind == kind, Job.status.in_(ACTIVE_STATUSES), Job.created_at >= cutoff)
+        .order_by(Job.job_id.desc())
+        .first()
+    )
+
+
+def claim_job(db: Session, kind: str, params: Optional[Dict] = None) -> Dict:
+    """
+    Single-flight: return the active job of `kind` if there is one, else a
+    new queued job. "leader" tells the caller whether it must dispatch it.
+    """
+    job = active_job(db, kind)
+    if job is not None:
+        return dict(job_out(job), leader=False)
+    return dict(job_out(create_job(db, kind, params)), leader=True)
+
+
+def fail_job(db: Session, job_id: int, error: str) -> None:
+    job = db.get(Job, job_id)
+    if job is None:
+        return
+    job.status = "failed"
+    job.errors = (job.errors or []) + [{"error": error}]
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+
+# ---------------------------------------------------------
+# Per-item progress (safe with several workers on one job)
+# ---------------------------------------------------------
+def start_job(db: Session, job_id: int) -> None:
+    """Mark a job running; the first worker to start sets started_at."""
+    db.execute(
+        update(Job)
+        .where(Job.job_id == job_id, Job.status == "queued")
+        .values(status="running", started_at=datetime.utcnow())
+    )
+    db.commit()
+
+
+def record_job_item(
+    db: Session,
+    job_id: int,
+    item_id: int,
+    status: str,
+    result: Optional[Dict] = None,
+    error: Optional[str] = None,
+) -> None:
+    """
+    Store one item's outcome and bump the job's counters in the same
+    commit. Counters are incremented in SQL, so concurrent batches of one
+    job never overwrite each other; the item that completes the job marks
+    it done.
+    """
+    db.add(JobItem(job_id=job_id, item_id=item_id, status=status, result=result, error=error))
+    processed = Job.processed + 1
+    db.execute(
+        update(Job)
+        .where(Job.job_id == job_id)
+        .values(
+            processed=processed,
+            skipped=Job.skipped + (1 if status == "skipped" else 0),
+            failed=Job.failed + (1 if status == "failed" else 0),
+            status=case((processed >= Job.total, "done"), else_=Job.status),
+            finished_at=case((processed >= Job.total, datetime.utcnow()), else_=Job.finished_at),
+        )
+    )
+    db.commit()
+
+
+def job_items(db: Session, job_id: int):
+    return [
+        {"item_id": i.item_id, "status": i.status, "result": i.result, "error": i.error}
+        for i in db.query(JobItem).filter(JobItem.job_id == job_id).order_by(JobItem.job_item_id)
+    ]
+
+
+def job_out(job: Job) -> Dict:
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "total": job.total,
+        "processed": job.processed,
+        "created": job.created,
+        "skipped": job.skipped,
+        "failed": job.failed,
+        "errors": job.errors or [],
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
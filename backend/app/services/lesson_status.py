@@ -0,0 +1,76 @@
+# backend/app/services/lesson_status.py
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..models import Student, Package, Lesson
+from .change_tracking import current_change_seq
+
+# columns returned for every updated lesson (also the lesson.updated payload)
+UPDATED_LESSON_COLUMNS = (
+    Lesson.lesson_id,
+    Lesson.package_id,
+    Package.student_id,
+    Lesson.lesson_date,
+    Lesson.status,
+    Lesson.is_makeup,
+    Lesson.is_manual_override,
+)
+
+# ---------------------------------------------------------
+# Set-based status updates (no per-lesson SELECT / refresh)
+# ---------------------------------------------------------
+def set_lesson_statuses(db: Session, statuses: Dict[int, str]) -> List[int]:
+    """
+    Apply {lesson_id: status} with one UPDATE per distinct status.
+    Returns the ids that exist; unknown ids are ignored.
+    """
+    by_status = defaultdict(list)
+    for lesson_id, status in statuses.items():
+        by_status[status].append(lesson_id)
+
+    seq = current_change_seq(db)
+    now = datetime.utcnow()
+    updated: List[int] = []
+    for status, ids in by_status.items():
+        updated += db.execute(
+            update(Lesson)
+            .where(Lesson.lesson_id.in_(ids))
+            .values(status=status, updated_at=now, change_seq=seq)
+            .returning(Lesson.lesson_id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+    return updated
+
+
+def set_day_status(db: Session, lesson_date: date, status: str, group_name: Optional[str] = None) -> List[int]:
+    """Set every lesson on `lesson_date` (for one group, if given) to `status` in one UPDATE."""
+    stmt = update(Lesson).where(Lesson.lesson_date == lesson_date)
+    if group_name:
+        group_packages = (
+            select(Package.package_id)
+            .join(Student, Student.student_id == Package.student_id)
+            .where(Student.group_name == group_name)
+        )
+        stmt = stmt.where(Lesson.package_id.in_(group_packages))
+    return db.execute(
+        stmt.values(status=status, updated_at=datetime.utcnow(), change_seq=current_change_seq(db))
+        .returning(Lesson.lesson_id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+
+def fetch_updated_lessons(db: Session, lesson_ids: List[int]) -> List[Dict]:
+    """The updated lessons with their student id, in lesson_date order."""
+    if not lesson_ids:
+        return []
+    rows = db.execute(
+        select(*UPDATED_LESSON_COLUMNS)
+        .join(Package, Package.package_id == Lesson.package_id)
+        .where(Lesson.lesson_id.in_(lesson_ids))
+        .order_by(Lesson.lesson_date, Lesson.lesson_id)
+    ).mappings().all()
+    return [dict(r) for r in rows]
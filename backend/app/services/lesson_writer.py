@@ -0,0 +1,316 @@
+# backend/app/services/lesson_writer.py
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Package, Lesson
+from .change_tracking import bulk_delete_with_tombstones, current_change_seq
+
+# ---------------------------------------------------------
+# Date conflicts: unique (student_id, lesson_date) on lessons
+# ---------------------------------------------------------
+LESSON_DATE_INDEX = "unique_lesson_per_student_date"
+LESSON_DATE_CONFLICT = "Student already has a lesson on this date"
+
+
+def is_lesson_date_conflict(exc: IntegrityError) -> bool:
+    """True if the write failed because a student got two lessons on one day."""
+    diag = getattr(exc.orig, "diag", None)
+    name = getattr(diag, "constraint_name", None)
+    if name:
+        return name == LESSON_DATE_INDEX
+    # drivers without diagnostics (e.g. SQLite) only name the columns
+    message = str(exc.orig)
+    return LESSON_DATE_INDEX in message or "lessons.student_id, lessons.lesson_date" in message
+
+# ---------------------------------------------------------
+# Row builders: lesson_number / is_first / first_lesson_date in memory
+# ---------------------------------------------------------
+def lesson_rows(
+    package_id: int,
+    student_id: int,
+    lesson_dates: Sequence[date],
+    now: datetime,
+    seq: int,
+) -> List[Dict]:
+    """Scheduled lesson rows numbered 1..n in the given date order."""
+    return [
+        {
+            "package_id": package_id,
+            "student_id": student_id,
+            "lesson_number": i,
+            "lesson_date": d,
+            "is_first": (i == 1),
+            "is_manual_override": False,
+            "status": "scheduled",
+            "is_makeup": False,
+            "updated_at": now,
+            "change_seq": seq,
+        }
+        for i, d in enumerate(lesson_dates, start=1)
+    ]
+
+
+def first_lesson_date(lesson_dates: Sequence[date]) -> Optional[date]:
+    return lesson_dates[0] if lesson_dates else None
+
+# ---------------------------------------------------------
+# Batched package + lesson inserts
+# ---------------------------------------------------------
+def insert_packages_with_lessons(db: Session, specs: Sequence[Dict]) -> List[int]:
+    """
+    Insert many packages and all their lessons in two multi-row INSERTs.
+
+    Each spec is {"student_id", "package_size", "payment_status", "lesson_dates"}.
+    first_lesson_date and is_first are computed in memory. Returns the new
+    package ids in spec order. Does not commit.
+    """
+    if not specs:
+        return []
+
+    now = datetime.utcnow()
+    seq = current_change_seq(db)
+    package_rows = []
+    for spec in specs:
+        dates: List[date] = list(spec["lesson_dates"])
+        package_rows.append({
+            "student_id": spec["student_id"],
+            "package_size": int(spec["package_size"]),
+            "payment_status": bool(spec.get("payment_status", False)),
+            "first_lesson_date": first_lesson_date(dates),
+            "created_at": now,
+            "updated_at": now,
+            "change_seq": seq,
+        })
+
+    package_ids = db.execute(
+        insert(Package).returning(Package.package_id, sort_by_parameter_order=True),
+        package_rows,
+    ).scalars().all()
+
+    rows = []
+    for package_id, spec in zip(package_ids, specs):
+        rows += lesson_rows(package_id, spec["student_id"], spec["lesson_dates"], now, seq)
+    if rows:
+        db.execute(insert(Lesson), rows)
+
+    return list(package_ids)
+
+
+def insert_package_with_lessons(
+    db: Session,
+    student_id: int,
+    package_size: int,
+    lesson_dates: Sequence[date],
+    payment_status: bool = False,
+) -> int:
+    """One package and its lessons (two INSERTs). Returns the package id."""
+    return insert_packages_with_lessons(db, [{
+        "student_id": student_id,
+        "package_size": package_size,
+        "payment_status": payment_status,
+        "lesson_dates": lesson_dates,
+    }])[0]
+
+# ---------------------------------------------------------
+# Regenerate a package's lessons as a minimal diff
+# ---------------------------------------------------------
+LESSON_FIELDS = (
+    "lesson_id",
+    "lesson_number",
+    "lesson_date",
+    "is_first",
+    "is_manual_override",
+    "status",
+    "is_makeup",
+)
+
+
+def insert_lessons(db: Session, rows: Sequence[Dict]) -> List[Dict]:
+    """Insert lesson rows with one INSERT ... RETURNING; returns them with their ids."""
+    if not rows:
+        return []
+    returned = db.execute(
+        insert(Lesson).returning(*[getattr(Lesson, f) for f in LESSON_FIELDS]),
+        list(rows),
+    ).mappings().all()
+    return sorted((dict(r) for r in returned), key=lambda r: r["lesson_number"])
+
+
+# lessons that already happened keep their date (and status)
+FIXED_STATUSES = ("attended", "leave")
+
+
+def is_pinned(lesson: Dict) -> bool:
+    """Manual overrides and attended/leave lessons never move on regeneration."""
+    return bool(lesson["is_manual_override"]) or lesson["status"] in FIXED_STATUSES
+
+
+def diff_package_lessons(existing: Sequence[Dict], proposed: Sequence[date]) -> Dict:
+    """
+    Plan the smallest change from `existing` lesson rows to the `proposed`
+    regular schedule (proposed[i] is lesson_number i + 1).
+
+    - make-ups are never touched
+    - manual overrides and attended/leave lessons keep their
+      lesson_number slot, date and status; the proposed date for that
+      slot is dropped
+    - a lesson already on a proposed date keeps its row and status, and
+      is only renumbered if its slot changed
+    - other lessons are moved to the remaining dates (status back to
+      "scheduled", since it was for the old date), then extra dates are
+      inserted and leftover lessons deleted
+
+    Returns {"update": [row changes], "insert": [new rows (no id)],
+    "delete": [lesson_ids], "unchanged": n, "first_lesson_date": date}.
+    """
+    regular = [l for l in existing if not l["is_makeup"]]
+    fixed = {l["lesson_number"]: l for l in regular if is_pinned(l)}
+    taken = {l["lesson_date"] for l in existing if l["is_makeup"] or is_pinned(l)}
+
+    wanted = {
+        number: d
+        for number, d in enumerate(proposed, start=1)
+        if number not in fixed and d not in taken
+    }
+    by_date = {d: number for number, d in wanted.items()}
+    movable = sorted(
+        (l for l in regular if not is_pinned(l)),
+        key=lambda l: (l["lesson_date"], l["lesson_id"]),
+    )
+
+    # final date per lesson_number, used for first_lesson_date
+    slots = {number: l["lesson_date"] for number, l in fixed.items()}
+    update_rows: List[Dict] = []
+    unchanged = 0
+
+    renumbered: List[int] = []
+
+    def renumber(l: Dict, number: int, is_first: bool = None, **changes) -> None:
+        nonlocal unchanged
+        is_first = (number == 1) if is_first is None else is_first
+        if not changes and l["lesson_number"] == number and bool(l["is_first"]) == is_first:
+            unchanged += 1
+            return
+        if l["lesson_number"] != number:
+            renumbered.append(l["lesson_id"])
+        update_rows.append(dict(lesson_id=l["lesson_id"], lesson_number=number, is_first=is_first, **changes))
+
+    for number, l in fixed.items():
+        renumber(l, number)
+
+    leftover = []
+    for l in movable:
+        number = by_date.pop(l["lesson_date"], None)
+        if number is None:
+            leftover.append(l)
+            continue
+        del wanted[number]
+        slots[number] = l["lesson_date"]
+        renumber(l, number)
+
+    open_slots = sorted(wanted.items())
+    for l, (number, d) in zip(leftover, open_slots):
+        slots[number] = d
+        renumber(l, number, lesson_date=d, status="scheduled")
+    insert_slots = open_slots[len(leftover):]
+    slots.update(insert_slots)
+
+    # (package_id, lesson_number) is unique: make-ups sitting on a regular
+    # slot number move after the last regular lesson
+    makeups = sorted((l for l in existing if l["is_makeup"]), key=lambda l: l["lesson_number"])
+    used = set(slots) | {l["lesson_number"] for l in makeups if l["lesson_number"] not in slots}
+    next_free = max(used, default=0) + 1
+    for l in makeups:
+        if l["lesson_number"] in slots:
+            renumber(l, next_free, is_first=bool(l["is_first"]))
+            next_free += 1
+        else:
+            unchanged += 1
+
+    return {
+        "update": update_rows,
+        "renumbered": renumbered,
+        "insert": [{"lesson_number": number, "lesson_date": d} for number, d in insert_slots],
+        "delete": [l["lesson_id"] for l in leftover[len(open_slots):]],
+        "unchanged": unchanged,
+        "first_lesson_date": slots[min(slots)] if slots else None,
+    }
+
+
+def apply_lesson_diff(db: Session, package_id: int, student_id: int, diff: Dict) -> Dict:
+    """
+    Write a diff_package_lessons plan: one tombstoned DELETE, batched
+    UPDATEs by primary key, one INSERT ... RETURNING and the package's
+    first_lesson_date. Returns the delta for clients:
+    {"package_id", "first_lesson_date", "inserted", "updated", "deleted", "unchanged"}.
+    A proposed date another package of the student already uses raises
+    IntegrityError (see is_lesson_date_conflict). Does not commit.
+    """
+    now = datetime.utcnow()
+    seq = current_change_seq(db)
+
+    if diff["delete"]:
+        bulk_delete_with_tombstones(
+            db,
+            db.query(Lesson).filter(Lesson.lesson_id.in_(diff["delete"])),
+            "lesson",
+            Lesson.lesson_id,
+        )
+
+    updated: List[Dict] = []
+    if diff["renumbered"]:
+        # park moved rows on negative numbers first so renumbering never
+        # collides with another row of the package mid-batch
+        db.execute(
+            update(Lesson)
+            .where(Lesson.lesson_id.in_(diff["renumbered"]))
+            .values(lesson_number=-Lesson.lesson_number)
+            .execution_options(synchronize_session=False)
+        )
+    if diff["update"]:
+        # ORM bulk UPDATE by primary key, batched per set of changed columns
+        db.execute(update(Lesson), [dict(u, updated_at=now, change_seq=seq) for u in diff["update"]])
+        updated = [
+            dict(r) for r in db.execute(
+                select(*[getattr(Lesson, f) for f in LESSON_FIELDS])
+                .where(Lesson.lesson_id.in_([u["lesson_id"] for u in diff["update"]]))
+                .order_by(Lesson.lesson_number)
+            ).mappings()
+        ]
+
+    inserted = insert_lessons(db, [
+        dict(row, package_id=package_id, student_id=student_id, is_first=(row["lesson_number"] == 1),
+             is_manual_override=False, status="scheduled", is_makeup=False,
+             updated_at=now, change_seq=seq)
+        for row in diff["insert"]
+    ])
+
+    if diff["update"] or diff["insert"] or diff["delete"]:
+        db.execute(
+            update(Package)
+            .where(Package.package_id == package_id)
+            .values(first_lesson_date=diff["first_lesson_date"], updated_at=now, change_seq=seq)
+            .execution_options(synchronize_session=False)
+        )
+
+    return {
+        "package_id": package_id,
+        "first_lesson_date": diff["first_lesson_date"],
+        "inserted": inserted,
+        "updated": updated,
+        "deleted": list(diff["delete"]),
+        "unchanged": diff["unchanged"],
+    }
+
+
+def existing_lessons(db: Session, package_id: int) -> List[Dict]:
+    """A package's lessons as plain rows (no ORM objects loaded)."""
+    return [
+        dict(r) for r in db.execute(
+            select(*[getattr(Lesson, f) for f in LESSON_FIELDS])
+            .where(Lesson.package_id == package_id)
+        ).mappings()
+    ]
@@ -0,0 +1,171 @@
+# backend/app/services/multi_sheet_export.py
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, List
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db import SessionLocal, engine, read_session_factory
+from ..models import Student, Lesson
+from .exports import (
+    dashboard_sheet_rows,
+    format_lesson_cell,
+    iter_export_packages,
+    FILL_ATTENDED,
+    FILL_LEAVE,
+    FILL_MU,
+)
+
+MULTI_SHEET_FILENAME = "dashboard_sheets.xlsx"
+
+# every part registers these fills first and in this order, so the
+# style ids written into each sheet match the merged workbook's styles.xml
+PRIMED_FILLS = (FILL_ATTENDED, FILL_LEAVE, FILL_MU)
+
+# below this many lessons, starting worker processes costs more than it saves
+PARALLEL_MIN_LESSONS = 20_000
+
+_INVALID_TITLE_CHARS = re.compile(r"[\[\]:*?/\\]")
+_SHEET_PART = re.compile(r"xl/worksheets/sheet(\d+)\.xml")
+
+# ---------------------------------------------------------
+# Sheet plan: one sheet per package size and per group
+# ---------------------------------------------------------
+def _sheet_title(name: str, used: set) -> str:
+    """Excel titles: max 31 chars, no []:*?/\\, unique (case-insensitive)."""
+    base = _INVALID_TITLE_CHARS.sub("_", name).strip("'") or "Sheet"
+    title = base[:31]
+    n = 2
+    while title.lower() in used:
+        suffix = f" ({n})"
+        title = base[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(title.lower())
+    return title
+
+
+def plan_sheets(db: Session) -> List[Dict]:
+    """Sheet specs: "4 Lessons", "8 Lessons", one per group_name, then "No Group"."""
+    used: set = set()
+    specs = [
+        {"title": _sheet_title("4 Lessons", used), "package_size": 4, "max_lessons": 4},
+        {"title": _sheet_title("8 Lessons", used), "package_size": 8, "max_lessons": 8},
+    ]
+    groups = db.execute(
+        select(Student.group_name).distinct()
+        .where(Student.group_name.isnot(None), Student.group_name != "")
+        .order_by(Student.group_name)
+    ).scalars().all()
+    for group in groups:
+        specs.append({"title": _sheet_title(f"Group {group}", used), "group_name": group, "max_lessons": 8})
+    no_group = or_(Student.group_name.is_(None), Student.group_name == "")
+    if db.execute(select(exists().where(no_group))).scalar():
+        specs.append({"title": _sheet_title("No Group", used), "no_group": True, "max_lessons": 8})
+    return specs
+
+# ---------------------------------------------------------
+# Worker: render one sheet into its own single-sheet workbook
+# ---------------------------------------------------------
+def _prime_styles(ws) -> None:
+    for fill in PRIMED_FILLS:
+        cell = WriteOnlyCell(ws)
+        cell.fill = fill
+        cell.style_id  # registers the cell style on the workbook
+
+
+def render_sheet_part(spec: Dict, path: str) -> str:
+    """Runs in a pool process: one query partition, one sheet, saved to `path`."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(spec["title"])
+    _prime_styles(ws)
+
+    db = read_session_factory()() if spec.get("replica", True) else SessionLocal()
+    try:
+        packages = iter_export_packages(
+            db,
+            package_size=spec.get("package_size"),
+            group_name=spec.get("group_name"),
+            no_group=spec.get("no_group", False),
+        )
+        styled = lambda lesson: format_lesson_cell(WriteOnlyCell(ws), lesson)
+        for row in dashboard_sheet_rows(packages, spec["max_lessons"], styled):
+            ws.append(row)
+    finally:
+        db.close()
+
+    wb.save(path)
+    return path
+
+# ---------------------------------------------------------
+# Merge parts into one workbook
+# ---------------------------------------------------------
+def merge_sheet_parts(titles: List[str], part_paths: List[str], out: BinaryIO) -> None:
+    """
+    Build an empty workbook with the final sheet names and primed styles,
+    then swap each empty worksheet XML for the rendered part's sheet.
+    """
+    skeleton = openpyxl.Workbook(write_only=True)
+    for title in titles:
+        ws = skeleton.create_sheet(title)
+        _prime_styles(ws)
+
+    with tempfile.TemporaryFile() as skel_file:
+        skeleton.save(skel_file)
+        skel_file.seek(0)
+        with zipfile.ZipFile(skel_file) as skel, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as merged:
+            for item in skel.infolist():
+                m = _SHEET_PART.fullmatch(item.filename)
+                if not m:
+                    merged.writestr(item, skel.read(item.filename))
+                    continue
+                with zipfile.ZipFile(part_paths[int(m.group(1)) - 1]) as part:
+                    with part.open("xl/worksheets/sheet1.xml") as src, merged.open(item.filename, "w") as dst:
+                        shutil.copyfileobj(src, dst)
+
+
+def _pool_size(db: Session, n_sheets: int) -> int:
+    processes = settings.EXPORT_PROCESSES or os.cpu_count() or 1
+    if processes == 1 or multiprocessing.current_process().daemon:
+        # e.g. inside a Celery prefork worker: no child processes allowed
+        return 1
+    if db.execute(select(func.count(Lesson.lesson_id))).scalar() < PARALLEL_MIN_LESSONS:
+        return 1
+    return max(1, min(processes, n_sheets))
+
+# ---------------------------------------------------------
+# MAIN FUNCTION
+# ---------------------------------------------------------
+def write_multi_sheet_xlsx(db: Session, out: BinaryIO) -> None:
+    """
+    Dashboard workbook with a sheet per package size and per group. Sheets
+    are rendered in parallel in a process pool (EXPORT_PROCESSES), each
+    worker streaming its own partition of students, then merged.
+    """
+    specs = plan_sheets(db)
+    # parts read from the replica unless the caller's session is on the
+    # primary (read-your-writes, or a replica behind an export job)
+    replica = db.get_bind() is not engine
+    for spec in specs:
+        spec["replica"] = replica
+    with tempfile.TemporaryDirectory(prefix="sheets-") as tmp:
+        paths = [os.path.join(tmp, f"part{i}.xlsx") for i in range(len(specs))]
+        workers = _pool_size(db, len(specs))
+        if workers == 1:
+            for spec, path in zip(specs, paths):
+                render_sheet_part(spec, path)
+        else:
+            # spawn: workers open their own engine instead of inheriting
+            # the parent's pooled connections
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                list(pool.map(render_sheet_part, specs, paths))
+        merge_sheet_parts([s["title"] for s in specs], paths, out)
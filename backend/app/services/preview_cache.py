@@ -0,0 +1,71 @@
+# backend/app/services/preview_cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from ..config import settings
+
+
+class PreviewCache:
+    """
+    Bounded LRU cache for schedule previews.
+
+    Keys carry the CLOSURES data version read from the database, so entries
+    computed before a closure write are never served afterwards, whichever
+    worker handled the write. The first key on a newer version drops the
+    entries of older ones.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.closure_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, closure_version: int, *parts: Hashable) -> tuple:
+        """`closure_version` is get_data_version(db, CLOSURES) from the session that fills the entry."""
+        if closure_version > self.closure_version:
+            with self._lock:
+                if closure_version > self.closure_version:
+                    self.closure_version = closure_version
+                    # entries keyed on older versions can never hit again
+                    self._data.clear()
+        return (closure_version,) + parts
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # compute outside the lock; a concurrent miss just computes twice
+        value = compute()
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "closure_version": self.closure_version,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+preview_cache = PreviewCache(maxsize=settings.PREVIEW_CACHE_SIZE)
@@ -0,0 +1,55 @@
+# backend/app/services/read_routing.py
+import hashlib
+import hmac
+import math
+import time
+
+from fastapi import Request
+
+from ..config import settings
+
+# Set on successful write responses: "<unix time>:<signature>", the time
+# until which this client's reads should go to the primary. Clients echo it
+# back on their requests, which carries the window across workers.
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ReplicaLagGuard:
+    """
+    Read-your-writes on top of a lagging replica: after a client writes,
+    its reads go to the primary for `window` seconds.
+
+    The window travels only in the echoed READ_PRIMARY_HEADER, not in a
+    per-address table, so users behind one proxy or NAT do not share it.
+    The value is signed with SECRET_KEY and must lie within one window of
+    now, so a client cannot pin its reads to the primary with a made-up
+    far-future time.
+    """
+
+    def __init__(self, window: float, secret: str):
+        self.window = window
+        self._secret = secret.encode("utf-8")
+
+    def _sign(self, until: str) -> str:
+        return hmac.new(self._secret, until.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+    def note_write(self, request: Request) -> str:
+        """Header value for a successful write's response."""
+        # rounded down, so the value never lies beyond one window from now
+        until = f"{math.floor((time.time() + self.window) * 1000) / 1000:.3f}"
+        return f"{until}:{self._sign(until)}"
+
+    def wants_primary(self, request: Request) -> bool:
+        until, _, signature = request.headers.get(READ_PRIMARY_HEADER, "").partition(":")
+        if not signature or not hmac.compare_digest(signature, self._sign(until)):
+            return False
+        try:
+            until_ts = float(until)
+        except ValueError:
+            return False
+        now = time.time()
+        return now < until_ts <= now + self.window
+
+
+lag_guard = ReplicaLagGuard(settings.READ_AFTER_WRITE_SECONDS, settings.SECRET_KEY)
@@ -0,0 +1,93 @@
+# backend/app/services/regenerate_jobs.py
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .. import crud
+from ..models import Student, Package
+from .event_bus import publish_event
+from .jobs import record_job_item, start_job
+from .lesson_writer import is_lesson_date_conflict, LESSON_DATE_CONFLICT
+
+# packages per dispatched task
+REGENERATE_BATCH_SIZE = 20
+
+# ---------------------------------------------------------
+# Which packages a regenerate job covers
+# ---------------------------------------------------------
+def resolve_regenerate_packages(
+    db: Session,
+    package_ids: Optional[Sequence[int]] = None,
+    student_ids: Optional[Sequence[int]] = None,
+    group_name: Optional[str] = None,
+    package_size: Optional[int] = None,
+    latest_only: bool = True,
+) -> List[int]:
+    """
+    Explicit package_ids are used as given (unknown ids are reported per
+    item by the job). Otherwise packages are selected by student / group /
+    size; latest_only keeps each student's newest package.
+    """
+    if package_ids:
+        return list(dict.fromkeys(package_ids))
+
+    q = db.query(Package.package_id).join(Student, Student.student_id == Package.student_id)
+    if student_ids:
+        q = q.filter(Student.student_id.in_(student_ids))
+    if group_name:
+        q = q.filter(Student.group_name == group_name)
+    if package_size:
+        q = q.filter(Package.package_size == package_size)
+    if latest_only:
+        latest = db.query(func.max(Package.package_id)).group_by(Package.student_id)
+        q = q.filter(Package.package_id.in_(latest.scalar_subquery()))
+    return [pid for (pid,) in q.order_by(Student.name, Package.package_id)]
+
+
+def batches(ids: Sequence[int], size: int = REGENERATE_BATCH_SIZE) -> List[List[int]]:
+    return [list(ids[i:i + size]) for i in range(0, len(ids), size)]
+
+# ---------------------------------------------------------
+# One batch (runs in a Celery worker or the local pool)
+# ---------------------------------------------------------
+def run_regenerate_batch(db: Session, job_id: int, package_ids: Sequence[int]) -> None:
+    """
+    Regenerate each package in its own transaction and record the outcome
+    as a job item, so progress is visible while the batch runs and one bad
+    package does not stop the others.
+    """
+    start_job(db, job_id)
+    for package_id in package_ids:
+        pkg = crud.get_package(db, package_id)
+        if pkg is None:
+            record_job_item(db, job_id, package_id, "skipped", error="Package not found")
+            continue
+        student_id = pkg.student_id
+        try:
+            delta = crud.regenerate_package(db, pkg)
+        except Exception as e:
+            db.rollback()
+            if isinstance(e, IntegrityError) and is_lesson_date_conflict(e):
+                error = LESSON_DATE_CONFLICT
+            else:
+                error = f"{type(e).__name__}: {e}"
+            record_job_item(db, job_id, package_id, "failed", error=error)
+            continue
+
+        if delta is None:
+            record_job_item(db, job_id, package_id, "skipped", error="No lesson dates could be scheduled")
+            continue
+        publish_event("package.regenerated", student_id=student_id, **delta)
+        record_job_item(db, job_id, package_id, "done", result=delta_summary(delta))
+
+
+def delta_summary(delta: Dict) -> Dict:
+    return {
+        "first_lesson_date": delta["first_lesson_date"].isoformat() if delta["first_lesson_date"] else None,
+        "inserted": len(delta["inserted"]),
+        "updated": len(delta["updated"]),
+        "deleted": len(delta["deleted"]),
+        "unchanged": delta["unchanged"],
+    }
@@ -0,0 +1,202 @@
+# backend/app/services/rollover.py
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from ..models import Student, Package, Lesson, Job
+from .scheduler import (
+    collect_valid_dates_batch,
+    lesson_weekdays,
+    load_closure_calendar,
+    SCHEDULE_HORIZON,
+)
+from .data_version import bump_data_version, STUDENTS
+from .jobs import job_out
+from .lesson_writer import insert_packages_with_lessons
+
+# ---------------------------------------------------------
+# Select students for a rollover
+# ---------------------------------------------------------
+def rollover_student_query(
+    db: Session,
+    student_ids: Optional[Sequence[int]] = None,
+    group_name: Optional[str] = None,
+    package_size: Optional[int] = None,
+    status: Optional[str] = None,
+):
+    q = db.query(Student)
+    if student_ids:
+        q = q.filter(Student.student_id.in_(student_ids))
+    if group_name:
+        q = q.filter(Student.group_name == group_name)
+    if package_size:
+        q = q.filter(Student.package_size == package_size)
+    if status:
+        if status == "active":
+            # status defaults to "active" but may be NULL on older rows
+            q = q.filter(or_(Student.status == "active", Student.status.is_(None)))
+        else:
+            q = q.filter(Student.status == status)
+    return q.order_by(Student.name, Student.student_id)
+
+# ---------------------------------------------------------
+# Create the next package for many students at once
+# ---------------------------------------------------------
+def rollover_students(
+    db: Session,
+    students: Sequence[Student],
+    mark_paid: bool = False,
+    dry_run: bool = False,
+    today: Optional[date] = None,
+) -> List[Dict]:
+    """
+    Create each student's next package, starting the day after their last
+    regular lesson, or `today` (default date.today()) when that lesson is
+    further back, so a lapsed student never gets back-dated lessons.
+    Closures are loaded once, all schedules are computed in memory, and
+    packages + lessons are written with multi-row inserts.
+    Returns one result dict per student. Does not commit.
+    """
+    today = today or date.today()
+    if not students:
+        return []
+
+    ids = [s.student_id for s in students]
+    last_dates = dict(
+        db.query(Package.student_id, func.max(Lesson.lesson_date))
+        .join(Lesson, Lesson.package_id == Package.package_id)
+        .filter(Package.student_id.in_(ids), Lesson.is_makeup.isnot(True))
+        .group_by(Package.student_id)
+        .all()
+    )
+
+    starts: Dict[int, date] = {}
+    for s in students:
+        last = last_dates.get(s.student_id)
+        starts[s.student_id] = max(last + timedelta(days=1), today) if last else (s.start_date or today)
+
+    lo = min(starts.values())
+    calendar = load_closure_calendar(db, lo, max(starts.values()) + SCHEDULE_HORIZON)
+
+    requests = []
+    for s in students:
+        size = 8 if int(s.package_size or 4) >= 8 else 4
+        requests.append((starts[s.student_id], lesson_weekdays(s, size), size, s.end_date))
+    schedules = collect_valid_dates_batch(requests, calendar)
+
+    results: List[Dict] = []
+    specs: List[Dict] = []
+    for s, req, dates in zip(students, requests, schedules):
+        out = {
+            "student_id": s.student_id,
+            "name": s.name,
+            "status": "created",
+            "package_id": None,
+            "package_size": req[2],
+            "lesson_dates": dates,
+            "reason": None,
+        }
+        if not dates:
+            out["status"] = "skipped"
+            out["reason"] = "no lesson dates before end_date"
+        else:
+            specs.append({
+                "student_id": s.student_id,
+                "package_size": req[2],
+                "payment_status": mark_paid,
+                "lesson_dates": dates,
+                "_result": out,
+            })
+        results.append(out)
+
+    if dry_run or not specs:
+        return results
+
+    package_ids = insert_packages_with_lessons(db, specs)
+    for spec, package_id in zip(specs, package_ids):
+        spec["_result"]["package_id"] = package_id
+
+    return results
+
+# ---------------------------------------------------------
+# Scheduled rollover: students whose latest package is ending
+# ---------------------------------------------------------
+def due_rollover_student_ids(
+    db: Session,
+    cutoff: date,
+    student_ids: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """
+    Active students whose latest package has every regular lesson dated on
+    or before `cutoff` (today + N days), skipping students whose end_date
+    is already reached. `student_ids` limits the scan to those students.
+    """
+    latest = db.query(func.max(Package.package_id).label("package_id"))
+    if student_ids is not None:
+        latest = latest.filter(Package.student_id.in_(student_ids))
+    latest = latest.group_by(Package.student_id).subquery()
+    last_lesson = (
+        db.query(Package.student_id, func.max(Lesson.lesson_date).label("last_date"))
+        .join(latest, latest.c.package_id == Package.package_id)
+        .join(Lesson, Lesson.package_id == Package.package_id)
+        .filter(Lesson.is_makeup.isnot(True))
+        .group_by(Package.student_id)
+        .subquery()
+    )
+    q = (
+        rollover_student_query(db, student_ids=student_ids, status="active")
+        .join(last_lesson, last_lesson.c.student_id == Student.student_id)
+        .filter(last_lesson.c.last_date <= cutoff)
+        .filter(or_(Student.end_date.is_(None), Student.end_date > last_lesson.c.last_date))
+    )
+    return [s.student_id for s in q.with_entities(Student.student_id)]
+
+
+def run_rollover_job(db: Session, job_id: int, today: Optional[date] = None) -> Dict:
+    """
+    Run a rollover Job: find due students, then roll them over in chunks
+    of params["chunk_size"], one transaction (and one closure load) per
+    chunk. Progress is committed with each chunk; a failing chunk is
+    rolled back, recorded in job.errors and the run continues.
+    """
+    job = db.get(Job, job_id)
+    params = job.params or {}
+    within_days = int(params.get("within_days", 7))
+    chunk_size = int(params.get("chunk_size", 200))
+    today = today or date.today()
+    cutoff = today + timedelta(days=within_days)
+
+    ids = due_rollover_student_ids(db, cutoff)
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    job.total = len(ids)
+    db.commit()
+
+    for i in range(0, len(ids), chunk_size):
+        chunk = ids[i:i + chunk_size]
+        try:
+            # re-check inside the transaction: a concurrent run may have
+            # rolled some of these students over already
+            due = due_rollover_student_ids(db, cutoff, student_ids=chunk)
+            students = rollover_student_query(db, student_ids=due).all() if due else []
+            results = rollover_students(db, students, today=today)
+            created = sum(1 for r in results if r["status"] == "created")
+            job.processed += len(chunk)
+            job.created += created
+            job.skipped += len(chunk) - created
+            if results:
+                bump_data_version(db, STUDENTS)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            job = db.get(Job, job_id)
+            job.processed += len(chunk)
+            job.failed += len(chunk)
+            job.errors = (job.errors or []) + [{"student_ids": chunk, "error": f"{type(e).__name__}: {e}"}]
+            db.commit()
+
+    job.status = "failed" if job.failed and not job.created else "done"
+    job.finished_at = datetime.utcnow()
+    db.commit()
+    return job_out(job)
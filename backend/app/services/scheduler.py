@@ -1,57 +1,253 @@
 # backend/app/services/scheduler.py
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import date, timedelta
-from typing import List, Set
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 from sqlalchemy.orm import Session
 from types import SimpleNamespace
 
+import numpy as np
+
 from ..models import Closure, Student, Package
 
+# safety cutoff for open-ended schedules = 2 years
+SCHEDULE_HORIZON = timedelta(days=365 * 2)
+
+# ---------------------------------------------------------
+# Closure calendar: merged, sorted closure intervals
+# ---------------------------------------------------------
+class ClosureCalendar:
+    """
+    Closures kept as merged, sorted (start_date, end_date) intervals.
+    Lookups are bisect-based, so cost does not depend on how many days
+    the closures cover.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[date, date]] = ()):
+        merged: List[List[date]] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1] + timedelta(days=1):
+                if end > merged[-1][1]:
+                    merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        self.intervals: List[Tuple[date, date]] = [(s, e) for s, e in merged]
+        self._starts: List[date] = [s for s, _ in self.intervals]
+
+    def _interval_for(self, d: date) -> Optional[Tuple[date, date]]:
+        i = bisect_right(self._starts, d) - 1
+        if i >= 0 and self.intervals[i][1] >= d:
+            return self.intervals[i]
+        return None
+
+    def is_blocked(self, d: date) -> bool:
+        return self._interval_for(d) is not None
+
+    def __contains__(self, d: date) -> bool:
+        return self.is_blocked(d)
+
+    def next_open_day(self, d: date) -> date:
+        """Return d itself if it is open, otherwise the first day after its closure."""
+        interval = self._interval_for(d)
+        if interval is None:
+            return d
+        return interval[1] + timedelta(days=1)
+
+    def intervals_between(self, lo: date, hi: date) -> List[Tuple[date, date]]:
+        """Intervals overlapping [lo, hi], clipped to that window."""
+        i = max(bisect_right(self._starts, lo) - 1, 0)
+        j = bisect_left(self._starts, hi + timedelta(days=1))
+        out = []
+        for start, end in self.intervals[i:j]:
+            if end < lo:
+                continue
+            out.append((max(start, lo), min(end, hi)))
+        return out
+
 # ---------------------------------------------------------
-# Helper: iterate date range
+# Load closures overlapping a scheduling window
 # ---------------------------------------------------------
-def _daterange(start: date, end: date):
-    d = start
-    while d <= end:
-        yield d
-        d += timedelta(days=1)
+def load_closure_calendar(
+    db: Session,
+    window_start: date | None = None,
+    window_end: date | None = None
+) -> ClosureCalendar:
+    q = db.query(Closure.start_date, Closure.end_date)
+    if window_start is not None:
+        q = q.filter(Closure.end_date >= window_start)
+    if window_end is not None:
+        q = q.filter(Closure.start_date <= window_end)
+    return ClosureCalendar((r.start_date, r.end_date) for r in q.all())
 
 # ---------------------------------------------------------
-# Load blocked closure dates
+# Weekdays used by a package
 # ---------------------------------------------------------
-def load_closure_dates(db: Session) -> Set[date]:
-    blocked = set()
-    closures = db.query(Closure).all()
-    for c in closures:
-        for d in _daterange(c.start_date, c.end_date):
-            blocked.add(d)
-    return blocked
+def lesson_weekdays(student: Student, package_size: int) -> List[int]:
+    if int(package_size) == 8 and student.lesson_day_2 is not None:
+        return sorted({student.lesson_day_1, student.lesson_day_2})
+    return [student.lesson_day_1]
 
 # ---------------------------------------------------------
 # Produce valid lesson dates
 # ---------------------------------------------------------
+def _schedule_cutoff(start_from: date, end_date: date | None) -> date:
+    cutoff = start_from + SCHEDULE_HORIZON
+    if end_date and end_date < cutoff:
+        cutoff = end_date
+    return cutoff
+
+
+def _next_lesson_weekday(d: date, days_of_week: Sequence[int]) -> date:
+    wd = d.weekday()
+    return d + timedelta(days=min((x - wd) % 7 for x in days_of_week))
+
+
+def iter_lesson_dates(
+    start_from: date,
+    days_of_week: Sequence[int],
+    blocked: ClosureCalendar,
+    last_day: date
+) -> Iterator[date]:
+    """
+    Lazily yield open lesson dates from start_from through last_day.
+    Jumps straight to the next allowed weekday and skips whole closure
+    intervals instead of stepping one day at a time.
+    """
+    if not days_of_week:
+        return
+
+    cur = start_from
+    while True:
+        cur = _next_lesson_weekday(cur, days_of_week)
+        if cur > last_day:
+            return
+        open_day = blocked.next_open_day(cur)
+        if open_day != cur:
+            cur = open_day
+            continue
+        yield cur
+        cur += timedelta(days=1)
+
+
 def collect_valid_dates(
     start_from: date,
     days_of_week: List[int],
     package_size: int,
-    blocked: Set[date],
+    blocked: ClosureCalendar,
     end_date: date | None
 ) -> List[date]:
+    cutoff = _schedule_cutoff(start_from, end_date)
+    return list(islice(iter_lesson_dates(start_from, days_of_week, blocked, cutoff), package_size))
 
+
+def collect_valid_dates_daywalk(
+    start_from: date,
+    days_of_week: List[int],
+    package_size: int,
+    blocked: ClosureCalendar,
+    end_date: date | None
+) -> List[date]:
+    """Reference day-by-day walk; collect_valid_dates must match it."""
     results: List[date] = []
     cur = start_from
-
-    # safety cutoff = 2 years
-    cutoff = start_from + timedelta(days=365 * 2)
-    if end_date and end_date < cutoff:
-        cutoff = end_date
+    cutoff = _schedule_cutoff(start_from, end_date)
 
     while len(results) < package_size and cur <= cutoff:
-        if cur.weekday() in days_of_week and cur not in blocked:
+        if cur.weekday() in days_of_week and not blocked.is_blocked(cur):
             results.append(cur)
         cur += timedelta(days=1)
 
     return results
 
+# ---------------------------------------------------------
+# Future schedule stream ("Show Future")
+# ---------------------------------------------------------
+def future_schedule_window(start_from: date, end_date: date | None) -> Tuple[date, date]:
+    """
+    (block_cutoff, last_day) for a future stream: a new block starts while
+    the previous one ended before block_cutoff, and may run on to last_day.
+    """
+    block_cutoff = end_date or start_from + SCHEDULE_HORIZON
+    last_day = end_date or block_cutoff + SCHEDULE_HORIZON
+    return block_cutoff, last_day
+
+
+def iter_future_blocks(
+    start_from: date,
+    days_of_week: Sequence[int],
+    package_size: int,
+    blocked: ClosureCalendar,
+    end_date: date | None
+) -> Iterator[List[date]]:
+    """
+    Walk the calendar once from start_from and lazily yield package-sized
+    blocks of lesson dates, stopping at the student's end_date (or the
+    2-year horizon when there is none).
+    """
+    block_cutoff, last_day = future_schedule_window(start_from, end_date)
+    dates = iter_lesson_dates(start_from, days_of_week, blocked, last_day)
+    cursor = start_from
+    while cursor <= block_cutoff:
+        block = list(islice(dates, package_size))
+        if not block:
+            return
+        yield block
+        cursor = block[-1] + timedelta(days=1)
+
+# ---------------------------------------------------------
+# Batched NumPy path: many packages at once
+# ---------------------------------------------------------
+def collect_valid_dates_batch(
+    requests: Sequence[Tuple[date, Sequence[int], int, date | None]],
+    blocked: ClosureCalendar
+) -> List[List[date]]:
+    """
+    Schedule many packages at once. Each request is
+    (start_from, days_of_week, package_size, end_date); results come back
+    in the same order and match collect_valid_dates for each request.
+    Requests sharing a weekday pattern are solved together with
+    np.busday_offset against one busdaycalendar.
+    """
+    results: List[List[date]] = [[] for _ in requests]
+    groups = defaultdict(list)
+    for i, (start, days, size, _end) in enumerate(requests):
+        if days and size > 0:
+            groups[tuple(sorted(set(days)))].append(i)
+    if not groups:
+        return results
+
+    lo = min(requests[i][0] for idx in groups.values() for i in idx)
+    hi = max(requests[i][0] for idx in groups.values() for i in idx) + SCHEDULE_HORIZON
+    spans = [
+        np.arange(np.datetime64(s, "D"), np.datetime64(e, "D") + 1)
+        for s, e in blocked.intervals_between(lo, hi)
+    ]
+    holidays = np.concatenate(spans) if spans else np.array([], dtype="datetime64[D]")
+
+    for days, idx in groups.items():
+        weekmask = [1 if d in days else 0 for d in range(7)]
+        busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=holidays)
+
+        starts = np.array([requests[i][0] for i in idx], dtype="datetime64[D]")
+        sizes = [int(requests[i][2]) for i in idx]
+        first = np.busday_offset(starts, 0, roll="forward", busdaycal=busdaycal)
+        grid = np.busday_offset(
+            first[:, None],
+            np.arange(max(sizes))[None, :],
+            roll="forward",
+            busdaycal=busdaycal,
+        )
+
+        for row, i in enumerate(idx):
+            start, _days, _size, end = requests[i]
+            cutoff = np.datetime64(_schedule_cutoff(start, end), "D")
+            dates = grid[row, :sizes[row]]
+            results[i] = dates[dates <= cutoff].astype(object).tolist()
+
+    return results
+
 # ---------------------------------------------------------
 # MAIN FUNCTION: generate lessons
 # ---------------------------------------------------------
@@ -60,20 +256,16 @@ def generate_lessons_for_package(
     student: Student,
     pkg: Package,
     override_existing: bool = False,
-    start_from: date | None = None
+    start_from: date | None = None,
+    calendar: ClosureCalendar | None = None
 ):
     """
     Final clean generator.
     Produces up to pkg.package_size lessons OR until student.end_date.
+    Pass `calendar` to reuse closures already loaded for the window.
     """
 
-    blocked = load_closure_dates(db)
-
-    # Determine weekdays
-    if pkg.package_size == 8 and student.lesson_day_2 is not None:
-        days = sorted({student.lesson_day_1, student.lesson_day_2})
-    else:
-        days = [student.lesson_day_1]
+    days = lesson_weekdays(student, pkg.package_size)
 
     # Determine starting date
     start_date = start_from or student.start_date
@@ -83,17 +275,15 @@ def generate_lessons_for_package(
     end_date = student.end_date   # may be None → fallback to 2-year safety below
     pkg_size = int(pkg.package_size)
 
-    # Build lesson dates
-    results = []
-    cur = start_date
-    limit = start_date + timedelta(days=365 * 2)
+    limit = start_date + SCHEDULE_HORIZON
     if end_date and end_date < limit:
         limit = end_date
 
-    while len(results) < pkg_size and cur <= limit:
-        if cur.weekday() in days and cur not in blocked:
-            results.append(cur)
-        cur += timedelta(days=1)
+    if calendar is None:
+        calendar = load_closure_calendar(db, start_date, limit)
+
+    # Build lesson dates
+    results = collect_valid_dates(start_date, days, pkg_size, calendar, limit)
 
     # Convert to objects
     lessons = []
@@ -108,4 +298,3 @@ def generate_lessons_for_package(
         )
 
     return lessons
-
@@ -0,0 +1,252 @@
+# backend/app/services/student_import.py
+import io
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from ..models import Student
+from .change_tracking import current_change_seq
+from .data_version import bump_data_version, STUDENTS
+from .lesson_writer import insert_packages_with_lessons
+from .scheduler import (
+    collect_valid_dates_batch,
+    lesson_weekdays,
+    load_closure_calendar,
+    SCHEDULE_HORIZON,
+)
+
+# rows written per transaction
+IMPORT_CHUNK_SIZE = 500
+
+# accepted header spellings -> StudentCreate field
+COLUMN_ALIASES = {
+    "name": "name",
+    "student": "name",
+    "student_name": "name",
+    "cefr": "cefr",
+    "level": "cefr",
+    "group": "group_name",
+    "group_name": "group_name",
+    "class": "group_name",
+    "lesson_day_1": "lesson_day_1",
+    "lesson_day": "lesson_day_1",
+    "day_1": "lesson_day_1",
+    "day": "lesson_day_1",
+    "lesson_day_2": "lesson_day_2",
+    "day_2": "lesson_day_2",
+    "package_size": "package_size",
+    "package": "package_size",
+    "size": "package_size",
+    "start_date": "start_date",
+    "start": "start_date",
+    "end_date": "end_date",
+    "end": "end_date",
+}
+
+DAY_NAMES = {name: i for i, name in enumerate(["mon", "tue", "wed", "thu", "fri", "sat", "sun"])}
+
+_students_adapter = TypeAdapter(List[schemas.StudentCreate])
+
+# ---------------------------------------------------------
+# Read + validate
+# ---------------------------------------------------------
+def read_import_file(filename: str, content: bytes) -> pd.DataFrame:
+    """Load a .csv or .xlsx upload as text-ish cells, one row per student."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+    elif name.endswith((".xlsx", ".xlsm")):
+        df = pd.read_excel(io.BytesIO(content), dtype=object, engine="openpyxl")
+    else:
+        raise ValueError("Upload a .csv or .xlsx file")
+
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    df = df.rename(columns={c: COLUMN_ALIASES[c] for c in df.columns if c in COLUMN_ALIASES})
+    missing = {"name", "lesson_day_1", "package_size", "start_date"} - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+    return df
+
+
+def _clean_cell(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)) or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _clean_day(value):
+    """Weekday as 0-6, also accepting names like "Mon" / "Monday"."""
+    if isinstance(value, str):
+        key = value.strip().lower()[:3]
+        if key in DAY_NAMES:
+            return DAY_NAMES[key]
+    return value
+
+
+def _row_record(row: Dict) -> Dict:
+    record = {field: _clean_cell(row.get(field)) for field in schemas.StudentCreate.model_fields}
+    record["lesson_day_1"] = _clean_day(record["lesson_day_1"])
+    record["lesson_day_2"] = _clean_day(record["lesson_day_2"])
+    return record
+
+
+def _format_error(err: Dict) -> str:
+    field = ".".join(str(p) for p in err["loc"][1:]) or "row"
+    return f"{field}: {err['msg']}"
+
+
+def _check_rules(payload: schemas.StudentCreate) -> List[str]:
+    """Checks StudentCreate does not express (create_student enforces them too)."""
+    problems = []
+    for field in ("lesson_day_1", "lesson_day_2"):
+        day = getattr(payload, field)
+        if day is not None and not 0 <= day <= 6:
+            problems.append(f"{field}: must be 0-6 or a day name")
+    if payload.end_date and payload.end_date < payload.start_date:
+        problems.append("end_date: must be the same as or after start_date")
+    return problems
+
+
+def validate_import_rows(df: pd.DataFrame) -> Tuple[List[Tuple[int, schemas.StudentCreate]], List[Dict]]:
+    """
+    Validate all rows against StudentCreate in one pass. Returns
+    ([(row_number, payload)], [{"row", "name", "errors"}]); row_number is the
+    spreadsheet row (header = 1).
+    """
+    records = [_row_record(r) for r in df.to_dict(orient="records")]
+    row_errors: Dict[int, List[str]] = {}
+
+    try:
+        payloads = _students_adapter.validate_python(records)
+        valid_idx = list(range(len(records)))
+    except ValidationError as e:
+        for err in e.errors():
+            row_errors.setdefault(err["loc"][0], []).append(_format_error(err))
+        valid_idx = [i for i in range(len(records)) if i not in row_errors]
+        payloads = _students_adapter.validate_python([records[i] for i in valid_idx])
+
+    valid = []
+    for i, payload in zip(valid_idx, payloads):
+        # same normalisation as crud.create_student
+        payload.package_size = 8 if payload.package_size >= 8 else 4
+        problems = _check_rules(payload)
+        if problems:
+            row_errors[i] = problems
+        else:
+            valid.append((i + 2, payload))
+
+    errors = [
+        {"row": i + 2, "name": records[i].get("name"), "errors": msgs}
+        for i, msgs in sorted(row_errors.items())
+    ]
+    return valid, errors
+
+# ---------------------------------------------------------
+# Schedule + insert
+# ---------------------------------------------------------
+def _insert_chunk(db: Session, chunk: List[Tuple[int, schemas.StudentCreate, List[date]]]) -> List[Dict]:
+    now = datetime.utcnow()
+    seq = current_change_seq(db)
+    student_rows = [
+        {
+            "name": p.name,
+            "cefr": p.cefr,
+            "group_name": p.group_name,
+            "lesson_day_1": p.lesson_day_1,
+            "lesson_day_2": p.lesson_day_2,
+            "package_size": p.package_size,
+            "start_date": p.start_date,
+            "end_date": p.end_date,
+            "status": "active",
+            "updated_at": now,
+            "change_seq": seq,
+        }
+        for _, p, _ in chunk
+    ]
+    student_ids = db.execute(
+        insert(Student).returning(Student.student_id, sort_by_parameter_order=True),
+        student_rows,
+    ).scalars().all()
+
+    package_ids = insert_packages_with_lessons(db, [
+        {
+            "student_id": student_id,
+            "package_size": p.package_size,
+            "payment_status": False,
+            "lesson_dates": dates,
+        }
+        for student_id, (_, p, dates) in zip(student_ids, chunk)
+    ])
+
+    return [
+        {
+            "row": row,
+            "student_id": student_id,
+            "name": p.name,
+            "package_id": package_id,
+            "lesson_dates": dates,
+        }
+        for student_id, package_id, (row, p, dates) in zip(student_ids, package_ids, chunk)
+    ]
+
+
+def import_students(
+    db: Session,
+    valid: List[Tuple[int, schemas.StudentCreate]],
+    dry_run: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Schedule every valid row against one closure calendar, then insert
+    students, packages and lessons with multi-row statements, committing
+    every `chunk_size` rows. A failing chunk is rolled back and reported
+    per row; later chunks still run. Returns (created, errors).
+    """
+    if not valid:
+        return [], []
+
+    starts = [p.start_date for _, p in valid]
+    calendar = load_closure_calendar(db, min(starts), max(starts) + SCHEDULE_HORIZON)
+
+    requests = []
+    for _, p in valid:
+        # lesson_weekdays only reads lesson_day_1 / lesson_day_2
+        requests.append((p.start_date, lesson_weekdays(p, p.package_size), p.package_size, p.end_date))
+    schedules = collect_valid_dates_batch(requests, calendar)
+    planned = [(row, p, dates) for (row, p), dates in zip(valid, schedules)]
+
+    if dry_run:
+        return [
+            {"row": row, "student_id": None, "name": p.name, "package_id": None, "lesson_dates": dates}
+            for row, p, dates in planned
+        ], []
+
+    created: List[Dict] = []
+    errors: List[Dict] = []
+    for i in range(0, len(planned), chunk_size):
+        chunk = planned[i:i + chunk_size]
+        try:
+            results = _insert_chunk(db, chunk)
+            bump_data_version(db, STUDENTS)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            msg = f"not saved: {e.__class__.__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+            errors.extend({"row": row, "name": p.name, "errors": [msg]} for row, p, _ in chunk)
+            continue
+        created.extend(results)
+    return created, errors
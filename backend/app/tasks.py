@@ -1,8 +1,16 @@
 # backend/app/tasks.py
+from concurrent.futures import ThreadPoolExecutor
 from celery import Celery
+from celery.schedules import crontab
 from .config import settings
 from .db import SessionLocal
 from . import models, crud
+from .services import change_tracking  # noqa: F401  (registers session hooks)
+from .services.event_bus import publish_event
+from .services.export_jobs import build_export_job
+from .services.jobs import claim_job, fail_job
+from .services.regenerate_jobs import run_regenerate_batch
+from .services.rollover import run_rollover_job
 
 celery_app = Celery(
     "tuition_tasks",
@@ -10,6 +18,38 @@ celery_app = Celery(
     backend=settings.REDIS_URL
 )
 
+# daily term rollover; run `celery -A app.tasks beat` next to the worker
+celery_app.conf.beat_schedule = {
+    "rollover-due-students": {
+        "task": "app.tasks.rollover_due_students_task",
+        "schedule": crontab(hour=settings.ROLLOVER_HOUR, minute=0),
+    },
+}
+
+_local_pool = None
+
+
+def submit_task(task, *args):
+    """
+    Queue a task according to TASK_BACKEND: on Celery, on an in-process
+    thread pool ("local", no Redis needed; also used when REDIS_URL is
+    empty) or inline ("eager").
+    """
+    global _local_pool
+    backend = settings.TASK_BACKEND
+    if backend == "celery" and not settings.REDIS_URL:
+        # no broker configured: the local pool stands in
+        backend = "local"
+    if backend == "eager":
+        return task.apply(args=args)
+    if backend == "local":
+        if _local_pool is None:
+            _local_pool = ThreadPoolExecutor(
+                max_workers=settings.LOCAL_TASK_WORKERS, thread_name_prefix="local-task"
+            )
+        return _local_pool.submit(task, *args)
+    return task.delay(*args)
+
 @celery_app.task
 def regenerate_package_task(package_id: int):
     db = SessionLocal()
@@ -17,8 +57,58 @@ def regenerate_package_task(package_id: int):
         # use package_id field
         pkg = db.query(models.Package).filter(models.Package.package_id == package_id).first()
         if pkg:
-            crud.regenerate_package(db, pkg)
+            delta = crud.regenerate_package(db, pkg)
+            # only reaches API workers with EVENT_BUS_BACKEND=redis
+            if delta is not None:
+                publish_event("package.regenerated", student_id=pkg.student_id, **delta)
     finally:
         db.close()
 
     return {"status": "ok", "package_id": package_id}
+
+
+@celery_app.task
+def regenerate_packages_task(job_id: int, package_ids: list):
+    """One batch of a regenerate job; progress is recorded per package."""
+    db = SessionLocal()
+    try:
+        run_regenerate_batch(db, job_id, package_ids)
+    finally:
+        db.close()
+    return {"status": "ok", "job_id": job_id, "package_ids": package_ids}
+
+
+@celery_app.task
+def build_export_task(job_id: str):
+    return build_export_job(job_id)
+
+
+def rollover_job_params(within_days: int = None, chunk_size: int = None) -> dict:
+    return {
+        "within_days": settings.ROLLOVER_WITHIN_DAYS if within_days is None else within_days,
+        "chunk_size": settings.ROLLOVER_CHUNK_SIZE if chunk_size is None else chunk_size,
+    }
+
+
+@celery_app.task(name="app.tasks.rollover_due_students_task")
+def rollover_due_students_task(job_id: int = None):
+    """
+    Roll over every student whose latest package is ending. Beat calls it
+    without a job_id (a Job row is claimed here); the API claims the row
+    first and passes its id.
+    """
+    db = SessionLocal()
+    try:
+        if job_id is None:
+            job = claim_job(db, "rollover", rollover_job_params())
+            if not job["leader"]:
+                return job
+            job_id = job["job_id"]
+        try:
+            return run_rollover_job(db, job_id)
+        except Exception as e:
+            db.rollback()
+            fail_job(db, job_id, f"{type(e).__name__}: {e}")
+            raise
+    finally:
+        db.close()
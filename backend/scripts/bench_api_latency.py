@@ -0,0 +1,132 @@
+# backend/scripts/bench_api_latency.py
+"""
+Load-test the hot API endpoints: p50 / p99 latency at 50 and 200 concurrent clients.
+
+Start the API first (e.g. uvicorn app.main:app --port 8000), then from backend/:
+
+    python -m scripts.bench_api_latency                      # http://localhost:8000
+    python -m scripts.bench_api_latency --save async.json
+    python -m scripts.bench_api_latency --compare sync.json  # earlier run, e.g. the sync stack
+
+Every level sends --requests requests per endpoint from that many
+concurrent clients. The status write re-sends each lesson's current
+status, so only change stamps move; --read-only skips it.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+LEVELS = (50, 200)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[k]
+
+
+async def discover(client: httpx.AsyncClient) -> Dict:
+    """A package and lesson to aim the per-id endpoints at."""
+    r = await client.get("/students/", params={"limit": 1})
+    r.raise_for_status()
+    for student in r.json():
+        for pkg in student["packages"]:
+            if pkg["lessons"]:
+                lesson = pkg["lessons"][0]
+                return {"package_id": pkg["package_id"], "lesson_id": lesson["lesson_id"], "status": lesson["status"]}
+    raise SystemExit("No student with lessons found; seed some data first")
+
+
+def endpoints(target: Dict, read_only: bool) -> Dict:
+    ops = {
+        "list_students": lambda c: c.get("/students/"),
+        "list_closures": lambda c: c.get("/closures/"),
+        "regenerate_preview": lambda c: c.get(f"/students/packages/{target['package_id']}/regenerate"),
+    }
+    if not read_only:
+        ops["lesson_status"] = lambda c: c.patch(
+            f"/lessons/{target['lesson_id']}/status", json={"status": target["status"]}
+        )
+    return ops
+
+
+async def run_level(client: httpx.AsyncClient, op, clients: int, requests: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            t0 = time.perf_counter()
+            try:
+                r = await op(client)
+                if r.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - t0
+    return {
+        "p50": statistics.median(latencies),
+        "p99": percentile(latencies, 99),
+        "rps": len(latencies) / elapsed if elapsed else 0,
+        "errors": errors,
+    }
+
+
+async def bench(url: str, requests: int, read_only: bool) -> Dict:
+    limits = httpx.Limits(max_connections=max(LEVELS), max_keepalive_connections=max(LEVELS))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        ops = endpoints(await discover(client), read_only)
+        results: Dict = {}
+        for name, op in ops.items():
+            await op(client)   # warm caches / pools
+            for clients in LEVELS:
+                results[f"{name}@{clients}"] = await run_level(client, op, clients, requests)
+        return results
+
+
+def report(results: Dict, baseline: Dict = None) -> None:
+    header = f"{'endpoint@clients':<26}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}"
+    if baseline:
+        header += f"{'p50 vs base':>13}{'p99 vs base':>13}"
+    print(header)
+    for key, r in results.items():
+        line = f"{key:<26}{r['p50']:>10.1f}{r['p99']:>10.1f}{r['rps']:>10.0f}{r['errors']:>8}"
+        base = (baseline or {}).get(key)
+        if base:
+            line += f"{r['p50'] / base['p50']:>12.2f}x{r['p99'] / base['p99']:>12.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint per level")
+    parser.add_argument("--read-only", action="store_true", help="skip the lesson status write")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save run")
+    args = parser.parse_args()
+
+    results = asyncio.run(bench(args.url, args.requests, args.read_only))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# backend/scripts/bench_dashboard_read.py
+"""
+Compare the two GET /students read paths at 1k, 10k and 50k lessons:
+ORM (selectinload + StudentOut validation) vs the flat Core read model.
+
+Run from backend/ against the configured DATABASE_URL:
+
+    python -m scripts.bench_dashboard_read
+    python -m scripts.bench_dashboard_read --sizes 1000 10000 --repeat 5
+
+Each size seeds its own students (group "bench-dashboard") in a
+transaction that is rolled back afterwards, nothing is committed. Both
+paths read only those students and serialize to the same JSON body; the
+best of --repeat runs is reported.
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+from sqlalchemy.orm import selectinload
+
+from app.db import SessionLocal
+from app import models, schemas
+from app.services.dashboard_read import fetch_dashboard, filter_students
+from app.services.lesson_writer import insert_packages_with_lessons
+
+SIZES = (1_000, 10_000, 50_000)
+GROUP = "bench-dashboard"
+PACKAGES_PER_STUDENT = 5
+PACKAGE_SIZE = 4
+
+
+def seed(db, lessons: int) -> None:
+    """lessons / 20 students, each with five 4-lesson packages."""
+    n = max(lessons // (PACKAGES_PER_STUDENT * PACKAGE_SIZE), 1)
+    students = [
+        models.Student(
+            name=f"bench-{i:07d}",
+            group_name=GROUP,
+            lesson_day_1=i % 5,
+            package_size=PACKAGE_SIZE,
+            start_date=date(2025, 1, 6),
+        )
+        for i in range(n)
+    ]
+    db.add_all(students)
+    db.flush()
+    specs = []
+    for s in students:
+        for k in range(PACKAGES_PER_STUDENT):
+            start = date(2025, 1, 6) + timedelta(weeks=k * PACKAGE_SIZE)
+            specs.append({
+                "student_id": s.student_id,
+                "package_size": PACKAGE_SIZE,
+                "payment_status": k < PACKAGES_PER_STUDENT - 1,
+                "lesson_dates": [start + timedelta(weeks=w) for w in range(PACKAGE_SIZE)],
+            })
+    insert_packages_with_lessons(db, specs)
+    db.flush()
+
+
+def run_orm(db) -> str:
+    """The previous path: ORM objects, then response_model validation."""
+    students = (
+        filter_students(db.query(models.Student), group_name=GROUP)
+        .options(selectinload(models.Student.packages))   # lessons load via selectin
+        .order_by(models.Student.name, models.Student.student_id)
+        .all()
+    )
+    for s in students:
+        s.packages.sort(key=lambda p: p.package_id)
+    body = [schemas.StudentOut.model_validate(s).model_dump(mode="json") for s in students]
+    db.expunge_all()   # the next run must build the objects again
+    return json.dumps(body)
+
+
+def run_flat(db) -> str:
+    students, _ = fetch_dashboard(db, group_name=GROUP)
+    return json.dumps(students)
+
+
+def best_of(fn, db, repeat: int):
+    best, out = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(db)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="lesson counts to seed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path, best is reported")
+    args = parser.parse_args()
+
+    print(f"{'lessons':>8} {'orm':>10} {'flat':>10} {'speedup':>8}  same output")
+    for lessons in args.sizes:
+        db = SessionLocal()
+        try:
+            seed(db, lessons)
+            db.expunge_all()
+            orm_s, orm_out = best_of(run_orm, db, args.repeat)
+            flat_s, flat_out = best_of(run_flat, db, args.repeat)
+            print(
+                f"{lessons:>8,} {orm_s:9.3f}s {flat_s:9.3f}s {orm_s / flat_s if flat_s else 0:7.1f}x  "
+                f"{'yes' if json.loads(orm_out) == json.loads(flat_out) else 'NO'}"
+            )
+        finally:
+            db.rollback()
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
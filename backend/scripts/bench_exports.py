@@ -0,0 +1,113 @@
+# backend/scripts/bench_exports.py
+"""
+Compare the dashboard exports: XLSX vs CSV vs Parquet.
+
+Run from backend/ against the configured DATABASE_URL:
+
+    python -m scripts.bench_exports                  # existing data
+    python -m scripts.bench_exports --seed 20000     # + synthetic students
+
+--seed rows are inserted in the benchmark's transaction and rolled back
+at the end, nothing is committed. Throughput comes from an untraced
+run; memory is the Python heap peak (tracemalloc) of a second run plus,
+for Parquet, Arrow's own allocator peak.
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+
+from app.db import SessionLocal
+from app import models
+from app.services.lesson_writer import insert_packages_with_lessons
+from app.services import exports
+
+
+def seed(db, n: int) -> None:
+    students = [
+        models.Student(
+            name=f"bench-{i:07d}",
+            group_name=f"G{i % 12}",
+            lesson_day_1=i % 5,
+            package_size=4 if i % 3 else 8,
+            start_date=date(2025, 1, 6),
+        )
+        for i in range(n)
+    ]
+    db.add_all(students)
+    db.flush()
+    specs = []
+    for s in students:
+        size = int(s.package_size)
+        for k in range(3):
+            start = date(2025, 1, 6) + timedelta(weeks=k * size)
+            specs.append({
+                "student_id": s.student_id,
+                "package_size": size,
+                "payment_status": k < 2,
+                "lesson_dates": [start + timedelta(weeks=w) for w in range(size)],
+            })
+    insert_packages_with_lessons(db, specs)
+    db.flush()
+
+
+def run_xlsx(db) -> int:
+    with tempfile.TemporaryFile() as f:
+        exports.write_dashboard_xlsx(db, f)
+        return f.tell()
+
+
+def run_stream(stream_fn):
+    def _run(db) -> int:
+        return sum(len(chunk) for chunk in stream_fn(db))
+    return _run
+
+
+def measure(name, fn, db, lessons: int) -> None:
+    """One untraced pass for throughput, one traced pass for memory."""
+    t0 = time.perf_counter()
+    size = fn(db)
+    elapsed = time.perf_counter() - t0
+
+    arrow_pool = exports.pa.default_memory_pool() if exports.pa is not None else None
+    arrow_before = arrow_pool.bytes_allocated() if arrow_pool else 0
+    tracemalloc.start()
+    fn(db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_peak = max((arrow_pool.max_memory() or 0) - arrow_before, 0) if arrow_pool else 0
+
+    print(
+        f"{name:<8} {elapsed:8.2f}s {lessons / elapsed if elapsed else 0:12,.0f} lessons/s "
+        f"{peak / 1e6:9.1f} MB heap {arrow_peak / 1e6:7.1f} MB arrow {size / 1e6:8.2f} MB out"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seed", type=int, default=0, help="synthetic students to add (rolled back)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args.seed)
+        lessons = db.execute(select(func.count(models.Lesson.lesson_id))).scalar_one()
+        print(f"{lessons:,} lessons")
+
+        measure("xlsx", run_xlsx, db, lessons)
+        measure("csv", run_stream(exports.iter_dashboard_csv), db, lessons)
+        if exports.pa is not None:
+            measure("parquet", run_stream(exports.iter_lessons_parquet), db, lessons)
+        else:
+            print("parquet  skipped (pyarrow not installed)")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
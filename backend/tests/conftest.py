@@ -0,0 +1,91 @@
+# backend/tests/conftest.py
+import os
+import tempfile
+
+# app.db builds its engines at import time: point them at a throwaway
+# SQLite file before any test imports the app
+_tmp = tempfile.mkdtemp(prefix="tuition_test_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/tuition.db")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("TASK_BACKEND", "eager")
+
+import pytest
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from app.db import Base, async_engine, async_read_engine, engine, read_engine
+from app import models  # noqa: F401  (registers the tables)
+from app.services import change_tracking  # noqa: F401  (registers session hooks)
+from app.services.data_version import CHANGES, CLOSURES, STUDENTS
+
+# the models live in the "public" schema; on SQLite that is an attached database
+_PUBLIC_DB = os.path.join(_tmp, "public.db")
+
+
+def _attach_public(dbapi_conn, _record):
+    dbapi_conn.execute(f"ATTACH DATABASE '{_PUBLIC_DB}' AS public")
+    # let SQLAlchemy emit BEGIN itself, so SAVEPOINTs and rollbacks work
+    dbapi_conn.isolation_level = None
+
+
+def _attach_public_async(dbapi_conn, _record):
+    # aiosqlite's adapted connection only runs statements through a cursor
+    cursor = dbapi_conn.cursor()
+    cursor.execute(f"ATTACH DATABASE '{_PUBLIC_DB}' AS public")
+    cursor.close()
+
+
+def _begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+if engine.dialect.name == "sqlite":
+    for _engine in (engine, read_engine):
+        event.listen(_engine, "connect", _attach_public)
+        event.listen(_engine, "begin", _begin)
+    for _engine in (async_engine, async_read_engine):
+        event.listen(_engine.sync_engine, "connect", _attach_public_async)
+
+
+@pytest.fixture(scope="session")
+def tables():
+    Base.metadata.create_all(bind=engine)
+    # a running database has its version counters already
+    with engine.begin() as conn:
+        conn.execute(insert(models.DataVersion), [
+            {"scope": scope, "version": 0} for scope in (STUDENTS, CLOSURES, CHANGES)
+        ])
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db(tables):
+    """A session whose commits become savepoints; everything is rolled back."""
+    conn = engine.connect()
+    outer = conn.begin()
+    session = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        outer.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def client(tables):
+    """
+    The API behind a TestClient. Requests commit for real (the async
+    endpoints have their own engine), so every table is emptied afterwards.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table is not models.DataVersion.__table__:
+                conn.execute(table.delete())
+        conn.execute(update(models.DataVersion).values(version=0))
@@ -0,0 +1,139 @@
+# backend/tests/test_async_endpoints.py
+import asyncio
+import threading
+from datetime import date
+
+import pytest
+
+from app.services import event_bus
+
+START = "2025-01-06"   # a Monday; lessons on 01-06, 01-13, 01-20, 01-27
+
+
+@pytest.fixture
+def events(monkeypatch):
+    published = []
+    monkeypatch.setattr(event_bus.event_bus, "publish", published.append)
+    return published
+
+
+@pytest.fixture
+def package(client):
+    r = client.post("/students/", json={
+        "name": "async", "lesson_day_1": 0, "package_size": 4, "start_date": START,
+    })
+    assert r.status_code == 200, r.text
+    student = client.get("/students/").json()[0]
+    return student["packages"][0]
+
+
+def lesson_dates(client):
+    return [l["lesson_date"] for l in client.get("/students/").json()[0]["packages"][0]["lessons"]]
+
+
+def test_list_students_answers_304_until_a_write(client, package):
+    first = client.get("/students/")
+    assert first.status_code == 200
+    assert first.json()[0]["name"] == "async"
+
+    etag = first.headers["ETag"]
+    assert client.get("/students/", headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/lessons/{package['lessons'][0]['lesson_id']}/status", json={"status": "attended"})
+    assert client.get("/students/", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_list_closures(client):
+    assert client.get("/closures/").json() == []
+    client.post("/closures/", json={"start_date": "2025-02-03", "end_date": "2025-02-07"})
+
+    r = client.get("/closures/")
+    assert [(c["start_date"], c["end_date"]) for c in r.json()] == [("2025-02-03", "2025-02-07")]
+    assert client.get("/closures/", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+
+def test_update_lesson_status(client, package, events):
+    lesson_id = package["lessons"][0]["lesson_id"]
+
+    r = client.patch(f"/lessons/{lesson_id}/status", json={"status": "leave"})
+
+    assert r.status_code == 200
+    assert r.json()["status"] == "leave"
+    assert [(e["type"], e["lesson_id"], e["status"]) for e in events] == [("lesson.updated", lesson_id, "leave")]
+    assert client.patch("/lessons/999999/status", json={"status": "leave"}).status_code == 404
+
+
+def test_bulk_update_lesson_status(client, package, events):
+    ids = [l["lesson_id"] for l in package["lessons"][:2]]
+
+    r = client.post("/lessons/bulk_status", json={"updates": [
+        {"lesson_id": ids[0], "status": "attended"},
+        {"lesson_id": ids[1], "status": "leave"},
+        {"lesson_id": 999999, "status": "leave"},
+    ]})
+
+    assert r.status_code == 200
+    assert r.json()["updated"] == 2 and r.json()["missing"] == [999999]
+    assert sorted(e["lesson_id"] for e in events) == sorted(ids)
+
+
+def test_add_makeup_lesson(client, package, events):
+    url = f"/students/packages/{package['package_id']}/add_makeup"
+
+    r = client.post(url, json={"lesson_date": "2025-01-08"})
+
+    assert r.status_code == 200
+    assert "2025-01-08" in lesson_dates(client)
+    assert events[-1]["type"] == "lesson.created" and events[-1]["is_makeup"] is True
+
+    # the student already has a lesson that day
+    assert client.post(url, json={"lesson_date": "2025-01-13"}).status_code == 400
+    client.post("/closures/", json={"start_date": "2025-01-10", "end_date": "2025-01-10"})
+    assert client.post(url, json={"lesson_date": "2025-01-10"}).json()["detail"] == "Selected date is a closure"
+    assert client.post("/students/packages/999999/add_makeup", json={"lesson_date": "2025-01-09"}).status_code == 404
+
+
+def test_edit_lesson(client, package, events):
+    lesson_id = package["lessons"][1]["lesson_id"]
+
+    r = client.patch(f"/lessons/{lesson_id}", json={"lesson_date": "2025-01-14", "status": "leave"})
+
+    assert r.status_code == 200
+    assert r.json()["lesson_date"] == "2025-01-14" and r.json()["status"] == "leave"
+    assert (events[-1]["type"], events[-1]["lesson_date"]) == ("lesson.updated", date(2025, 1, 14))
+
+    # onto another of the student's lessons
+    assert client.patch(f"/lessons/{lesson_id}", json={"lesson_date": "2025-01-20"}).status_code == 400
+    # a make-up on a regular lesson day
+    assert client.patch(
+        f"/lessons/{lesson_id}", json={"lesson_date": "2025-02-03", "is_makeup": True}
+    ).status_code == 400
+    assert lesson_dates(client) == ["2025-01-06", "2025-01-14", "2025-01-20", "2025-01-27"]
+
+
+def test_delete_lesson(client, package, events):
+    regular = package["lessons"][0]["lesson_id"]
+    assert client.delete(f"/lessons/{regular}").status_code == 400
+
+    client.post(f"/students/packages/{package['package_id']}/add_makeup", json={"lesson_date": "2025-01-08"})
+    makeup = next(
+        l["lesson_id"] for l in client.get("/students/").json()[0]["packages"][0]["lessons"]
+        if l["lesson_date"] == "2025-01-08"
+    )
+
+    r = client.delete(f"/lessons/{makeup}")
+
+    assert r.json() == {"status": "deleted", "lesson_id": makeup}
+    assert "2025-01-08" not in lesson_dates(client)
+    assert events[-1] == {"type": "lesson.deleted", "lesson_id": makeup, "package_id": package["package_id"]}
+
+
+def test_redis_publish_from_async_code_runs_off_the_event_loop(monkeypatch):
+    bus = event_bus.RedisEventBus("redis://localhost:1/0", "test")
+    threads = []
+    monkeypatch.setattr(bus, "publish", lambda event: threads.append(threading.get_ident()))
+    monkeypatch.setattr(event_bus, "event_bus", bus)
+
+    asyncio.run(event_bus.publish_event_async("lesson.deleted", lesson_id=1))
+
+    assert len(threads) == 1 and threads[0] != threading.get_ident()
@@ -0,0 +1,55 @@
+# backend/tests/test_closure_impact.py
+from datetime import date, timedelta
+
+from app import models
+from app.services.closure_impact import reschedule_closure_windows
+from app.services.lesson_writer import insert_package_with_lessons
+
+MONDAY = date(2025, 1, 6)
+
+
+def weekly(start: date, n: int):
+    return [start + timedelta(weeks=w) for w in range(n)]
+
+
+def lesson_dates(db, package_id: int):
+    return [
+        r.lesson_date for r in db.query(models.Lesson.lesson_date)
+        .filter(models.Lesson.package_id == package_id)
+        .order_by(models.Lesson.lesson_number)
+    ]
+
+
+def test_moved_lessons_skip_dates_held_by_other_packages(db):
+    student = models.Student(name="closure", lesson_day_1=0, package_size=4, start_date=MONDAY)
+    db.add(student)
+    db.flush()
+    first = insert_package_with_lessons(db, student.student_id, 4, weekly(MONDAY, 4))
+    second = insert_package_with_lessons(db, student.student_id, 4, weekly(MONDAY + timedelta(weeks=4), 4))
+    # the second package's first lesson was attended: it stays on 2025-02-03
+    db.query(models.Lesson).filter(
+        models.Lesson.package_id == second, models.Lesson.lesson_number == 1
+    ).update({"status": "attended"})
+    db.add(models.Closure(start_date=date(2025, 1, 13), end_date=date(2025, 1, 13)))
+    db.flush()
+
+    result = reschedule_closure_windows(db, [(date(2025, 1, 13), date(2025, 1, 13))], dry_run=False)
+    db.flush()
+
+    assert result["unplaced_lesson_ids"] == []
+    assert lesson_dates(db, first) == [date(2025, 1, 6), date(2025, 1, 20), date(2025, 1, 27), date(2025, 2, 10)]
+    assert lesson_dates(db, second) == [date(2025, 2, 3), date(2025, 2, 17), date(2025, 2, 24), date(2025, 3, 3)]
+
+
+def test_reschedule_leaves_the_commit_to_the_caller(db):
+    student = models.Student(name="no-commit", lesson_day_1=0, package_size=4, start_date=MONDAY)
+    db.add(student)
+    db.flush()
+    package_id = insert_package_with_lessons(db, student.student_id, 4, weekly(MONDAY, 4))
+    db.add(models.Closure(start_date=date(2025, 1, 13), end_date=date(2025, 1, 13)))
+    db.flush()
+
+    reschedule_closure_windows(db, [(date(2025, 1, 13), date(2025, 1, 13))], dry_run=False)
+    db.rollback()
+
+    assert lesson_dates(db, package_id) == []
@@ -0,0 +1,27 @@
+# backend/tests/test_dashboard_read.py
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from app import models
+from app.services.dashboard_read import decode_student_cursor, encode_student_cursor, fetch_dashboard
+from app.services.lesson_writer import insert_package_with_lessons
+
+
+def test_lesson_flags_are_booleans_even_when_null(db):
+    student = models.Student(name="flags", lesson_day_1=0, package_size=4, start_date=date(2025, 1, 6))
+    db.add(student)
+    db.flush()
+    insert_package_with_lessons(db, student.student_id, 1, [date(2025, 1, 6)])
+    db.execute(update(models.Lesson).values(is_makeup=None))
+
+    students, _ = fetch_dashboard(db)
+
+    assert students[0]["packages"][0]["lessons"][0]["is_makeup"] is False
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_student_cursor(encode_student_cursor("Zoë", 7)) == ("Zoë", 7)
+    with pytest.raises(ValueError):
+        decode_student_cursor("garbage")
@@ -0,0 +1,44 @@
+# backend/tests/test_export_jobs.py
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import export_jobs
+from app.services.export_jobs import claim_export_job, export_job_status
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_follower_returns_at_once_while_the_leader_has_no_meta_yet(db, cache_dir):
+    leader = claim_export_job(db, "csv")
+    (cache_dir / f"{leader['job_id']}.json").unlink()   # leader died before writing it
+
+    t0 = time.perf_counter()
+    follower = claim_export_job(db, "csv")
+
+    assert time.perf_counter() - t0 < 0.5
+    assert follower["job_id"] == leader["job_id"]
+    assert follower["leader"] is False
+    assert follower["status"] == "queued"
+    assert export_job_status(leader["job_id"])["status"] == "queued"
+
+
+def test_error_left_by_an_earlier_run_does_not_fail_a_new_build(db, cache_dir):
+    first = claim_export_job(db, "csv")
+    export_jobs.abandon_export_job(first["job_id"], "boom")
+    assert export_job_status(first["job_id"])["status"] == "failed"
+
+    second = claim_export_job(db, "csv")
+    assert second["leader"] is True
+    assert not (cache_dir / f"{first['job_id']}.error").exists()
+
+    # even if the old .error reappears next to the live lock, followers see a running build
+    (cache_dir / f"{first['job_id']}.error").write_text("boom")
+    follower = claim_export_job(db, "csv")
+    assert follower["leader"] is False
+    assert follower["status"] == "running"
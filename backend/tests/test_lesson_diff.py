@@ -0,0 +1,49 @@
+# backend/tests/test_lesson_diff.py
+from datetime import date, timedelta
+
+from app.services.lesson_writer import diff_package_lessons
+
+START = date(2025, 1, 6)
+
+
+def lesson(number: int, d: date, status: str = "scheduled", **flags) -> dict:
+    return {
+        "lesson_id": 100 + number,
+        "lesson_number": number,
+        "lesson_date": d,
+        "is_first": number == 1,
+        "is_manual_override": flags.get("is_manual_override", False),
+        "status": status,
+        "is_makeup": flags.get("is_makeup", False),
+    }
+
+
+def weekly(start: date, n: int):
+    return [start + timedelta(weeks=w) for w in range(n)]
+
+
+def test_attended_and_leave_lessons_keep_date_and_status():
+    existing = [
+        lesson(1, START, "attended"),
+        lesson(2, START + timedelta(weeks=1), "leave"),
+        lesson(3, START + timedelta(weeks=2)),
+        lesson(4, START + timedelta(weeks=3)),
+    ]
+    # the whole schedule shifts by a day
+    diff = diff_package_lessons(existing, weekly(START + timedelta(days=1), 4))
+
+    touched = {u["lesson_id"] for u in diff["update"]}
+    assert 101 not in touched and 102 not in touched
+    assert 101 not in diff["delete"] and 102 not in diff["delete"]
+    moved = {u["lesson_id"]: u for u in diff["update"] if "lesson_date" in u}
+    assert set(moved) == {103, 104}
+    assert all(u["status"] == "scheduled" for u in moved.values())
+    assert diff["first_lesson_date"] == START
+
+
+def test_scheduled_lessons_still_move():
+    existing = [lesson(n, d) for n, d in enumerate(weekly(START, 4), start=1)]
+    diff = diff_package_lessons(existing, weekly(START + timedelta(days=1), 4))
+
+    assert sorted(u["lesson_date"] for u in diff["update"]) == weekly(START + timedelta(days=1), 4)
+    assert diff["insert"] == [] and diff["delete"] == []
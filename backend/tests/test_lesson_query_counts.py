@@ -0,0 +1,91 @@
+# backend/tests/test_lesson_query_counts.py
+"""
+Every lesson-writing operation issues a fixed number of SQL statements,
+whatever the package size: lessons go through the batched writers in
+services/lesson_writer.py, never one INSERT/UPDATE per lesson.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app import crud, models, schemas
+from app.routers.packages import create_package_from_preview, CreateFromPreviewPayload
+from app.services.lesson_writer import insert_package_with_lessons
+
+SIZES = (4, 8, 16, 32)
+START = date(2025, 1, 6)
+
+# statements per operation, identical for every size in SIZES
+EXPECTED = {
+    "create_student": 7,
+    "create_package": 6,
+    "regenerate_package": 9,
+    "create_from_preview": 9,
+}
+
+# savepoint bookkeeping is not part of the operation
+_IGNORED = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+class StatementCounter:
+    def __init__(self, conn):
+        self.count = 0
+        event.listen(conn, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(_IGNORED):
+            self.count += 1
+
+    def measure(self, fn, *args, **kwargs):
+        self.count = 0
+        result = fn(*args, **kwargs)
+        return result, self.count
+
+
+def count_statements(db, size: int) -> dict:
+    counter = StatementCounter(db.connection())
+
+    payload = schemas.StudentCreate(
+        name=f"count-{size}",
+        lesson_day_1=0,
+        lesson_day_2=3,
+        package_size=min(size, 8),   # create_student only stores 4 or 8
+        start_date=START,
+    )
+    student, n_create_student = counter.measure(crud.create_student, db, payload)
+
+    # a second package for the same student, scheduled clear of the first
+    # (a student cannot have two lessons on one day)
+    student.package_size = size
+    student.start_date = START + timedelta(weeks=26)
+    db.flush()
+    pkg, n_create_package = counter.measure(crud.create_package, db, student)
+
+    # a weekly package on its own student, then its start moves a week:
+    # regeneration renumbers size - 1 lessons and moves one, for every size
+    weekly = models.Student(name=f"count-weekly-{size}", lesson_day_1=0, package_size=size, start_date=START)
+    db.add(weekly)
+    db.flush()
+    weekly_pkg_id = insert_package_with_lessons(
+        db, weekly.student_id, size, [START + timedelta(weeks=w) for w in range(size)]
+    )
+    weekly.start_date = START + timedelta(weeks=1)
+    db.flush()
+    _, n_regenerate = counter.measure(crud.regenerate_package, db, db.get(models.Package, weekly_pkg_id))
+
+    dates = [START + timedelta(weeks=104 + w) for w in range(size)]
+    _, n_preview = counter.measure(
+        create_package_from_preview, pkg.package_id, CreateFromPreviewPayload(lesson_dates=dates), False, db
+    )
+    return {
+        "create_student": n_create_student,
+        "create_package": n_create_package,
+        "regenerate_package": n_regenerate,
+        "create_from_preview": n_preview,
+    }
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_lesson_writers_issue_a_fixed_number_of_statements(db, size):
+    assert count_statements(db, size) == EXPECTED
@@ -0,0 +1,77 @@
+# backend/tests/test_migrations.py
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event, inspect, text
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+# the tables as they were before change tracking and lessons.student_id
+OLD_SCHEMA = [
+    "CREATE TABLE public.students (student_id INTEGER PRIMARY KEY, name VARCHAR)",
+    "CREATE TABLE public.packages (package_id INTEGER PRIMARY KEY, student_id INTEGER)",
+    "CREATE TABLE public.lessons (lesson_id INTEGER PRIMARY KEY, package_id INTEGER, lesson_date DATE)",
+    "CREATE TABLE public.closures (closure_id INTEGER PRIMARY KEY)",
+    "INSERT INTO public.students VALUES (1, 'a')",
+    "INSERT INTO public.packages VALUES (10, 1), (11, 1)",
+]
+
+
+@pytest.fixture
+def old_db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+    public = tmp_path / "public.db"
+
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_conn, _record):
+        dbapi_conn.execute(f"ATTACH DATABASE '{public}' AS public")
+        # transactional DDL, as on PostgreSQL
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    with engine.begin() as conn:
+        for ddl in OLD_SCHEMA:
+            conn.exec_driver_sql(ddl)
+    yield engine
+    engine.dispose()
+
+
+def upgrade(engine):
+    cfg = Config(str(ALEMBIC_INI))
+    with engine.begin() as conn:
+        cfg.attributes["connection"] = conn
+        command.upgrade(cfg, "head")
+
+
+def test_upgrade_backfills_student_id_and_adds_the_unique_index(old_db):
+    with old_db.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO public.lessons VALUES (1, 10, '2025-01-06'), (2, 11, '2025-01-13')"
+        ))
+
+    upgrade(old_db)
+
+    with old_db.connect() as conn:
+        assert conn.execute(text("SELECT student_id FROM public.lessons")).scalars().all() == [1, 1]
+    indexes = {i["name"]: i for i in inspect(old_db).get_indexes("lessons", schema="public")}
+    assert indexes["unique_lesson_per_student_date"]["unique"]
+    assert "change_seq" in {c["name"] for c in inspect(old_db).get_columns("students", schema="public")}
+
+
+def test_duplicate_lessons_fail_the_upgrade_instead_of_skipping_the_index(old_db, caplog):
+    with old_db.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO public.lessons VALUES (1, 10, '2025-01-06'), (2, 11, '2025-01-06')"
+        ))
+
+    with pytest.raises(RuntimeError, match="more than one lesson"):
+        upgrade(old_db)
+
+    assert "student 1 has 2 lessons on 2025-01-06" in caplog.text
+    # nothing was half-applied
+    assert "student_id" not in {c["name"] for c in inspect(old_db).get_columns("lessons", schema="public")}
@@ -0,0 +1,43 @@
+# backend/tests/test_read_routing.py
+import time
+
+from starlette.requests import Request
+
+from app.services.read_routing import ReplicaLagGuard, READ_PRIMARY_HEADER
+
+
+def request(header: str = None, host: str = "10.0.0.1") -> Request:
+    headers = [(READ_PRIMARY_HEADER.lower().encode(), header.encode())] if header is not None else []
+    return Request({"type": "http", "method": "GET", "headers": headers, "client": (host, 1234)})
+
+
+def test_echoed_header_routes_reads_to_the_primary():
+    guard = ReplicaLagGuard(5.0, "secret")
+    token = guard.note_write(request())
+
+    assert guard.wants_primary(request(token))
+    assert not guard.wants_primary(request())
+
+
+def test_a_write_does_not_pin_other_clients_behind_the_same_address():
+    guard = ReplicaLagGuard(5.0, "secret")
+    guard.note_write(request(host="203.0.113.7"))
+
+    assert not guard.wants_primary(request(host="203.0.113.7"))
+
+
+def test_forged_or_far_future_values_are_ignored():
+    guard = ReplicaLagGuard(5.0, "secret")
+    far = f"{time.time() + 86400:.3f}"
+
+    assert not guard.wants_primary(request(far))
+    assert not guard.wants_primary(request(f"{far}:{'0' * 32}"))
+    # correctly signed with another key
+    assert not guard.wants_primary(request(ReplicaLagGuard(86400, "other").note_write(request())))
+    # correctly signed but beyond one window (e.g. issued with a longer window)
+    assert not guard.wants_primary(request(ReplicaLagGuard(86400, "secret").note_write(request())))
+
+
+def test_expired_token_reads_from_the_replica():
+    guard = ReplicaLagGuard(-1.0, "secret")
+    assert not guard.wants_primary(request(guard.note_write(request())))
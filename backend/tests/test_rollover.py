@@ -0,0 +1,52 @@
+# backend/tests/test_rollover.py
+from datetime import date, timedelta
+
+from app import models
+from app.services.jobs import create_job
+from app.services.lesson_writer import insert_package_with_lessons
+from app.services.rollover import due_rollover_student_ids, run_rollover_job
+
+TODAY = date(2025, 6, 2)   # a Monday
+
+
+def add_student(db, name: str, last_package_start: date) -> models.Student:
+    student = models.Student(name=name, lesson_day_1=0, package_size=4, start_date=last_package_start, status="active")
+    db.add(student)
+    db.flush()
+    insert_package_with_lessons(
+        db, student.student_id, 4, [last_package_start + timedelta(weeks=w) for w in range(4)]
+    )
+    db.flush()
+    return student
+
+
+def latest_lesson_dates(db, student_id: int):
+    pkg = (
+        db.query(models.Package)
+        .filter(models.Package.student_id == student_id)
+        .order_by(models.Package.package_id.desc())
+        .first()
+    )
+    return [l.lesson_date for l in pkg.lessons]
+
+
+def test_lapsed_student_rolls_over_from_today_not_the_past(db):
+    lapsed = add_student(db, "lapsed", date(2025, 1, 6))      # last lesson 2025-01-27
+    db.commit()
+
+    job = create_job(db, "rollover", {"within_days": 7, "chunk_size": 10})
+    out = run_rollover_job(db, job.job_id, today=TODAY)
+
+    assert out["created"] == 1
+    assert min(latest_lesson_dates(db, lapsed.student_id)) == TODAY
+    # the new package reaches past the cutoff: not due again tomorrow
+    assert due_rollover_student_ids(db, TODAY + timedelta(days=8)) == []
+
+
+def test_due_scan_is_limited_to_the_given_students(db):
+    first = add_student(db, "first", date(2025, 5, 5))
+    second = add_student(db, "second", date(2025, 5, 5))
+    cutoff = TODAY + timedelta(days=7)
+
+    assert sorted(due_rollover_student_ids(db, cutoff)) == sorted([first.student_id, second.student_id])
+    assert due_rollover_student_ids(db, cutoff, student_ids=[second.student_id]) == [second.student_id]
@@ -0,0 +1,87 @@
+# backend/tests/test_scheduler_engines.py
+"""
+Property tests: the arithmetic engine (collect_valid_dates) and the batched
+NumPy engine (collect_valid_dates_batch) must produce exactly what the
+day-by-day reference walk produces, for random weekdays, closures and
+horizons.
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.scheduler import (
+    ClosureCalendar,
+    SCHEDULE_HORIZON,
+    collect_valid_dates,
+    collect_valid_dates_batch,
+    collect_valid_dates_daywalk,
+)
+
+BASE = date(2024, 1, 1)
+SEEDS = range(200)
+
+
+def random_calendar(rng: random.Random) -> ClosureCalendar:
+    """Up to 20 closures, overlapping or adjacent ones included, some long."""
+    intervals = []
+    for _ in range(rng.randint(0, 20)):
+        start = BASE + timedelta(days=rng.randint(-30, 1200))
+        length = rng.choice([0, 0, 1, 2, 6, 13, rng.randint(0, 60), rng.randint(100, 400)])
+        intervals.append((start, start + timedelta(days=length)))
+    return ClosureCalendar(intervals)
+
+
+def random_request(rng: random.Random):
+    start = BASE + timedelta(days=rng.randint(0, 900))
+    days = sorted(rng.sample(range(7), rng.choice([1, 1, 2, 2, 3])))
+    size = rng.choice([1, 4, 8, rng.randint(0, 40), rng.randint(50, 150)])
+    end = rng.choice([
+        None,
+        None,
+        start + timedelta(days=rng.randint(-5, 120)),
+        start + timedelta(days=rng.randint(120, 1000)),
+    ])
+    return start, days, size, end
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_arithmetic_engine_matches_daywalk(seed):
+    rng = random.Random(seed)
+    calendar = random_calendar(rng)
+    for _ in range(10):
+        start, days, size, end = random_request(rng)
+        expected = collect_valid_dates_daywalk(start, days, size, calendar, end)
+        assert collect_valid_dates(start, days, size, calendar, end) == expected
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_batch_engine_matches_daywalk(seed):
+    rng = random.Random(seed)
+    calendar = random_calendar(rng)
+    requests = [random_request(rng) for _ in range(rng.randint(1, 30))]
+
+    results = collect_valid_dates_batch(requests, calendar)
+
+    assert len(results) == len(requests)
+    for (start, days, size, end), got in zip(requests, results):
+        assert got == collect_valid_dates_daywalk(start, days, size, calendar, end)
+
+
+def test_engines_stop_at_the_horizon_when_closed_throughout():
+    start = date(2025, 1, 6)
+    calendar = ClosureCalendar([(start + timedelta(days=10), start + SCHEDULE_HORIZON + timedelta(days=30))])
+    expected = collect_valid_dates_daywalk(start, [0, 3], 8, calendar, None)
+
+    assert len(expected) == 3
+    assert collect_valid_dates(start, [0, 3], 8, calendar, None) == expected
+    assert collect_valid_dates_batch([(start, [0, 3], 8, None)], calendar) == [expected]
+
+
+def test_engines_agree_on_empty_requests():
+    calendar = ClosureCalendar()
+    start = date(2025, 1, 6)
+    for days, size in (([], 4), ([0], 0)):
+        assert collect_valid_dates_daywalk(start, days, size, calendar, None) == []
+        assert collect_valid_dates(start, days, size, calendar, None) == []
+        assert collect_valid_dates_batch([(start, days, size, None)], calendar) == [[]]
@@ -0,0 +1,43 @@
+# backend/tests/test_student_end_date.py
+from app.routers import students
+
+
+def add_student(client) -> dict:
+    r = client.post("/students/", json={
+        "name": "ending", "lesson_day_1": 0, "package_size": 4, "start_date": "2025-01-06",
+    })
+    assert r.status_code == 200, r.text
+    return client.get("/students/").json()[0]
+
+
+def test_batch_end_date_rejects_null(client):
+    student = add_student(client)
+
+    r = client.post("/students/end_date", json={"student_ids": [student["student_id"]], "end_date": None})
+
+    assert r.status_code == 422
+
+
+def test_failed_prune_fails_the_patch_and_keeps_the_student(client, monkeypatch):
+    student = add_student(client)
+
+    def broken_prune(db, student_ids):
+        raise RuntimeError("prune failed")
+
+    monkeypatch.setattr(students, "prune_to_end_dates", broken_prune)
+    r = client.patch(f"/students/{student['student_id']}", json={"end_date": "2025-01-15", "name": "renamed"})
+
+    assert r.status_code == 500
+    after = client.get("/students/").json()[0]
+    assert after["end_date"] is None and after["name"] == "ending"
+    assert len(after["packages"][0]["lessons"]) == 4
+
+
+def test_patch_end_date_prunes_lessons_after_it(client):
+    student = add_student(client)
+
+    r = client.patch(f"/students/{student['student_id']}", json={"end_date": "2025-01-15"})
+
+    assert r.status_code == 200
+    lessons = client.get("/students/").json()[0]["packages"][0]["lessons"]
+    assert [l["lesson_date"] for l in lessons] == ["2025-01-06", "2025-01-13"]
@@ -0,0 +1,93 @@
+# backend/tests/test_sync_changes.py
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app import models
+from app.routers.sync import sync_changes
+
+
+def add_students(db, names):
+    for name in names:
+        db.add(models.Student(name=name, lesson_day_1=0, package_size=4, start_date=date(2025, 1, 6)))
+    db.commit()
+
+
+def all_pages(db, since: int, limit: int):
+    pages = [sync_changes(since=since, limit=limit, cursor=None, db=db)]
+    while pages[-1]["next_cursor"]:
+        pages.append(sync_changes(since=since, limit=limit, cursor=pages[-1]["next_cursor"], db=db))
+    return pages
+
+
+def student_names(pages):
+    return sorted(s["name"] for page in pages for s in page["changes"]["students"])
+
+
+def test_snapshot_is_paged_and_complete(db):
+    add_students(db, ["a", "b", "c"])            # one transaction: one shared change_seq
+    add_students(db, ["d", "e"])
+    # a row written before change tracking
+    db.execute(update(models.Student).where(models.Student.name == "e").values(change_seq=None))
+    db.add(models.Closure(start_date=date(2025, 2, 3), end_date=date(2025, 2, 7)))
+    db.commit()
+
+    pages = all_pages(db, since=0, limit=2)
+
+    assert [sum(len(rows) for rows in p["changes"].values()) for p in pages] == [2, 2, 2]
+    assert student_names(pages) == ["a", "b", "c", "d", "e"]
+    assert [len(p["changes"]["closures"]) for p in pages] == [0, 0, 1]
+    assert len({p["version"] for p in pages}) == 1
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_a_full_page_at_the_end_of_a_table_continues_with_the_next(db):
+    add_students(db, ["a", "b"])
+    db.add(models.Closure(start_date=date(2025, 2, 3), end_date=date(2025, 2, 7)))
+    db.commit()
+
+    pages = all_pages(db, since=0, limit=2)
+
+    assert student_names(pages) == ["a", "b"]
+    assert sum(len(p["changes"]["closures"]) for p in pages) == 1
+
+
+def test_incremental_pages_carry_deletes_once(db):
+    add_students(db, ["a", "b"])
+    version = sync_changes(since=0, limit=100, cursor=None, db=db)["version"]
+    add_students(db, ["c", "d", "e"])
+    db.delete(db.query(models.Student).filter_by(name="a").one())
+    db.commit()
+
+    pages = all_pages(db, since=version, limit=2)
+
+    assert student_names(pages) == ["c", "d", "e"]
+    assert [len(p["deleted"]["students"]) for p in pages] == [1, 0]
+
+
+def test_row_updated_mid_pass_is_not_skipped(db):
+    add_students(db, ["a", "b", "c"])
+    first = sync_changes(since=0, limit=1, cursor=None, db=db)
+    # a row not yet sent moves to a later change_seq
+    db.query(models.Student).filter_by(name="c").one().name = "c2"
+    db.commit()
+
+    pages = [first] + all_pages_from(db, first)
+
+    assert student_names(pages) == ["a", "b", "c2"]
+
+
+def all_pages_from(db, page):
+    pages = []
+    while page["next_cursor"]:
+        page = sync_changes(since=0, limit=1, cursor=page["next_cursor"], db=db)
+        pages.append(page)
+    return pages
+
+
+def test_invalid_cursor_is_a_400(db):
+    with pytest.raises(HTTPException) as e:
+        sync_changes(since=0, limit=10, cursor="not-a-cursor", db=db)
+    assert e.value.status_code == 400
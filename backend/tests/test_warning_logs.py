@@ -0,0 +1,40 @@
+# backend/tests/test_warning_logs.py
+import logging
+from datetime import date
+
+import redis
+
+from app import crud, models
+from app.services import event_bus
+
+
+def test_scheduler_failure_is_logged_not_printed(db, monkeypatch, caplog, capsys):
+    def broken(*args, **kwargs):
+        raise RuntimeError("no calendar")
+
+    monkeypatch.setattr(crud, "generate_lessons_for_package", broken)
+    student = models.Student(name="log", lesson_day_1=0, package_size=4, start_date=date(2025, 1, 6))
+
+    with caplog.at_level(logging.WARNING, logger="app.crud"):
+        assert crud.scheduled_lesson_dates(db, student, 4, "create_package") == []
+
+    assert "generate_lessons_for_package failed in create_package" in caplog.text
+    assert "no calendar" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_redis_publish_failure_is_logged_and_delivered_locally(monkeypatch, caplog):
+    bus = event_bus.RedisEventBus("redis://localhost:1/0", "test")
+    delivered = []
+
+    def refuse(*args):
+        raise redis.ConnectionError("refused")
+
+    monkeypatch.setattr(bus._redis, "publish", refuse)
+    monkeypatch.setattr(bus, "_fan_out", delivered.append)
+
+    with caplog.at_level(logging.WARNING, logger="app.services.event_bus"):
+        bus.publish({"type": "resync"})
+
+    assert delivered == [{"type": "resync"}]
+    assert "delivering locally only: refused" in caplog.text
@@ -6,4 +6,28 @@ const api = axios.create({
   withCredentials: false,
 });
 
+// After a write the backend answers with X-Read-Primary-Until ("<unix
+// time>:<signature>"); echoing it unchanged keeps our reads on the primary
+// database (not a lagging replica) until then.
+const READ_PRIMARY_HEADER = "X-Read-Primary-Until";
+let readPrimary = "";
+let readPrimaryUntil = 0;
+
+api.interceptors.response.use((response) => {
+  const value = response.headers[READ_PRIMARY_HEADER.toLowerCase()];
+  const until = Number(String(value ?? "").split(":")[0]);
+  if (until > readPrimaryUntil) {
+    readPrimaryUntil = until;
+    readPrimary = value;
+  }
+  return response;
+});
+
+api.interceptors.request.use((config) => {
+  if (readPrimaryUntil > Date.now() / 1000) {
+    config.headers.set(READ_PRIMARY_HEADER, readPrimary);
+  }
+  return config;
+});
+
 export default api;
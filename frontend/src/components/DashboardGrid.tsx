@@ -81,6 +81,15 @@ function ConfirmModal({
   );
 }
 
+// future package blocks fetched per "Show Future" / "Show more" click
+const FUTURE_BLOCKS_PER_PAGE = 6;
+
+// export job polled once a second; after this many polls, download directly
+const EXPORT_JOB_MAX_POLLS = 120;
+
+// regenerate job polled once a second; give up after this many polls without progress
+const REGEN_JOB_STALL_POLLS = 120;
+
 export default function Dashboard() {
   const [students, setStudents] = useState<StudentType[]>([]);
 
@@ -105,9 +114,11 @@ export default function Dashboard() {
   const [tab, setTab] = useState<"all" | "4" | "8">("all");
   const [groupFilter, setGroupFilter] = useState<string>("all");
   const [dayFilter, setDayFilter] = useState<string>("all");
+  const [regenProgress, setRegenProgress] = useState<string | null>(null);
 
   const [futurePreviewMap, setFuturePreviewMap] = useState<Record<number, any[]>>({});
   const [showFutureMap, setShowFutureMap] = useState<Record<number, boolean>>({});
+  const [futureHasMoreMap, setFutureHasMoreMap] = useState<Record<number, boolean>>({});
  
   const [creatingPkg, setCreatingPkg] = useState<number | null>(null);
 
@@ -134,6 +145,79 @@ export default function Dashboard() {
     load();
   }, []);
 
+  // live updates from other staff: patch small changes in place, refetch for the rest
+  useEffect(() => {
+    const es = new EventSource(`${api.defaults.baseURL}/events`);
+    let reloadTimer: ReturnType<typeof setTimeout> | undefined;
+    const scheduleReload = () => {
+      clearTimeout(reloadTimer);
+      reloadTimer = setTimeout(load, 500);
+    };
+
+    const patchPackage = (packageId: number, fn: (p: PackageType) => PackageType) =>
+      setStudents((prev) =>
+        prev.map((s) =>
+          s.packages?.some((p) => p.package_id === packageId)
+            ? { ...s, packages: (s.packages || []).map((p) => (p.package_id === packageId ? fn(p) : p)) }
+            : s
+        )
+      );
+
+    es.addEventListener("lesson.updated", (e) => {
+      const ev = JSON.parse((e as MessageEvent).data);
+      patchPackage(ev.package_id, (p) => ({
+        ...p,
+        lessons: (p.lessons || []).map((l) =>
+          l.lesson_id === ev.lesson_id
+            ? {
+                ...l,
+                lesson_date: ev.lesson_date,
+                status: ev.status,
+                is_makeup: ev.is_makeup,
+                is_manual_override: ev.is_manual_override,
+              }
+            : l
+        ),
+      }));
+    });
+    es.addEventListener("package.regenerated", (e) => {
+      const ev = JSON.parse((e as MessageEvent).data);
+      const deleted = new Set<number>(ev.deleted);
+      const changed = new Map<number, Lesson>(
+        [...ev.updated, ...ev.inserted].map((l: Lesson) => [l.lesson_id, l])
+      );
+      patchPackage(ev.package_id, (p) => {
+        const kept = (p.lessons || [])
+          .filter((l) => !deleted.has(l.lesson_id) && !changed.has(l.lesson_id));
+        return {
+          ...p,
+          first_lesson_date: ev.first_lesson_date,
+          lessons: [...kept, ...changed.values()].sort((a, b) => a.lesson_number - b.lesson_number),
+        };
+      });
+    });
+    es.addEventListener("package.payment", (e) => {
+      const ev = JSON.parse((e as MessageEvent).data);
+      patchPackage(ev.package_id, (p) => ({ ...p, payment_status: ev.payment_status }));
+    });
+    for (const type of [
+      "lesson.created",
+      "lesson.deleted",
+      "package.deleted",
+      "closure.created",
+      "closure.updated",
+      "closure.deleted",
+      "resync",
+    ]) {
+      es.addEventListener(type, scheduleReload);
+    }
+
+    return () => {
+      clearTimeout(reloadTimer);
+      es.close();
+    };
+  }, []);
+
   // compute groups list
   const groups = useMemo(() => {
     const setGroups = new Set<string>();
@@ -273,7 +357,27 @@ export default function Dashboard() {
       if (groupFilter !== "all") params.append("group", groupFilter);
       if (dayFilter !== "all") params.append("day", dayFilter);
 
-      const url = `/export/dashboard.xlsx?${params.toString()}`;
+      // background job: identical exports share one build and a cached file.
+      // If the job can't be queued, fails or doesn't finish in time, fall
+      // back to building the file in the request.
+      let url = `/export/dashboard.xlsx?${params.toString()}`;
+      try {
+        let { data: job } = await api.post("/export/jobs", {
+          format: "xlsx",
+          tab,
+          group: groupFilter !== "all" ? groupFilter : "",
+          day: dayFilter !== "all" ? dayFilter : "",
+        });
+        for (let i = 0; i < EXPORT_JOB_MAX_POLLS && (job.status === "queued" || job.status === "running"); i++) {
+          await new Promise((r) => setTimeout(r, 1000));
+          job = (await api.get(`/export/jobs/${job.job_id}`)).data;
+        }
+        if (job.status === "done") url = job.download_url;
+        else console.warn("Export job did not finish, downloading directly", job.error);
+      } catch (err) {
+        console.warn("Export job failed, downloading directly", err);
+      }
+
       const res = await api.get(url, { responseType: "blob" });
 
       const blobUrl = window.URL.createObjectURL(new Blob([res.data]));
@@ -294,6 +398,40 @@ export default function Dashboard() {
     }
   };
 
+  const regenerateGroup = async () => {
+    if (!confirm(`Regenerate the latest package of every student in ${groupFilter}?`)) return;
+    try {
+      // background job: packages are regenerated in batches on the worker,
+      // whose package.regenerated events may not reach this API process, so
+      // the grid is reloaded once the job stops. Polling gives up when the
+      // job makes no progress for REGEN_JOB_STALL_POLLS polls.
+      let { data: job } = await api.post("/jobs/regenerate", { group_name: groupFilter });
+      let lastProcessed = -1;
+      let stalled = 0;
+      while ((job.status === "queued" || job.status === "running") && stalled < REGEN_JOB_STALL_POLLS) {
+        setRegenProgress(`${job.processed}/${job.total}`);
+        await new Promise((r) => setTimeout(r, 1000));
+        job = (await api.get(`/jobs/${job.job_id}`)).data;
+        stalled = job.processed === lastProcessed ? stalled + 1 : 0;
+        lastProcessed = job.processed;
+      }
+      await load();
+      if (job.status === "queued" || job.status === "running") {
+        alert(`Regenerate stopped making progress at ${job.processed}/${job.total}`);
+        return;
+      }
+      const failed = (job.items || []).filter((i: any) => i.status === "failed");
+      if (job.status === "failed" || failed.length) {
+        alert(`Regenerate finished with ${failed.length || "some"} failures`);
+      }
+    } catch (err: any) {
+      console.error("Regenerate failed", err);
+      alert("Regenerate failed: " + (err?.response?.data?.detail || err.message));
+    } finally {
+      setRegenProgress(null);
+    }
+  };
+
   // find first lesson date in chunk
   const firstDateOfChunk = (chunk: any[]) => {
     for (const item of chunk) {
@@ -333,6 +471,29 @@ export default function Dashboard() {
     }
   };
 
+  // fetch one page of future package blocks (each block = one package)
+  const fetchFutureBlocks = async (pkg: any, offset: number) => {
+    const res = await api.get(`/students/packages/${pkg.package_id}/regenerate`, {
+      params: { preview: true, extend: true, limit: FUTURE_BLOCKS_PER_PAGE, offset },
+    });
+    const proposed: any[] = res.data?.proposed_lessons ?? [];
+
+    // Ensure ordered by lesson_date (ISO strings)
+    const ordered = proposed.slice().sort((a: any, b: any) => {
+      const da = a.lesson_date ?? "";
+      const db = b.lesson_date ?? "";
+      return da.localeCompare(db);
+    });
+
+    // chunk into blocks of package_size
+    const chunkSize = Number(pkg.package_size) || 4;
+    const chunks: any[][] = [];
+    for (let i = 0; i < ordered.length; i += chunkSize) {
+      chunks.push(ordered.slice(i, i + chunkSize));
+    }
+    return { chunks, hasMore: !!res.data?.has_more };
+  };
+
   const fetchAndToggleFuture = async (pkg: any) => {
     if (!pkg) return;
     const id = pkg.package_id;
@@ -349,25 +510,10 @@ export default function Dashboard() {
 
     try {
       setLoadingFuture(prev => ({ ...prev, [id]: true }));
-      // REQUEST extend=true so backend returns multiple package-sized blocks up to student's end_date
-      const res = await api.get(`/students/packages/${id}/regenerate?preview=true&extend=true`);
-      const proposed: any[] = res.data?.proposed_lessons ?? [];
-
-      // Ensure ordered by lesson_date (ISO strings)
-      const ordered = proposed.slice().sort((a: any, b: any) => {
-        const da = a.lesson_date ?? "";
-        const db = b.lesson_date ?? "";
-        return da.localeCompare(db);
-      });
-
-      // chunk into blocks of package_size
-      const chunkSize = Number(pkg.package_size) || 4;
-      const chunks: any[][] = [];
-      for (let i = 0; i < ordered.length; i += chunkSize) {
-        chunks.push(ordered.slice(i, i + chunkSize));
-      }
+      const { chunks, hasMore } = await fetchFutureBlocks(pkg, 0);
 
       setFuturePreviewMap(prev => ({ ...prev, [id]: chunks }));
+      setFutureHasMoreMap(prev => ({ ...prev, [id]: hasMore }));
       setShowFutureMap(prev => ({ ...prev, [id]: true }));
     } catch (err) {
       console.error("Failed to fetch future preview", err);
@@ -377,6 +523,25 @@ export default function Dashboard() {
     }
   };
 
+  const loadMoreFuture = async (pkg: any) => {
+    if (!pkg) return;
+    const id = pkg.package_id;
+    const shown = futurePreviewMap[id] ?? [];
+
+    try {
+      setLoadingFuture(prev => ({ ...prev, [id]: true }));
+      const { chunks, hasMore } = await fetchFutureBlocks(pkg, shown.length);
+
+      setFuturePreviewMap(prev => ({ ...prev, [id]: [...(prev[id] ?? []), ...chunks] }));
+      setFutureHasMoreMap(prev => ({ ...prev, [id]: hasMore }));
+    } catch (err) {
+      console.error("Failed to fetch more future preview", err);
+      alert("Failed to load more future weeks");
+    } finally {
+      setLoadingFuture(prev => ({ ...prev, [id]: false }));
+    }
+  };
+
   // helper to render lesson map for a package
   const lessonMapFor = (lessons: Lesson[]) => {
     const map: Record<number, Lesson | undefined> = {};
@@ -405,12 +570,23 @@ export default function Dashboard() {
       <div className="flex items-center justify-between mb-4">
         <h1 className="text-2xl font-semibold">Tuition Dashboard</h1>
 
-        <button
-          onClick={exportExcel}
-          className="px-3 py-2 bg-blue-600 text-white rounded hover:bg-blue-700 hover:scale-[1.03] transition-all"
-        >
-          Export Excel
-        </button>
+        <div className="flex items-center gap-2">
+          {groupFilter !== "all" && (
+            <button
+              onClick={regenerateGroup}
+              disabled={regenProgress !== null}
+              className="px-3 py-2 bg-gray-600 text-white rounded hover:bg-gray-700 disabled:opacity-60 transition-all"
+            >
+              {regenProgress !== null ? `Regenerating ${regenProgress}` : `Regenerate ${groupFilter}`}
+            </button>
+          )}
+          <button
+            onClick={exportExcel}
+            className="px-3 py-2 bg-blue-600 text-white rounded hover:bg-blue-700 hover:scale-[1.03] transition-all"
+          >
+            Export Excel
+          </button>
+        </div>
       </div>
 
       <CreateStudentForm onCreated={load} />
@@ -758,6 +934,18 @@ export default function Dashboard() {
                       );
                     })
                   )}
+                  {row.pkg && showFutureMap[row.pkg.package_id] && futureHasMoreMap[row.pkg.package_id] && (
+                    <tr key={`${row.key}-future-more`} className="bg-yellow-50">
+                      <td colSpan={maxCols + 7} className="border px-2 py-1 text-center">
+                        <button
+                          onClick={() => loadMoreFuture(row.pkg)}
+                          className="px-2 py-1 text-sm border rounded"
+                        >
+                          Show more
+                        </button>
+                      </td>
+                    </tr>
+                  )}
                 </React.Fragment>
               );
             })}